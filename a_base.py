@@ -1,9 +1,11 @@
 import time
 import hmac
 import hashlib
+import threading
 import requests
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlparse
 from config import Config
+import metrics
 
 # API 키 설정 (환경 변수에서 로드)
 api_key = Config.KORBIT_API_KEY
@@ -14,6 +16,96 @@ base_url = Config.KORBIT_BASE_URL
 binance_api_key = Config.BINANCE_API_KEY
 binance_api_secret = Config.BINANCE_API_SECRET
 
+# 호스트 -> 거래소 이름 (계측 라벨용)
+EXCHANGE_HOSTS = {
+    urlparse(Config.KORBIT_BASE_URL).netloc: 'korbit',
+    urlparse(Config.BINANCE_BASE_URL).netloc: 'binance',
+}
+
+
+# 거래소별 초당 요청 수 한도 (공개 API 제한보다 보수적으로 설정)
+# Binance: 분당 가중치 6000 (klines 가중치 2) -> 초당 50회 미만
+RATE_LIMITS = {
+    'binance': 40.0,
+    'korbit': 10.0,
+}
+
+
+class RateLimiter:
+    """토큰 버킷 방식 요청 속도 제한 (여러 스레드가 공유)"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate                  # 초당 토큰 보충량
+        self.burst = burst or rate        # 버킷 크기 (순간 최대 요청 수)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개 획득 (부족하면 보충될 때까지 대기, 대기한 초 반환)"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            # 토큰을 미리 차감하여 대기 순서를 예약 (음수면 그만큼 대기)
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HttpTransport:
+    """Korbit/Binance 공통 HTTP 전송 계층 (세션 재사용 + 속도 제한 + 엔드포인트별 계측)"""
+
+    def __init__(self, session=None, rate_limits=RATE_LIMITS):
+        if session is None:
+            # 스크리너 등 동시 요청 스레드 수만큼 연결을 재사용하도록 풀 크기 확장
+            session = requests.Session()
+            session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=32))
+        self.session = session
+        self.limiters = {exchange: RateLimiter(rate) for exchange, rate in rate_limits.items()}
+
+    def request(self, method, url, **kwargs):
+        parsed = urlparse(url)
+        exchange = EXCHANGE_HOSTS.get(parsed.netloc, parsed.netloc)
+        limiter = self.limiters.get(exchange)
+        if limiter is not None:
+            waited = limiter.acquire()
+            if waited:
+                metrics.registry.inc('rate_limit_wait_ms', int(waited * 1000), exchange=exchange)
+        response = None
+        error = True
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+            error = response.status_code >= 400
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            bytes_sent = bytes_received = 0
+            if response is not None:
+                body = response.request.body
+                bytes_sent = len(body) if body else 0
+                bytes_received = len(response.content)
+            metrics.registry.observe_request(
+                exchange, method, parsed.path, elapsed,
+                bytes_sent=bytes_sent, bytes_received=bytes_received, error=error
+            )
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+
+# 모든 모듈이 공유하는 전송 계층
+transport = HttpTransport()
+
 """HMAC-SHA256 서명을 생성하는 함수"""
 # key = api_secret, message = query_string = urllib.parse.urlencode(params) <- 이거 복붙
 def create_signature(key, message):    
@@ -42,7 +134,7 @@ def check_orders():
     url = f"{base_url}/v2/orders"
 
     try:
-        response = requests.post(url, headers=headers, data=params)  # POST 요청
+        response = transport.post(url, headers=headers, data=params)  # POST 요청
         response.raise_for_status()  # HTTP 에러 체크
         print(response.json())  # 응답 출력
     except requests.exceptions.RequestException as e:
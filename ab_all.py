@@ -6,6 +6,9 @@ from datetime import datetime
 import b_view_nowprice
 import c_buy_and_sell
 import d_wallet
+import event_log
+import korbit_view
+from symbol_registry import get_registry
 
 def print_banner():
     """시스템 배너 출력"""
@@ -22,6 +25,7 @@ def print_menu():
     print("🔍 가격 조회:")
     print("  1: 💹 실시간 가격 조회")
     print("  2: 📈 캔들스틱 차트 보기")
+    print("  12: 🌏 거래소 간 프리미엄 조회")
     print("")
     print("💰 매매 거래:")
     print("  3: 🟢 매수 주문")
@@ -43,31 +47,11 @@ def print_menu():
 
 def get_symbol_choice():
     """거래쌍 선택"""
-    print("\n거래쌍을 선택하세요:")
-    print("1: Bitcoin (BTC/KRW)")
-    print("2: Ethereum (ETH/KRW)")
-    print("3: Tether (USDT/KRW)")
-    
-    try:
-        symbol_choice = int(input("선택: "))
-        symbol_map = {
-            1: 'btc_krw',
-            2: 'eth_krw',
-            3: 'usdt_krw'
-        }
-        return symbol_map.get(symbol_choice)
-    except ValueError:
-        print("❌ 올바른 숫자를 입력해주세요.")
-        return None
+    return korbit_view.select_symbol()
 
 def get_symbol_name(symbol):
     """거래쌍을 이름으로 변환"""
-    name_map = {
-        'btc_krw': 'Bitcoin (BTC/KRW)',
-        'eth_krw': 'Ethereum (ETH/KRW)',
-        'usdt_krw': 'Tether (USDT/KRW)'
-    }
-    return name_map.get(symbol, symbol)
+    return get_registry().display_name(symbol)
 
 def main():
     """메인 실행 함수"""
@@ -116,6 +100,7 @@ def main():
 
     while True:
         try:
+            event_log.flush()  # 이전 작업의 이벤트 출력을 메뉴보다 먼저 표시
             print_menu()
             choice = input("메뉴를 선택하세요: ").strip()
 
@@ -151,14 +136,18 @@ def main():
                 if symbol:
                     order_id = input("주문 ID를 입력하세요: ").strip()
                     if order_id:
-                        trading_bot.get_order_status(symbol, order_id=int(order_id))
+                        order = trading_bot.get_order_status(symbol, order_id=int(order_id))
+                        if order:
+                            korbit_view.print_order_status(order)
                     else:
                         print("❌ 주문 ID를 입력해주세요.")
 
             elif choice == "6":  # 미체결 주문 조회
                 symbol = get_symbol_choice()
                 if symbol:
-                    trading_bot.get_open_orders(symbol)
+                    orders = trading_bot.get_open_orders(symbol)
+                    if orders is not None:
+                        korbit_view.print_open_orders(orders)
 
             elif choice == "7":  # 주문 취소
                 symbol = get_symbol_choice()
@@ -199,6 +188,12 @@ def main():
             elif choice == "11":  # AI 자동매매 중지
                 ai_strategy.stop_auto_trading()
 
+            elif choice == "12":  # 거래소 간 프리미엄 조회
+                from premium_tracker import PremiumTracker
+                premiums = PremiumTracker(trading_bot).poll()
+                event_log.flush()
+                korbit_view.print_premiums(premiums)
+
             else:
                 print("❌ 올바른 메뉴를 선택해주세요.")
 
@@ -1,11 +1,8 @@
-import a_base
-import pandas as pd
-import mplfinance as mpf
-import seaborn as sns
-import matplotlib.pyplot as plt
-import json
+from market_snapshot import get_snapshot
+from candle_store import CandleArchive
 
 #가격 확인 및 그래프 보여주기
+# pandas / mplfinance 는 차트를 그릴 때만 import (헤드리스 실행 시 시작 속도 확보)
 
 url = 'https://api.korbit.co.kr/v2/tickers?symbol='
 
@@ -18,32 +15,36 @@ def check_correct_price(url,symbol):
     elif symbol == 3:
         symbol = 'usdt_krw'
 
-    url = f'{url}{symbol}'
-    try:
-        response = a_base.requests.get(url)
-        response.raise_for_status()  # 응답 코드가 200이 아닐 경우 예외 발생
-        data = response.json()  # JSON 데이터를 파싱
-        
-        ticker_info = data.get('data', [])[0]  # 'data' 리스트의 첫 번째 항목 가져오기
-        print("\n--- 가격 정보 ---")
-        print(f"종목: {ticker_info['symbol']}")
-        print(f"시가: {ticker_info['open']}")
-        print(f"고가: {ticker_info['high']}")
-        print(f"저가: {ticker_info['low']}")
-        print(f"종가: {ticker_info['close']}")
-        print(f"전일 종가: {ticker_info['prevClose']}")
-        print(f"변동 폭: {ticker_info['priceChange']}")
-        print(f"변동률: {ticker_info['priceChangePercent']}%")
-        print(f"거래량: {ticker_info['volume']}")
-        print(f"매수 호가: {ticker_info['bestBidPrice']}")
-        print(f"매도 호가: {ticker_info['bestAskPrice']}")
-        print('----------------------------------')
-
-    except a_base.requests.exceptions.RequestException as e:
-        print("Error fetching data:", e)
-
-
-def view_candlestick(url, symbol):
+    # 거래쌍별 요청 대신 공유 스냅샷에서 조회 (url 인자는 호환용으로 유지)
+    ticker = get_snapshot().get(symbol)
+    if ticker is None:
+        print("Error fetching data:", symbol)
+        return
+
+    price = ticker.scale.price_str
+    print("\n--- 가격 정보 ---")
+    print(f"종목: {ticker.symbol}")
+    print(f"시가: {price(ticker.open)}")
+    print(f"고가: {price(ticker.high)}")
+    print(f"저가: {price(ticker.low)}")
+    print(f"종가: {price(ticker.close)}")
+    print(f"전일 종가: {price(ticker.prev_close)}")
+    print(f"변동 폭: {price(ticker.price_change)}")
+    print(f"변동률: {ticker.price_change_percent}%")
+    print(f"거래량: {ticker.scale.qty_str(ticker.volume)}")
+    print(f"매수 호가: {price(ticker.best_bid)}")
+    print(f"매도 호가: {price(ticker.best_ask)}")
+    print('----------------------------------')
+
+
+def view_candlestick(url, symbol, limit=10, save=None):
+    """
+    일봉 캔들 차트 (캔들 아카이브에 증분 저장 후 표시)
+
+    Args:
+        limit (int): 최근 일봉 수
+        save (str): 'png' 또는 'svg' 이면 창을 띄우지 않고 파일로 저장 (헤드리스, 캐시 사용)
+    """
     if symbol == 1:
         symbol_name = 'BTC/KRW'
         symbol = 'btc_krw'
@@ -54,76 +55,36 @@ def view_candlestick(url, symbol):
         symbol_name = 'USDT/KRW'
         symbol = 'usdt_krw'
 
-    # 캔들 데이터 요청 URL 수정
-    candle_url = f'https://api.korbit.co.kr/v2/candles?symbol={symbol}&interval=1D&limit=10'
+    import numpy as np
+    import chart_render
 
     try:
-        response = a_base.requests.get(candle_url)
-        response.raise_for_status()
-        raw_data = response.json()
-        
-        # 응답 데이터 구조 확인
-        print(f"API 응답 데이터 타입: {type(raw_data)}")
-        if isinstance(raw_data, dict):
-            print(f"응답 키들: {raw_data.keys()}")
-            # 'data' 키가 있는지 확인
-            if 'data' in raw_data:
-                candles = raw_data['data']
+        # 마지막 저장 봉 이후 분량만 요청 (url 인자는 호환용으로 유지)
+        if chart_render.sync_candles(symbol, '1D', limit) is None:
+            print("캔들 데이터 조회 실패 (자세한 사유는 이벤트 로그 참고)")
+
+        if save:
+            path = chart_render.render(symbol, '1D', limit, fmt=save,
+                                       title=f'{symbol_name} Daily ({limit})')
+            if path is None:
+                print("캔들 데이터가 비어있습니다.")
             else:
-                print("응답 데이터에 'data' 키가 없습니다.")
-                print("전체 응답:", raw_data)
-                return
-        elif isinstance(raw_data, list):
-            candles = raw_data
-        else:
-            print("예상하지 못한 데이터 구조입니다.")
-            print("응답 데이터:", raw_data)
-            return
-
-        if not candles:
+                print(f"\n{symbol_name} 일봉 차트를 저장했습니다: {path}")
+            return path
+
+        # 저장된 마감 봉 + 진행 중인 오늘 봉 (진행 중인 봉은 표시만 하고 저장하지 않음)
+        live = chart_render.live_candle(symbol, '1D')
+        candles = CandleArchive().read(chart_render.series_name(symbol, '1D'))
+        if len(live) and len(candles) and candles['ts'][-1] >= live['ts'][0]:
+            live = live[:0]
+        candles = np.concatenate([candles, live])[-limit:]
+        if len(candles) == 0:
             print("캔들 데이터가 비어있습니다.")
-            return
-
-        # 데이터를 pandas DataFrame으로 변환
-        df_data = []
-        for candle in candles:
-            try:
-                # 타임스탬프 처리 개선
-                timestamp = candle.get('timestamp')
-                if timestamp:
-                    # 밀리초 단위인지 초 단위인지 확인
-                    if timestamp > 1e12:  # 밀리초 단위
-                        timestamp = timestamp / 1000
-                    
-                    # datetime 객체로 변환
-                    date = pd.to_datetime(timestamp, unit='s')
-                else:
-                    print("타임스탬프 데이터가 없습니다.")
-                    continue
-                
-                df_data.append({
-                    'Date': date,
-                    'Open': float(candle.get('open', 0)),
-                    'High': float(candle.get('high', 0)),
-                    'Low': float(candle.get('low', 0)),
-                    'Close': float(candle.get('close', 0)),
-                    'Volume': float(candle.get('volume', 0))
-                })
-            except (ValueError, TypeError) as e:
-                print(f"캔들 데이터 처리 중 오류: {e}")
-                print(f"문제 캔들 데이터: {candle}")
-                continue
-
-        if not df_data:
-            print("처리 가능한 캔들 데이터가 없습니다.")
-            return
+            return None
 
-        # DataFrame 생성 및 인덱스 설정
-        df = pd.DataFrame(df_data)
-        df.set_index('Date', inplace=True)
-        df.sort_index(inplace=True)
+        import mplfinance as mpf
 
-        # 데이터 확인
+        df = chart_render.candles_frame(candles)
         print(f"DataFrame 크기: {df.shape}")
         print(f"날짜 범위: {df.index.min()} ~ {df.index.max()}")
 
@@ -139,8 +100,6 @@ def view_candlestick(url, symbol):
 
         print(f"\n{symbol_name} 일봉 차트가 표시되었습니다.")
 
-    except a_base.requests.exceptions.RequestException as e:
-        print("API 요청 오류:", e)
     except Exception as e:
         print("차트 생성 오류:", e)
         import traceback
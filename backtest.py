@@ -0,0 +1,187 @@
+import numpy as np
+
+import indicators
+from rules import RuleSet, DEFAULT_RULES
+from fixed_point import scale_for, to_units_array, KRW_DECIMALS
+from symbol_registry import DEFAULT_MIN_NOTIONAL
+
+# 1분봉 백테스트
+# AITradingStrategy._execute_buy/_execute_sell 의 현금/포지션 상태 전이를
+# int64 정수 단위로 그대로 재현한다. 상태가 봉마다 이전 봉에 의존하므로
+# numba 가 있으면 JIT 루프를, 없으면 파이썬 정수 루프를 사용한다.
+#
+# int64 범위: 가격 단위 x 수량 단위 < 9.2e18 이어야 한다
+# (예: btc_krw 가격 1억 KRW 에서 보유량 약 900 BTC 까지).
+# numba 경로는 넘치면 조용히 값이 감기므로 run_backtest 가 실행 후 범위를 확인해
+# 넘을 수 있었던 입력이면 OverflowError 를 낸다 (파이썬 정수 경로도 같은 기준).
+
+INT64_MAX = 2 ** 63 - 1
+
+ACTION_BUY = 1
+ACTION_SELL = -1
+ACTION_HOLD = 0
+
+# 신호 신뢰도 (get_trading_signal 과 동일)
+SIGNAL_CONFIDENCE = 0.85
+HOLD_CONFIDENCE = 0.6
+
+
+def signals_from_closes(closes, rules=None):
+    """
+    종가 배열 -> 봉별 (행동, 신뢰도) 배열 (실시간 자동매매와 같은 규칙을 일괄 평가)
+
+    Args:
+        rules (dict): {'buy': ..., 'sell': ...} 규칙 문자열 (기본: rules.DEFAULT_RULES)
+
+    Returns:
+        tuple: (actions int8 배열, confidence float64 배열)
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    ruleset = RuleSet(rules or DEFAULT_RULES)
+    values = ruleset.evaluate(closes)
+
+    actions = np.zeros(len(closes), dtype=np.int8)
+    actions[values['buy']] = ACTION_BUY
+    actions[values['sell'] & ~values['buy']] = ACTION_SELL  # get_trading_signal 은 매수 규칙을 먼저 확인
+    confidence = np.where(actions != ACTION_HOLD, SIGNAL_CONFIDENCE, HOLD_CONFIDENCE)
+    # 지표 워밍업(데이터 부족) 구간은 신뢰도 0 (get_trading_signal 의 '데이터 부족' 과 동일)
+    confidence[~ruleset.ready(values)] = 0.0
+    return actions, confidence
+
+
+def _simulate(prices, actions, confidence, cash, qty, divisor, lot_units,
+              target_cash, target_crypto, min_confidence, min_trade, cash_out, qty_out):
+    """
+    봉 단위 상태 전이 (numba 컴파일 대상, 인덱싱만 사용하므로 리스트도 입력 가능)
+
+    Returns:
+        int: 체결된 매매 횟수
+    """
+    trades = 0
+    for t in range(len(prices)):
+        price = prices[t]
+        crypto_value = price * qty // divisor
+        total = cash + crypto_value
+        action = actions[t]
+        conf = confidence[t]
+
+        if action != 0 and conf > min_confidence and total > 0:
+            if action == 1:
+                cash_ratio = cash / total
+                if cash_ratio > target_cash and price > 0:
+                    buy_ratio = min((cash_ratio - target_cash) * conf, 0.1)  # 최대 10%씩 매수
+                    amount = int(cash * buy_ratio)
+                    if amount >= min_trade:
+                        cash -= amount
+                        qty += amount * divisor // price  # 시장가 금액 매수 체결 수량
+                        trades += 1
+            else:
+                crypto_ratio = crypto_value / total
+                if crypto_ratio > target_crypto:
+                    sell_ratio = min((crypto_ratio - target_crypto) * conf, 0.1)  # 최대 10%씩 매도
+                    sell_qty = int(qty * sell_ratio) // lot_units * lot_units
+                    value = price * sell_qty // divisor
+                    if value >= min_trade:
+                        qty -= sell_qty
+                        cash += value
+                        trades += 1
+
+        cash_out[t] = cash
+        qty_out[t] = qty
+    return trades
+
+
+_simulate_jit = indicators.jit(_simulate)
+
+
+def _check_int64_range(max_price, max_qty, max_cash, divisor):
+    """
+    _simulate 의 중간 곱셈(가격 x 수량, 금액 x divisor)이 int64 안에 있었는지 확인
+
+    처음 넘친 곱셈의 두 인자는 넘치기 전 값이므로 봉별 최대값으로 확인하면 충분하다.
+    """
+    if max_price * max_qty > INT64_MAX or max_cash * divisor > INT64_MAX:
+        raise OverflowError(
+            f"백테스트 정수 연산이 int64 범위를 넘습니다 (가격 {max_price} x 수량 {max_qty}, "
+            f"현금 {max_cash} x {divisor}). 시작 현금/수량을 줄이세요."
+        )
+
+
+class BacktestResult:
+    """백테스트 결과 (원화/수량 정수 단위 int64 배열)"""
+
+    __slots__ = ('symbol', 'scale', 'cash', 'qty', 'equity', 'trades')
+
+    def __init__(self, symbol, scale, cash, qty, equity, trades):
+        self.symbol = symbol
+        self.scale = scale
+        self.cash = cash        # 봉별 현금 (원화 정수)
+        self.qty = qty          # 봉별 보유 수량 (수량 정수 단위)
+        self.equity = equity    # 봉별 총 자산 (원화 정수)
+        self.trades = trades
+
+    @property
+    def total_return(self):
+        """기간 수익률 (첫 봉 대비 마지막 봉 총 자산)"""
+        if len(self.equity) == 0 or self.equity[0] == 0:
+            return 0.0
+        return self.equity[-1] / self.equity[0] - 1
+
+    def __repr__(self):
+        return f"BacktestResult({self.symbol} trades={self.trades} return={self.total_return * 100:.2f}%)"
+
+
+def run_backtest(price_units, actions, confidence, symbol='btc_krw', initial_cash=1_000_000,
+                 initial_qty=0, target_ratios=None, min_confidence=0.7, min_trade_amount=None):
+    """
+    정수 가격 배열로 자동매매 상태 전이 재현
+
+    Args:
+        price_units: 봉별 가격 (scale.price_decimals 정수 단위)
+        actions: 봉별 행동 (1 매수, -1 매도, 0 관망)
+        confidence: 봉별 신뢰도
+        initial_cash (int): 시작 현금 (원화 정수)
+        initial_qty (int): 시작 보유 수량 (수량 정수 단위)
+        target_ratios (dict): {'cash': 0.4, 'crypto': 0.6} (AITradingStrategy 기본값)
+        min_trade_amount (int): 최소 거래 금액 (거래소 기본 최소 주문 금액보다 작으면 그 값 사용)
+
+    Returns:
+        BacktestResult
+    """
+    scale = scale_for(symbol)
+    target_ratios = target_ratios or {'cash': 0.4, 'crypto': 0.6}
+    divisor = scale.price_scale * scale.qty_scale // 10 ** KRW_DECIMALS
+    min_trade = max(min_trade_amount or 0, DEFAULT_MIN_NOTIONAL)  # AITradingStrategy._min_trade_amount 와 동일
+
+    prices = np.ascontiguousarray(price_units, dtype=np.int64)
+    actions = np.ascontiguousarray(actions, dtype=np.int8)
+    confidence = np.ascontiguousarray(confidence, dtype=np.float64)
+    args = (int(initial_cash), int(initial_qty), divisor, scale.lot_units,
+            float(target_ratios['cash']), float(target_ratios['crypto']),
+            float(min_confidence), int(min_trade))
+
+    if indicators.get_backend() == 'numba':
+        cash = np.empty(len(prices), dtype=np.int64)
+        qty = np.empty(len(prices), dtype=np.int64)
+        trades = _simulate_jit(prices, actions, confidence, *args, cash, qty)
+    else:
+        # numpy 스칼라 연산은 느리므로 파이썬 정수 리스트로 실행
+        cash_list = [0] * len(prices)
+        qty_list = [0] * len(prices)
+        trades = _simulate(prices.tolist(), actions.tolist(), confidence.tolist(), *args,
+                           cash_list, qty_list)
+        cash = np.array(cash_list, dtype=np.int64)
+        qty = np.array(qty_list, dtype=np.int64)
+
+    if len(prices):
+        _check_int64_range(int(prices.max()), max(int(qty.max()), int(initial_qty)),
+                           max(int(cash.max()), int(initial_cash)), divisor)
+    equity = cash + prices * qty // divisor
+    return BacktestResult(symbol, scale, cash, qty, equity, int(trades))
+
+
+def backtest_closes(closes, symbol='btc_krw', rules=None, **kwargs):
+    """float 종가 배열로 신호 생성 + 백테스트 (입력 경계에서 한 번만 정수 변환)"""
+    actions, confidence = signals_from_closes(closes, rules)
+    price_units = to_units_array(closes, scale_for(symbol).price_decimals)
+    return run_backtest(price_units, actions, confidence, symbol=symbol, **kwargs)
@@ -0,0 +1,185 @@
+import time
+import threading
+
+import metrics
+import event_log
+from models import Balance
+from ledger import get_ledger
+from fixed_point import format_units, currency_decimals
+
+# 자산별 잔고 공유 인덱스
+# 메뉴(d_wallet), 매매 루프(_get_portfolio_status), 리밸런서가 각자 /v2/balance 를 호출하고
+# 목록을 선형 탐색하는 대신, 한 번 조회한 응답을 자산 -> Balance 인덱스로 만들어 함께 읽는다.
+# 새 스냅샷을 받을 때마다 이전 스냅샷과의 차이를 계산해 변경 리스너에 전달하므로
+# 체결 여부를 주문 상태 조회 없이 잔고 변화로 바로 알 수 있다.
+#
+# 스트리밍 모드: 비공개 WebSocket 잔고 이벤트를 apply_update() 로 반영하면
+# 인덱스가 항상 최신이므로 REST 조회는 stream_max_age 가 지난 경우(연결 끊김 등)에만 나간다.
+
+# 스냅샷 유효 시간 (초): 같은 틱의 여러 거래쌍 루프가 한 번의 조회를 공유
+DEFAULT_MAX_AGE = 1.0
+
+# 스트리밍 중 REST 재조회 주기 (초): 누락된 이벤트 보정용
+STREAM_MAX_AGE = 60.0
+
+_FIELDS = ('balance', 'available', 'trade_in_use', 'withdrawal_in_use')
+
+
+def diff(old, new):
+    """
+    두 잔고 스냅샷의 자산별 변화량
+
+    Args:
+        old (dict): 자산 -> Balance (이전)
+        new (dict): 자산 -> Balance (현재)
+
+    Returns:
+        dict: 자산 -> {'balance': 증감, 'available': 증감, ...} (변화 없는 자산 제외, 정수 단위)
+    """
+    changes = {}
+    for currency in old.keys() | new.keys():
+        before, after = old.get(currency), new.get(currency)
+        delta = {field: getattr(after, field, 0) - getattr(before, field, 0) for field in _FIELDS}
+        if any(delta.values()):
+            changes[currency] = delta
+    return changes
+
+
+class BalanceService:
+    """자산 -> Balance 공유 인덱스 (만료 시 /v2/balance 1회로 갱신)"""
+
+    def __init__(self, bot, max_age=DEFAULT_MAX_AGE):
+        self.bot = bot
+        self.max_age = max_age
+        self.balances = {}      # 자산 -> Balance
+        self.updated_at = 0.0   # 마지막 갱신 시각 (monotonic)
+        self.streaming = False  # WebSocket 잔고 이벤트 반영 중 여부
+        self.listeners = []     # 변화 발생 시 호출할 함수 (changes, balances)
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """잔고 변화 리스너 등록: listener(changes, balances)"""
+        self.listeners.append(listener)
+
+    def invalidate(self):
+        """주문 접수/취소 후 다음 조회에서 새로 받도록 만료 처리"""
+        with self._lock:
+            self.updated_at = 0.0
+
+    def refresh(self):
+        """REST 로 전체 잔고 갱신 (성공 여부 반환)"""
+        with self._lock:
+            changes = self._refresh_locked()
+            balances = self.balances
+        if changes is None:
+            return False
+        self._notify(changes, balances)
+        return True
+
+    def _refresh_locked(self):
+        """조회 후 인덱스 교체 (변화량 반환, 조회 실패 시 None)"""
+        balances = self.bot.get_balances()
+        metrics.registry.inc('balance_refresh', result='ok' if balances is not None else 'error')
+        if balances is None:
+            return None
+        changes = self._replace_locked(balances)
+        get_ledger().record_balances(list(balances.values()))  # 잔고 스냅샷 원장 기록
+        return changes
+
+    def _replace_locked(self, balances):
+        changes = diff(self.balances, balances) if self.balances else {}  # 최초 조회는 변화 아님
+        self.balances = balances
+        self.updated_at = time.monotonic()
+        return changes
+
+    def _notify(self, changes, balances):
+        """변화 리스너 호출 (잠금 밖에서: 리스너가 잔고를 다시 조회해도 교착되지 않음)"""
+        if not changes:
+            return
+        event_log.log('balance_changed', level='debug', changes=changes)
+        for listener in self.listeners:
+            try:
+                listener(changes, balances)
+            except Exception as e:
+                event_log.log('balance_listener_error', level='error', error=str(e))
+
+    def apply_update(self, items):
+        """
+        WebSocket 잔고 이벤트 반영 (스트리밍 모드)
+
+        Args:
+            items (list): /v2/balance 응답 항목과 같은 형식의 변경된 자산 목록
+        """
+        with self._lock:
+            balances = dict(self.balances)
+            for item in items:
+                balance = Balance.from_api(item)
+                balances[balance.currency] = balance
+            self.streaming = True
+            changes = self._replace_locked(balances)
+        self._notify(changes, balances)
+
+    def stop_streaming(self):
+        """WebSocket 연결이 끊기면 REST 조회 주기로 복귀"""
+        with self._lock:
+            self.streaming = False
+            self.updated_at = 0.0
+
+    def snapshot(self, max_age=None):
+        """
+        전체 잔고 인덱스 조회 (유효하면 요청 없이 반환)
+
+        Returns:
+            dict: 자산 -> Balance (조회 실패 시 None)
+        """
+        if max_age is None:
+            max_age = STREAM_MAX_AGE if self.streaming else self.max_age
+        changes = None
+        with self._lock:
+            if time.monotonic() - self.updated_at > max_age:
+                changes = self._refresh_locked()
+                if changes is None:
+                    return None
+            balances = self.balances
+        self._notify(changes, balances)
+        return balances
+
+    def get(self, currency, max_age=None):
+        """
+        특정 자산 잔고 조회
+
+        Returns:
+            Balance: 잔고 (보유하지 않은 자산이면 0 잔고, 조회 실패 시 None)
+        """
+        balances = self.snapshot(max_age)
+        if balances is None:
+            return None
+        currency = currency.lower()
+        return balances.get(currency) or Balance(currency, 0, 0, 0, 0)
+
+
+def balance_strings(balance):
+    """표시용 (보유량, 사용가능, 거래중, 출금중) 문자열"""
+    decimals = currency_decimals(balance.currency)
+    return tuple(format_units(getattr(balance, field), decimals) for field in _FIELDS)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_balance_service():
+    """프로세스 전역 잔고 서비스 (메뉴와 매매 루프가 공유)"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                from c_buy_and_sell import TradingBot
+                _service = BalanceService(TradingBot())
+    return _service
+
+
+def invalidate():
+    """전역 잔고 서비스가 있으면 만료 처리 (주문 접수/취소 후 호출)"""
+    if _service is not None:
+        _service.invalidate()
@@ -0,0 +1,632 @@
+import os
+import sys
+import json
+import time
+import socket
+import struct
+import base64
+import hashlib
+import argparse
+import threading
+import statistics
+import subprocess
+from datetime import datetime
+
+# 성능 측정 스크립트
+#   python benchmark.py startup [--repeat 5] [--save bench_history.jsonl]
+#   python benchmark.py indicators [--repeat 5]
+#   python benchmark.py jit [--repeat 5]
+#   python benchmark.py kernels
+#   python benchmark.py ledger [--repeat 5]
+#   python benchmark.py userstream [--repeat 5]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 콜드 스타트를 측정할 진입 모듈
+STARTUP_MODULES = ['daemon', 'ab_all']
+
+
+def measure_import(module, repeat=5):
+    """새 인터프리터에서 모듈 import 에 걸리는 시간(초) 목록 측정"""
+    code = (
+        "import time; t0 = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - t0)"
+    )
+    samples = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=HERE, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"{module} import 실패:\n{result.stderr}")
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def bench_startup(repeat=5):
+    """진입 모듈별 콜드 스타트 시간 측정"""
+    results = {}
+    for module in STARTUP_MODULES:
+        try:
+            samples = measure_import(module, repeat)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            continue
+        results[module] = {
+            'min_ms': min(samples) * 1000,
+            'median_ms': statistics.median(samples) * 1000,
+        }
+        print(f"{module:<12} min {results[module]['min_ms']:8.1f} ms | "
+              f"median {results[module]['median_ms']:8.1f} ms")
+    return results
+
+
+# 지표 커널 벤치마크: 배치 크기(종목 수) x 봉 개수
+INDICATOR_BATCH_SIZES = [1, 10, 100, 1000]
+INDICATOR_LENGTH = 500
+INDICATOR_TOLERANCE = 1e-9
+
+
+def best_time(fn, repeat=5):
+    """fn 실행 시간(초) 최솟값"""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return min(samples)
+
+
+def _pandas_indicators(signals, closes):
+    """기존 pandas 구현 (BinanceTechnicalSignals.calculate_*) 으로 행마다 계산"""
+    import pandas as pd
+    results = []
+    for row in closes:
+        prices = pd.Series(row)
+        macd_line, signal_line = signals.calculate_macd(prices)
+        results.append((signals.calculate_rsi(prices, 14).values,
+                        signals.calculate_ema(prices, 20).values,
+                        macd_line.values, signal_line.values))
+    return results
+
+
+def _batch_indicators(closes):
+    import indicators
+    macd_line, signal_line = indicators.macd(closes)
+    return indicators.rsi(closes, 14), indicators.ema(closes, 20), macd_line, signal_line
+
+
+def bench_indicators(repeat=5):
+    """2차원 배치 커널 vs 종목별 pandas 계산 (일치 여부 + 종목당 비용)"""
+    import numpy as np
+    from impo_algo import BinanceTechnicalSignals
+
+    signals = BinanceTechnicalSignals.__new__(BinanceTechnicalSignals)  # 지표 메서드만 사용
+    rng = np.random.default_rng(0)
+    closes = 100 + np.cumsum(rng.normal(size=(max(INDICATOR_BATCH_SIZES), INDICATOR_LENGTH)), axis=1)
+
+    # 일치 여부 확인 (NaN 위치 포함)
+    sample = closes[:20]
+    batch = _batch_indicators(sample)
+    max_diff = 0.0
+    for i, reference in enumerate(_pandas_indicators(signals, sample)):
+        for ours, theirs in zip(batch, reference):
+            if not np.array_equal(np.isnan(ours[i]), np.isnan(theirs)):
+                max_diff = float('inf')
+            else:
+                max_diff = max(max_diff, float(np.nanmax(np.abs(ours[i] - theirs))))
+    status = '✅' if max_diff <= INDICATOR_TOLERANCE else '❌'
+    print(f"{status} pandas 구현 대비 최대 오차: {max_diff:.2e}")
+
+    results = {'max_abs_diff': max_diff}
+    for size in INDICATOR_BATCH_SIZES:
+        batch_closes = closes[:size]
+        batch_seconds = best_time(lambda: _batch_indicators(batch_closes), repeat)
+        # pandas 는 종목당 비용이 일정하므로 최대 100종목까지만 측정
+        pandas_closes = closes[:min(size, 100)]
+        pandas_seconds = best_time(lambda: _pandas_indicators(signals, pandas_closes), repeat)
+
+        batch_us = batch_seconds / size * 1e6
+        pandas_us = pandas_seconds / len(pandas_closes) * 1e6
+        results[size] = {
+            'batch_per_symbol_us': batch_us,
+            'pandas_per_symbol_us': pandas_us,
+            'speedup': pandas_us / batch_us,
+        }
+        print(f"{size:>5}종목 x {INDICATOR_LENGTH}봉 | 배치 {batch_us:9.1f} us/종목 | "
+              f"pandas {pandas_us:9.1f} us/종목 | {pandas_us / batch_us:6.1f}x")
+    return results
+
+
+# JIT 벤치마크: 다년간 1분봉 (2년 = 약 105만 봉)
+JIT_YEARS = 2
+JIT_BARS = JIT_YEARS * 365 * 24 * 60
+
+
+def _jit_workloads(closes):
+    """재귀 루프 작업 목록: 이름 -> (인자 없는 함수)"""
+    import indicators
+    import backtest
+    from fixed_point import to_units_array, scale_for
+
+    actions, confidence = backtest.signals_from_closes(closes)
+    price_units = to_units_array(closes, scale_for('btc_krw').price_decimals)
+    return {
+        'ema20': lambda: indicators.ema(closes, 20),
+        'rsi_wilder14': lambda: indicators.rsi(closes, 14, method='wilder'),
+        'backtest': lambda: backtest.run_backtest(price_units, actions, confidence, initial_cash=10_000_000),
+    }
+
+
+def _same_output(a, b):
+    """두 백엔드 결과 일치 여부 (지표는 1e-9 이내, 백테스트는 정수 완전 일치)"""
+    import numpy as np
+    if hasattr(a, 'equity'):
+        return (a.trades == b.trades and np.array_equal(a.cash, b.cash)
+                and np.array_equal(a.qty, b.qty))
+    return np.allclose(a, b, rtol=0, atol=1e-9, equal_nan=True)
+
+
+def bench_jit(repeat=5):
+    """numba JIT 경로 vs NumPy/파이썬 경로 (결과 일치 + 속도)"""
+    import numpy as np
+    import pandas as pd
+    import indicators
+
+    rng = np.random.default_rng(0)
+    closes = 90_000_000 * np.exp(np.cumsum(rng.normal(0, 0.001, size=JIT_BARS)))
+    print(f"데이터: 1분봉 {JIT_BARS:,}개 ({JIT_YEARS}년)")
+
+    # NumPy 경로 기준값 검증 (pandas 와 일치)
+    indicators.set_backend('numpy')
+    reference = pd.Series(closes).ewm(span=20, adjust=False).mean().values
+    status = '✅' if np.allclose(indicators.ema(closes, 20), reference, rtol=1e-12) else '❌'
+    print(f"{status} NumPy EMA vs pandas")
+
+    backends = ['numpy'] + (['numba'] if indicators.JIT_AVAILABLE else [])
+    if not indicators.JIT_AVAILABLE:
+        print("⚠️ numba 가 설치되어 있지 않아 NumPy 경로만 측정합니다. (pip install numba)")
+
+    results = {}
+    outputs = {}
+    try:
+        for backend in backends:
+            indicators.set_backend(backend)
+            workloads = _jit_workloads(closes)
+            for name, fn in workloads.items():
+                outputs[(backend, name)] = fn()  # JIT 컴파일/워밍업 (측정 제외)
+                # 느린 경로는 한 번 실행에 수 초가 걸리므로 반복 횟수 제한
+                seconds = best_time(fn, min(repeat, 2) if backend == 'numpy' else repeat)
+                results.setdefault(name, {})[f"{backend}_s"] = seconds
+    finally:
+        indicators.set_backend('numba' if indicators.JIT_AVAILABLE else 'numpy')
+
+    for name, timing in results.items():
+        line = f"{name:<14} numpy {timing['numpy_s']:8.3f}s"
+        if 'numba_s' in timing:
+            same = _same_output(outputs[('numpy', name)], outputs[('numba', name)])
+            timing['speedup'] = timing['numpy_s'] / timing['numba_s']
+            timing['equivalent'] = same
+            line += (f" | numba {timing['numba_s']:8.3f}s | {timing['speedup']:7.1f}x | "
+                     f"{'✅ 일치' if same else '❌ 불일치'}")
+        print(line)
+    return results
+
+
+# 커널 동치 확인 (numba 없이도 실행, 고정 시드)
+KERNEL_ROWS = 3
+KERNEL_BARS = 3000
+KERNEL_ALPHAS = (2 / 21, 1 / 14, 2 / 27)   # ema20, wilder14, macd 느린 선
+
+
+def _kernel_inputs():
+    """중간 NaN, 앞쪽 워밍업 NaN, 상수 구간을 포함한 결정적 입력"""
+    import numpy as np
+    rng = np.random.default_rng(42)
+    closes = 90_000_000 * np.exp(np.cumsum(rng.normal(0, 0.002, size=(KERNEL_ROWS, KERNEL_BARS)), axis=1))
+    gappy = closes.copy()
+    gappy[0, :50] = np.nan
+    gappy[1, rng.choice(KERNEL_BARS, 100, replace=False)] = np.nan
+    gappy[2, 1000:1010] = np.nan
+    gappy[2, 2000:2100] = gappy[2, 1999]
+    return closes, gappy
+
+
+def bench_kernels(repeat=1):
+    """
+    재귀 커널을 직접 호출해 pandas/파이썬 기준 구현과 비교 (numba 미설치 환경에서도 동작)
+
+    numba 가 컴파일할 원본 파이썬 함수(_ewm_kernel, _simulate)를 같은 int64/float64 배열로
+    실행하므로 JIT 없이도 커널 논리를 확인할 수 있고, numba 가 있으면 컴파일본도 함께 비교한다.
+    """
+    import numpy as np
+    import pandas as pd
+    import indicators
+    import backtest
+    from fixed_point import to_units_array, scale_for, KRW_DECIMALS
+
+    closes, gappy = _kernel_inputs()
+    alpha = np.array(KERNEL_ALPHAS)
+    results = {}
+
+    def report(name, ok, detail=''):
+        results[name] = bool(ok)
+        print(f"{'✅' if ok else '❌'} {name}{detail}")
+
+    # 1. ewm: 커널 직접 호출 vs pandas (adjust=False, ignore_na=False)
+    for label, values in (('dense', closes), ('gaps', gappy)):
+        reference = np.vstack([pd.Series(row).ewm(alpha=a, adjust=False).mean().values
+                               for row, a in zip(values, alpha)])
+        candidates = {'_ewm_kernel': indicators._ewm_kernel, '_ewm_numpy': indicators._ewm_numpy}
+        if label == 'dense':
+            candidates['_ewm_numpy_dense'] = indicators._ewm_numpy_dense
+        if indicators.JIT_AVAILABLE:
+            candidates['_ewm_kernel_jit'] = indicators._ewm_kernel_jit
+        for name, kernel in candidates.items():
+            out = np.empty_like(values)
+            kernel(np.ascontiguousarray(values), alpha, out)
+            same_nan = np.array_equal(np.isnan(out), np.isnan(reference))
+            diff = float(np.nanmax(np.abs(out - reference) / np.abs(reference))) if same_nan else float('inf')
+            report(f"{name} vs pandas ({label})", diff <= 1e-12, f"  상대 오차 {diff:.1e}")
+
+    # 2. 백테스트 상태 전이: int64 배열 입력(numba 와 같은 타입) vs 파이썬 정수 리스트 경로
+    symbol = 'btc_krw'
+    scale = scale_for(symbol)
+    divisor = scale.price_scale * scale.qty_scale // 10 ** KRW_DECIMALS
+    rng = np.random.default_rng(7)
+    for row in range(KERNEL_ROWS):
+        # 매매가 충분히 일어나도록 무작위 신호 사용 (규칙 평가는 indicators 벤치마크에서 확인)
+        actions = rng.choice(np.array([-1, 0, 1], dtype=np.int8), size=KERNEL_BARS)
+        confidence = rng.uniform(0.5, 1.0, size=KERNEL_BARS)
+        prices = to_units_array(closes[row], scale.price_decimals)
+        args = (10_000_000, 0, divisor, scale.lot_units, 0.4, 0.6, 0.7, 5000)
+        expected_cash, expected_qty = [0] * len(prices), [0] * len(prices)
+        expected = backtest._simulate(prices.tolist(), actions.tolist(), confidence.tolist(), *args,
+                                      expected_cash, expected_qty)
+        kernels = {'_simulate(int64)': backtest._simulate}
+        if indicators.JIT_AVAILABLE:
+            kernels['_simulate_jit'] = backtest._simulate_jit
+        for name, kernel in kernels.items():
+            cash = np.empty(len(prices), dtype=np.int64)
+            qty = np.empty(len(prices), dtype=np.int64)
+            with np.errstate(over='raise'):
+                trades = kernel(prices, actions, confidence, *args, cash, qty)
+            ok = (trades == expected and np.array_equal(cash, expected_cash)
+                  and np.array_equal(qty, expected_qty))
+            report(f"{name} vs 파이썬 정수 (행 {row})", ok, f"  매매 {int(trades)}회")
+
+    # 3. int64 범위 보호: 넘칠 수 있는 입력은 감긴 값 대신 OverflowError
+    actions, confidence = backtest.signals_from_closes(closes[0])
+    prices = to_units_array(closes[0], scale.price_decimals)
+    try:
+        backtest.run_backtest(prices, actions, confidence, symbol=symbol,
+                              initial_qty=backtest.INT64_MAX // int(prices.min()))
+        report('int64 범위 보호', False)
+    except OverflowError:
+        report('int64 범위 보호', True)
+
+    results['passed'] = all(results.values())
+    return results
+
+
+LEDGER_ORDERS = 10_000
+
+
+def _ledger_order(order_id, status, filled_qty, filled_amt):
+    from models import Order
+    return Order.from_api({'symbol': 'btc_krw', 'orderId': order_id, 'side': 'buy', 'orderType': 'market',
+                           'status': status, 'filledQty': filled_qty, 'filledAmt': filled_amt})
+
+
+def bench_ledger(repeat=5):
+    """원장 체결 반영 순서 확인 (늦게 도착한 응답) + record_order 처리량"""
+    from ledger import Ledger
+
+    results = {}
+
+    def check(name, ok, detail=''):
+        results[name] = bool(ok)
+        print(f"{'✅' if ok else '❌'} {name}{detail}")
+
+    # WebSocket 완료 이벤트 -> 늦게 도착한 주문 접수 응답(체결 0) -> REST 확인 조회
+    ledger = Ledger(':memory:')
+    try:
+        ledger.record_order(_ledger_order(1, 'filled', '0.001', '100000'))
+        ledger.record_order(_ledger_order(1, 'open', '0', '0'))
+        ledger.record_order(_ledger_order(1, 'filled', '0.001', '100000'))
+        ledger.flush()
+        fills = ledger._query("SELECT COUNT(*) FROM fills WHERE order_id = 1", ())[0][0]
+        row = ledger._query("SELECT filled_qty FROM orders WHERE order_id = 1", ())[0]
+        position = ledger.pnl('btc_krw')
+        check('stale_snapshot_ignored', fills == 1 and position['qty'] == 100000 and row[0] == 100000,
+              f"  체결 {fills}건, 보유 {position['qty']}")
+
+        # 부분 체결 후 완료: 증가분만 기록
+        ledger.record_order(_ledger_order(2, 'partiallyFilled', '0.0004', '40000'))
+        ledger.record_order(_ledger_order(2, 'partiallyFilledCanceled', '0.0006', '60000'))
+        ledger.flush()
+        fills = ledger._query("SELECT SUM(qty) FROM fills WHERE order_id = 2", ())[0][0]
+        check('partial_fill_increments', fills == 60000 and 2 not in ledger._filled)
+    finally:
+        ledger.close()
+
+    # 처리량: 주문당 부분 체결 -> 완료 2회 반영
+    def run():
+        bench = Ledger(':memory:')
+        try:
+            for order_id in range(LEDGER_ORDERS):
+                bench.record_order(_ledger_order(order_id, 'partiallyFilled', '0.0005', '50000'))
+                bench.record_order(_ledger_order(order_id, 'filled', '0.001', '100000'))
+            bench.flush()
+        finally:
+            bench.close()
+
+    seconds = best_time(run, repeat)
+    results['record_order_us'] = seconds / (2 * LEDGER_ORDERS) * 1e6
+    print(f"record_order {results['record_order_us']:.1f} us/건 ({LEDGER_ORDERS:,}개 주문 x 2회)")
+    results['passed'] = all(value for key, value in results.items() if isinstance(value, bool))
+    return results
+
+
+class FakeUserStreamServer:
+    """사용자 데이터 스트림 점검용 로컬 WebSocket 서버 (텍스트 프레임, ping/pong 만 지원)"""
+
+    _GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+    def __init__(self):
+        self.sock = socket.socket()
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(5)
+        self.url = f"ws://127.0.0.1:{self.sock.getsockname()[1]}/v2/private"
+        self.clients = []
+        self.received = []        # 클라이언트가 보낸 JSON 메시지
+        self.handshakes = []      # 접속 요청 줄 (서명 쿼리 확인용)
+        self._cond = threading.Condition()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            request = b''
+            while b'\r\n\r\n' not in request:
+                request += client.recv(4096)
+            lines = request.decode().split('\r\n')
+            key = next(line.split(':', 1)[1].strip() for line in lines
+                       if line.lower().startswith('sec-websocket-key'))
+            accept = base64.b64encode(hashlib.sha1((key + self._GUID).encode()).digest()).decode()
+            client.sendall((f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                            f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+            with self._cond:
+                self.handshakes.append(lines[0])
+                self.clients.append(client)
+                self._cond.notify_all()
+            threading.Thread(target=self._read, args=(client,), daemon=True).start()
+
+    def _recv_exact(self, client, size):
+        data = b''
+        while len(data) < size:
+            chunk = client.recv(size - len(data))
+            if not chunk:
+                raise OSError("연결 종료")
+            data += chunk
+        return data
+
+    def _read(self, client):
+        try:
+            while True:
+                head = self._recv_exact(client, 2)
+                opcode, size = head[0] & 0x0F, head[1] & 0x7F
+                if size == 126:
+                    size = struct.unpack('>H', self._recv_exact(client, 2))[0]
+                elif size == 127:
+                    size = struct.unpack('>Q', self._recv_exact(client, 8))[0]
+                mask = self._recv_exact(client, 4)
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._recv_exact(client, size)))
+                if opcode == 0x1:
+                    with self._cond:
+                        self.received.extend(json.loads(payload))
+                        self._cond.notify_all()
+                elif opcode == 0x9:
+                    client.sendall(bytes([0x8A, len(payload)]) + payload)
+                elif opcode == 0x8:
+                    client.sendall(bytes([0x88, len(payload)]) + payload)  # 종료 응답
+                    client.close()
+                    return
+        except OSError:
+            pass
+
+    def wait(self, predicate, timeout=5.0):
+        """조건이 참이 될 때까지 대기"""
+        with self._cond:
+            return self._cond.wait_for(predicate, timeout)
+
+    def send(self, message):
+        """마지막 접속 클라이언트에 JSON 텍스트 프레임 전송"""
+        data = json.dumps(message).encode()
+        if len(data) < 126:
+            header = bytes([0x81, len(data)])
+        else:
+            header = bytes([0x81, 126]) + struct.pack('>H', len(data))
+        self.clients[-1].sendall(header + data)
+
+    def drop(self):
+        """마지막 접속을 끊음 (재연결/재동기화 확인용)"""
+        client = self.clients[-1]
+        client.shutdown(socket.SHUT_RDWR)
+        client.close()
+
+    def close(self):
+        self.sock.close()
+
+
+class _FakeStreamBot:
+    """재동기화 REST 호출을 흉내 내는 TradingBot 대역"""
+
+    api_key = 'bench'
+
+    def __init__(self):
+        self.orders = {}     # 주문 ID -> REST 조회 시 돌려줄 응답
+        self.balances = {'krw': {'currency': 'krw', 'balance': '1000000', 'available': '1000000'}}
+        self.calls = {'open_orders': 0, 'order_status': 0, 'balances': 0}
+
+    def create_signature(self, query):
+        return hashlib.sha256(query.encode()).hexdigest()
+
+    def get_open_orders(self, symbol):
+        from models import Order
+        self.calls['open_orders'] += 1
+        return [Order.from_api(item) for item in self.orders.values()
+                if item['symbol'] == symbol and item['status'] in ('open', 'partiallyFilled')]
+
+    def get_order_status(self, symbol, order_id=None, client_order_id=None):
+        from models import Order
+        self.calls['order_status'] += 1
+        item = self.orders.get(order_id)
+        return Order.from_api(item) if item else None
+
+    def get_balances(self):
+        from models import Balance
+        self.calls['balances'] += 1
+        return {item['currency']: Balance.from_api(item) for item in self.balances.values()}
+
+
+def _poll(predicate, timeout=5.0):
+    """다른 스레드에서 바뀌는 상태를 조건이 참이 될 때까지 확인"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def _order_message(order_id, status, filled_qty):
+    return {'type': 'myOrder', 'symbol': 'btc_krw',
+            'data': [{'orderId': order_id, 'side': 'buy', 'orderType': 'market', 'status': status,
+                      'qty': '0.001', 'filledQty': filled_qty, 'filledAmt': '100000'}]}
+
+
+def bench_userstream(repeat=5):
+    """로컬 가짜 서버로 사용자 데이터 스트림 점검 (구독, 주문 완료 대기, 재연결 재동기화, 잔고 반영)"""
+    import ledger
+    import user_stream
+    from balance_service import BalanceService
+
+    if not user_stream.STREAM_AVAILABLE:
+        print("⚠️ websocket-client 가 설치되어 있지 않아 건너뜁니다. (pip install websocket-client)")
+        return {}
+    ledger.use_path(':memory:')  # 가짜 체결이 실제 원장에 기록되지 않도록
+
+    server = FakeUserStreamServer()
+    bot = _FakeStreamBot()
+    balances = BalanceService(bot)
+    stream = user_stream.UserDataStream(bot, ['btc_krw'], server.url, balances=balances)
+    results = {}
+    checks = {}
+
+    def check(name, ok):
+        checks[name] = bool(ok)
+        print(f"{'✅' if ok else '❌'} {name}")
+
+    try:
+        # 1. 접속 + 구독 + 접속 직후 재동기화
+        t0 = time.perf_counter()
+        stream.start()
+        subscribed = server.wait(lambda: len(server.received) >= 3)
+        results['subscribe_s'] = time.perf_counter() - t0
+        channels = {message.get('type') for message in server.received}
+        check('subscribe', subscribed and channels == {'myOrder', 'myTrade', 'myAsset'}
+              and 'signature=' in server.handshakes[0])
+        check('resync_on_connect', _poll(lambda: bot.calls['balances'] >= 1))
+
+        # 2. 주문 이벤트 -> wait_for (폴링 없이 완료 확인)
+        latencies = []
+        status_calls = bot.calls['order_status']
+        for i in range(repeat):
+            order_id = 1000 + i
+            t0 = time.perf_counter()
+            server.send(_order_message(order_id, 'filled', '0.001'))
+            done = stream.wait_for(order_id, timeout=2.0)
+            latencies.append(time.perf_counter() - t0)
+            if done is None or done.status != 'filled':
+                break
+            stream.forget(order_id)
+        results['wait_for_ms'] = statistics.median(latencies) * 1000
+        check('order_wait_for', len(latencies) == repeat and done is not None
+              and bot.calls['order_status'] == status_calls)
+
+        # 3. 자산 이벤트 -> BalanceService (REST 조회 없이 반영)
+        balance_calls = bot.calls['balances']
+        server.send({'type': 'myAsset', 'data': [{'currency': 'btc', 'balance': '0.5', 'available': '0.5'}]})
+        _poll(lambda: 'btc' in balances.balances, timeout=2.0)
+        btc = balances.get('btc')
+        check('asset_to_balance_service', balances.streaming and btc.balance > 0
+              and bot.calls['balances'] == balance_calls)
+
+        # 4. 연결 끊김 동안 완료된 주문 -> 재연결 후 REST 재동기화
+        server.send(_order_message(2000, 'partiallyFilled', '0.0005'))
+        _poll(lambda: 2000 in stream.orders, timeout=2.0)
+        bot.orders[2000] = {**_order_message(2000, 'filled', '0.001')['data'][0], 'symbol': 'btc_krw'}
+        t0 = time.perf_counter()
+        server.drop()
+        resynced = _poll(lambda: getattr(stream.orders.get(2000), 'status', None) == 'filled', timeout=10.0)
+        results['reconnect_resync_s'] = time.perf_counter() - t0
+        check('disconnect_resync', resynced and len(server.handshakes) >= 2)
+    finally:
+        stream.stop()
+        server.close()
+
+    print(f"구독 {results['subscribe_s'] * 1000:.1f}ms | 주문 완료 대기 중앙값 {results['wait_for_ms']:.2f}ms"
+          + (f" | 재연결 재동기화 {results['reconnect_resync_s']:.2f}s" if 'reconnect_resync_s' in results else ""))
+    results['checks'] = checks
+    results['passed'] = all(checks.values())
+    return results
+
+
+def save_result(path, name, results):
+    """측정 결과를 JSON lines 파일에 누적 저장 (추이 추적용)"""
+    record = {
+        'benchmark': name,
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+BENCHMARKS = {
+    'startup': bench_startup,
+    'indicators': bench_indicators,
+    'jit': bench_jit,
+    'kernels': bench_kernels,
+    'ledger': bench_ledger,
+    'userstream': bench_userstream,
+}
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description='성능 측정')
+    parser.add_argument('name', choices=sorted(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save', help='결과를 누적 저장할 JSON lines 파일')
+    args = parser.parse_args()
+
+    print(f"⏱️ {args.name} 벤치마크 (반복 {args.repeat}회)")
+    t0 = time.perf_counter()
+    results = BENCHMARKS[args.name](repeat=args.repeat)
+    print(f"총 소요: {time.perf_counter() - t0:.1f}s")
+
+    if args.save:
+        save_result(args.save, args.name, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,30 @@
-import requests
+import a_base
+import event_log
 import pandas as pd
 import numpy as np
-import time
-from datetime import datetime
 import hmac
 import hashlib
 from urllib.parse import urlencode
+from scheduler import CandleScheduler
+from rules import RuleSet, DEFAULT_RULES
+
+def _render_signal(record):
+    """signal 이벤트 콘솔 출력"""
+    # 신호별 이모지
+    signal_emoji = {
+        "buy": "🟢",
+        "sell": "🔴", 
+        "hold": "🟡"
+    }
+    
+    emoji = signal_emoji.get(record['signal'], "⚪")
+    timestamp = event_log.format_time(record)
+    
+    return (f"{emoji} {timestamp} | {record['symbol']:>10} | {record['signal'].upper():>4} | "
+            f"${record['price']:>10.4f} | {record['reason']}")
+
+
+event_log.register_renderer('signal', _render_signal)
 
 class BinanceTradingSignals:
     """Binance API를 사용한 기술적 지표 기반 매매 신호 생성"""
@@ -27,6 +46,12 @@ class BinanceTradingSignals:
         
         # 거래할 코인 심볼들
         self.symbols = ['BTCUSDT', 'ETHUSDT', 'ADAUSDT']
+
+        # 1분봉 마감 1초 후마다 스캔 (스캔 소요 시간과 무관하게 주기 고정)
+        self.scheduler = CandleScheduler('1m', offset=1.0)
+
+        # 매매 규칙 (impo_algo 자동매매와 같은 기본 규칙)
+        self.rules = RuleSet(DEFAULT_RULES)
         
     def get_klines(self, symbol, interval='1m', limit=100):
         """Binance에서 캔들스틱 데이터 가져오기"""
@@ -38,7 +63,7 @@ class BinanceTradingSignals:
                 'limit': limit
             }
             
-            response = requests.get(url, params=params)
+            response = a_base.transport.get(url, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -107,53 +132,25 @@ class BinanceTradingSignals:
             if len(df) < 50:  # 충분한 데이터가 없으면
                 return "hold", "데이터 부족"
             
-            # 기술적 지표 계산
-            rsi = self.calculate_rsi(df['close'], 14)
-            ema20 = self.calculate_ema(df['close'], 20)
-            macd_line, signal_line = self.calculate_macd(df['close'])
-            
-            if rsi is None or ema20 is None or macd_line is None or signal_line is None:
-                return "hold", "지표 계산 실패"
+            # 매매 규칙 일괄 평가 후 마지막 봉 결과 사용
+            values = self.rules.evaluate(df['close'].values)
             
-            # 최신 값들
-            current_rsi = rsi.iloc[-1]
-            current_close = df['close'].iloc[-1]
-            current_ema = ema20.iloc[-1]
-            current_macd = macd_line.iloc[-1]
-            current_signal = signal_line.iloc[-1]
+            if values['buy'][-1]:
+                return "buy", self.rules.describe(values, 'buy')
             
-            # 매매 신호 조건 확인
-            if (current_rsi < 30 and 
-                current_macd > current_signal and 
-                current_close > current_ema):
-                return "buy", f"RSI: {current_rsi:.2f}, MACD > Signal, Close > EMA20"
-            
-            elif (current_rsi > 70 and 
-                  current_macd < current_signal and 
-                  current_close < current_ema):
-                return "sell", f"RSI: {current_rsi:.2f}, MACD < Signal, Close < EMA20"
+            elif values['sell'][-1]:
+                return "sell", self.rules.describe(values, 'sell')
             
             else:
-                return "hold", f"RSI: {current_rsi:.2f}, MACD: {current_macd:.6f}, Signal: {current_signal:.6f}"
+                return "hold", self.rules.describe(values)
                 
         except Exception as e:
             print(f"❌ 신호 생성 오류: {e}")
             return "hold", f"오류: {e}"
     
     def print_signal(self, symbol, signal, reason, current_price):
-        """신호 출력"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # 신호별 이모지
-        signal_emoji = {
-            "buy": "🟢",
-            "sell": "🔴", 
-            "hold": "🟡"
-        }
-        
-        emoji = signal_emoji.get(signal, "⚪")
-        
-        print(f"{emoji} {timestamp} | {symbol:>10} | {signal.upper():>4} | ${current_price:>10.4f} | {reason}")
+        """신호 기록 (콘솔 출력은 event_log 콘솔 싱크가 담당)"""
+        event_log.log('signal', symbol=symbol, signal=signal, reason=reason, price=current_price)
     
     def run_trading_signals(self):
         """매매 신호 루프 실행"""
@@ -162,7 +159,7 @@ class BinanceTradingSignals:
         print(f"{'시간':<20} {'심볼':<12} {'신호':<6} {'현재가':<12} {'근거'}")
         print("=" * 80)
         
-        while True:
+        while not self.scheduler.stopped:
             try:
                 for symbol in self.symbols:
                     # 1분봉 데이터 가져오기
@@ -177,21 +174,27 @@ class BinanceTradingSignals:
                         
                         # 신호 출력
                         self.print_signal(symbol, signal, reason, current_price)
-                    
-                    # API 호출 제한을 위한 짧은 대기
-                    time.sleep(0.1)
+
+                    # API 호출 제한은 a_base 전송 계층의 속도 제한이 담당
+                    if self.scheduler.stopped:
+                        break
                 
+                event_log.flush()
                 print("-" * 80)
                 
-                # 1분 대기
-                time.sleep(60)
+                # 다음 1분봉 마감까지 대기
+                self.scheduler.wait_next()
                 
             except KeyboardInterrupt:
                 print("\n👋 프로그램이 사용자에 의해 중단되었습니다.")
                 break
             except Exception as e:
                 print(f"❌ 예상치 못한 오류: {e}")
-                time.sleep(60)  # 오류 발생시 1분 대기
+                self.scheduler.wait_next()  # 오류 발생시 다음 캔들까지 대기
+
+    def stop(self):
+        """매매 신호 루프 중지 (대기 중이어도 즉시 반영)"""
+        self.scheduler.stop()
 
 def main():
     """메인 실행 함수"""
@@ -1,8 +1,20 @@
 import a_base
 import time
+import event_log
+from models import Order, Ticker, Balance
+from fixed_point import scale_for, krw_str, parse_units, KRW_DECIMALS
+from symbol_registry import get_registry
+from market_snapshot import get_snapshot
+from ledger import get_ledger
+from order_journal import get_journal
+import balance_service
+import korbit_view
 from urllib.parse import urlencode
-from datetime import datetime
-from impo_algo import AITradingStrategy, BinanceTechnicalSignals
+
+# lookup_order 결과 구분
+ORDER_FOUND = 'found'
+ORDER_NOT_FOUND = 'not_found'          # 거래소가 주문이 없다고 응답
+ORDER_LOOKUP_FAILED = 'lookup_failed'  # 시간 초과/5xx 등으로 확인하지 못함
 
 # 매매하는 코드
 
@@ -14,12 +26,8 @@ class TradingBot:
         self.api_key = a_base.api_key
         self.api_secret = a_base.api_secret
 
-        # 지원하는 거래쌍
-        self.supported_symbols = {
-            1: 'btc_krw',
-            2: 'eth_krw',
-            3: 'usdt_krw'
-        }
+        # 거래쌍/호가 단위/최소 주문 금액은 거래소 메타데이터 레지스트리에서 조회
+        self.registry = get_registry()
 
         # 주문 타입
         self.order_types = {
@@ -52,7 +60,10 @@ class TradingBot:
             amt (str): 주문 대금 (KRW 단위, 시장가 매수시 사용)
             order_type (str): 주문 타입 ('limit', 'market', 'best')
             time_in_force (str): 주문 취소 조건
-            client_order_id (str): 사용자 지정 주문 ID (선택사항)
+            client_order_id (str): 사용자 지정 주문 ID (선택사항, 없으면 생성)
+
+        Returns:
+            Order: 접수된 주문 (실패 시 None, 사유는 event_log 에 기록)
         """
         timestamp = int(time.time() * 1000)
 
@@ -87,9 +98,16 @@ class TradingBot:
         else:
             raise ValueError("qty 또는 amt 중 하나는 필수입니다.")
 
-        # 사용자 지정 주문 ID
-        if client_order_id:
-            params["clientOrderId"] = client_order_id
+        # 거래소 규칙 사전 검증 (거절될 주문은 전송하지 않음)
+        reject_reason = self.validate_order(symbol, side, price, qty, amt)
+        if reject_reason:
+            event_log.log('order_rejected', level='warning', symbol=symbol, side=side, message=reject_reason)
+            return None
+
+        # 주문 의도 선기록 (전송 중 종료되어도 재시작 시 clientOrderId 로 결과 확인)
+        journal = get_journal()
+        client_order_id = journal.intent(symbol, side, dict(params), client_order_id)
+        params["clientOrderId"] = client_order_id
 
         # 서명 생성
         query_string = urlencode(params)
@@ -105,31 +123,65 @@ class TradingBot:
         url = f"{self.base_url}/v2/orders"
 
         try:
-            response = a_base.requests.post(url, headers=headers, data=params)
+            response = a_base.transport.post(url, headers=headers, data=params)
             response.raise_for_status()
 
             result = response.json()
 
             if result.get('success'):
-                print(f"\n✅ 주문 성공!")
                 order_data = result.get('data', {})
-                print(f"주문 ID: {order_data.get('orderId')}")
-                print(f"거래쌍: {order_data.get('symbol')}")
-                print(f"주문 타입: {order_data.get('side')} / {order_data.get('orderType')}")
-                print(f"가격: {order_data.get('price', 'N/A')}")
-                print(f"수량: {order_data.get('qty', 'N/A')}")
-                print(f"대금: {order_data.get('amt', 'N/A')}")
-                print(f"상태: {order_data.get('status')}")
-                return result
+                event_log.log('order_placed', order=order_data)
+                order = Order.from_api(order_data)
+                journal.ack(client_order_id, order.order_id)
+                get_ledger().record_order(order)
+                balance_service.invalidate()  # 주문 가능 잔고가 바뀌었으므로 다음 조회에서 갱신
+                return order
             else:
                 error_msg = result.get('error', {}).get('message', '알 수 없는 오류')
-                print(f"❌ 주문 실패: {error_msg}")
-                return result
+                journal.failed(client_order_id, error_msg)
+                event_log.log('order_failed', level='warning', symbol=symbol, side=side, message=error_msg)
+                return None
 
         except Exception as e:
-            print(f"❌ 주문 요청 중 오류 발생: {e}")
+            # 응답을 받지 못한 주문은 결과 미확인으로 남겨 두고 저널 대조(reconcile)에서 확인
+            event_log.log('order_error', level='error', symbol=symbol, side=side, error=str(e),
+                          client_order_id=client_order_id)
             return None
 
+    def validate_order(self, symbol, side, price=None, qty=None, amt=None):
+        """문자열 주문 값을 정수 단위로 변환해 레지스트리 규칙으로 검증 (오류 메시지 또는 None)"""
+        scale = scale_for(symbol)
+        return self.registry.validate_order(
+            symbol, side,
+            price_units=scale.price_units(str(price)) if price else None,
+            qty_units=scale.qty_units(str(qty)) if qty else None,
+            amt_units=parse_units(str(amt), KRW_DECIMALS) if amt and not qty else None,
+        )
+
+    def place_order_units(self, symbol, side, price_units=None, qty_units=None, amt_units=None,
+                          order_type='limit', time_in_force='gtc', client_order_id=None):
+        """
+        정수 단위 주문 접수 (자동매매용)
+
+        가격/수량은 fixed_point 정수 단위로 받아, 전송 직전에 한 번만
+        호가/수량 단위로 반올림하여 문자열로 변환한다.
+
+        Args:
+            price_units (int): 가격 (scale.price_decimals 단위)
+            qty_units (int): 수량 (scale.qty_decimals 단위)
+            amt_units (int): 주문 대금 (원화 정수)
+        """
+        scale = scale_for(symbol)
+        price = qty = amt = None
+        if price_units is not None:
+            price = scale.price_str(scale.round_price(price_units, side))
+        if qty_units is not None:
+            qty = scale.qty_str(scale.round_qty(qty_units))
+        if amt_units is not None:
+            amt = krw_str(amt_units)
+        return self.place_order(symbol, side, price=price, qty=qty, amt=amt, order_type=order_type,
+                                time_in_force=time_in_force, client_order_id=client_order_id)
+
     def cancel_order(self, symbol, order_id=None, client_order_id=None):
         """
         주문 취소 함수
@@ -138,6 +190,9 @@ class TradingBot:
             symbol (str): 거래쌍
             order_id (int): 주문 ID
             client_order_id (str): 사용자 지정 주문 ID
+
+        Returns:
+            Order: 취소된 주문 (실패 시 None, 사유는 event_log 에 기록)
         """
         if not order_id and not client_order_id:
             raise ValueError("order_id 또는 client_order_id 중 하나는 필수입니다.")
@@ -167,23 +222,25 @@ class TradingBot:
         url = f"{self.base_url}/v2/orders?{query_string}&signature={signature}"
 
         try:
-            response = a_base.requests.delete(url, headers=headers)
+            response = a_base.transport.delete(url, headers=headers)
             response.raise_for_status()
 
             result = response.json()
 
             if result.get('success'):
-                print(f"✅ 주문 취소 성공!")
                 cancel_data = result.get('data', {})
-                print(f"취소된 주문 ID: {cancel_data.get('orderId')}")
-                return result
+                event_log.log('order_canceled', symbol=symbol, order_id=cancel_data.get('orderId'))
+                order = Order.from_api(cancel_data)
+                get_ledger().record_order(order)
+                balance_service.invalidate()
+                return order
             else:
                 error_msg = result.get('error', {}).get('message', '알 수 없는 오류')
-                print(f"❌ 주문 취소 실패: {error_msg}")
-                return result
+                event_log.log('cancel_failed', level='warning', symbol=symbol, message=error_msg)
+                return None
 
         except Exception as e:
-            print(f"❌ 주문 취소 요청 중 오류 발생: {e}")
+            event_log.log('cancel_error', level='error', symbol=symbol, error=str(e))
             return None
 
     def get_order_status(self, symbol, order_id=None, client_order_id=None):
@@ -194,6 +251,19 @@ class TradingBot:
             symbol (str): 거래쌍
             order_id (int): 주문 ID
             client_order_id (str): 사용자 지정 주문 ID
+
+        Returns:
+            Order: 조회된 주문 (실패 시 None, 사유는 event_log 에 기록)
+        """
+        return self.lookup_order(symbol, order_id, client_order_id)[1]
+
+    def lookup_order(self, symbol, order_id=None, client_order_id=None):
+        """
+        주문 상태 조회 (조회 실패와 주문 없음을 구분)
+
+        Returns:
+            tuple: (ORDER_FOUND | ORDER_NOT_FOUND | ORDER_LOOKUP_FAILED, Order 또는 None)
+                   ORDER_NOT_FOUND 는 거래소가 해당 주문이 없다고 응답한 경우에만 반환
         """
         if not order_id and not client_order_id:
             raise ValueError("order_id 또는 client_order_id 중 하나는 필수입니다.")
@@ -223,33 +293,29 @@ class TradingBot:
         url = f"{self.base_url}/v2/orders"
 
         try:
-            response = a_base.requests.get(url, headers=headers, params=params)
+            response = a_base.transport.get(url, headers=headers, params=params)
+            if response.status_code == 404:
+                event_log.log('order_status_failed', level='warning', symbol=symbol, message='not found')
+                return ORDER_NOT_FOUND, None
             response.raise_for_status()
 
             result = response.json()
 
             if result.get('success'):
-                order_data = result.get('data', {})
-                print(f"\n📊 주문 상태 조회 결과:")
-                print(f"주문 ID: {order_data.get('orderId')}")
-                print(f"거래쌍: {order_data.get('symbol')}")
-                print(f"주문 타입: {order_data.get('side')} / {order_data.get('orderType')}")
-                print(f"가격: {order_data.get('price', 'N/A')}")
-                print(f"수량: {order_data.get('qty', 'N/A')}")
-                print(f"체결량: {order_data.get('filledQty', '0')}")
-                print(f"체결금액: {order_data.get('filledAmt', '0')}")
-                print(f"평균 체결가: {order_data.get('avgPrice', 'N/A')}")
-                print(f"상태: {order_data.get('status')}")
-                print(f"주문 시간: {datetime.fromtimestamp(order_data.get('createdAt', 0)/1000)}")
-                return result
+                order = Order.from_api(result.get('data', {}))
+                get_ledger().record_order(order)  # 체결 증가분을 원장에 반영
+                return ORDER_FOUND, order
             else:
-                error_msg = result.get('error', {}).get('message', '알 수 없는 오류')
-                print(f"❌ 주문 조회 실패: {error_msg}")
-                return result
+                error = result.get('error', {})
+                error_msg = error.get('message', '알 수 없는 오류')
+                event_log.log('order_status_failed', level='warning', symbol=symbol, message=error_msg)
+                if 'NOT_FOUND' in str(error.get('code', '')).upper():
+                    return ORDER_NOT_FOUND, None
+                return ORDER_LOOKUP_FAILED, None
 
         except Exception as e:
-            print(f"❌ 주문 조회 요청 중 오류 발생: {e}")
-            return None
+            event_log.log('order_status_error', level='error', symbol=symbol, error=str(e))
+            return ORDER_LOOKUP_FAILED, None
 
     def get_open_orders(self, symbol, limit=100):
         """
@@ -258,6 +324,9 @@ class TradingBot:
         Args:
             symbol (str): 거래쌍
             limit (int): 최대 조회 건수
+
+        Returns:
+            list[Order]: 미체결 주문 목록 (실패 시 None, 사유는 event_log 에 기록)
         """
         timestamp = int(time.time() * 1000)
 
@@ -280,58 +349,97 @@ class TradingBot:
         url = f"{self.base_url}/v2/openOrders"
 
         try:
-            response = a_base.requests.get(url, headers=headers, params=params)
+            response = a_base.transport.get(url, headers=headers, params=params)
             response.raise_for_status()
 
             result = response.json()
 
             if result.get('success'):
-                orders = result.get('data', [])
-                print(f"\n📋 미체결 주문 목록 ({len(orders)}건):")
-                print("-" * 100)
-                print(f"{'주문ID':<12} {'타입':<8} {'가격':<12} {'수량':<12} {'체결량':<12} {'상태':<15}")
-                print("-" * 100)
-
-                for order in orders:
-                    print(f"{order.get('orderId', 'N/A'):<12} "
-                          f"{order.get('side', 'N/A'):<8} "
-                          f"{order.get('price', 'N/A'):<12} "
-                          f"{order.get('qty', 'N/A'):<12} "
-                          f"{order.get('filledQty', '0'):<12} "
-                          f"{order.get('status', 'N/A'):<15}")
-
-                print("-" * 100)
-                return result
+                return [Order.from_api(order) for order in result.get('data', [])]
             else:
                 error_msg = result.get('error', {}).get('message', '알 수 없는 오류')
-                print(f"❌ 미체결 주문 조회 실패: {error_msg}")
-                return result
+                event_log.log('open_orders_failed', level='warning', symbol=symbol, message=error_msg)
+                return None
 
         except Exception as e:
-            print(f"❌ 미체결 주문 조회 요청 중 오류 발생: {e}")
+            event_log.log('open_orders_error', level='error', symbol=symbol, error=str(e))
             return None
 
-    def get_current_price(self, symbol):
-        """현재가 조회"""
+    def get_balances(self):
+        """
+        전체 잔고 조회 (/v2/balance 1회)
+
+        Returns:
+            dict: 자산(소문자) -> Balance (실패 시 None, 사유는 event_log 에 기록)
+        """
+        params = {"timestamp": int(time.time() * 1000)}
+
+        # 서명 생성
+        query_string = urlencode(params)
+        params["signature"] = self.create_signature(query_string)
+
+        headers = {
+            "X-KAPI-KEY": self.api_key,
+        }
+
+        url = f"{self.base_url}/v2/balance"
+
         try:
-            url = f"{self.base_url}/v2/tickers?symbol={symbol}"
-            response = a_base.requests.get(url)
+            response = a_base.transport.get(url, headers=headers, params=params)
             response.raise_for_status()
 
-            data = response.json()
-            if data.get('success') and data.get('data'):
-                ticker = data['data'][0]
-                return {
-                    'symbol': ticker.get('symbol'),
-                    'close': float(ticker.get('close', 0)),
-                    'bestBidPrice': float(ticker.get('bestBidPrice', 0)),
-                    'bestAskPrice': float(ticker.get('bestAskPrice', 0))
-                }
+            result = response.json()
+
+            if result.get('success'):
+                balances = [Balance.from_api(item) for item in result.get('data', [])]
+                return {balance.currency: balance for balance in balances}
+            else:
+                error_msg = result.get('error', {}).get('message', '알 수 없는 오류')
+                event_log.log('balance_failed', level='warning', message=error_msg)
+                return None
+
+        except Exception as e:
+            event_log.log('balance_error', level='error', error=str(e))
             return None
+
+    def get_tickers(self, symbols=None):
+        """
+        여러 거래쌍 현재가 일괄 조회 (요청 1회)
+
+        Args:
+            symbols (list): 거래쌍 목록 (None 이면 전체 마켓)
+
+        Returns:
+            dict: 거래쌍 -> Ticker (실패 시 None, 사유는 event_log 에 기록)
+        """
+        try:
+            url = f"{self.base_url}/v2/tickers"
+            params = {'symbol': ','.join(symbols)} if symbols else None
+            response = a_base.transport.get(url, params=params)
+            response.raise_for_status()
+
+            data = response.json()
+            if not data.get('success'):
+                return None
+            tickers = {}
+            for item in data.get('data', []):
+                ticker = Ticker.from_api(item)
+                tickers[ticker.symbol] = ticker
+            return tickers
         except Exception as e:
-            print(f"❌ 현재가 조회 오류: {e}")
+            event_log.log('ticker_error', level='error', symbol=','.join(symbols or ['*']), error=str(e))
             return None
 
+    def get_current_price(self, symbol):
+        """
+        현재가 조회
+
+        Returns:
+            Ticker: 현재가 정보 (실패 시 None, 사유는 event_log 에 기록)
+        """
+        tickers = self.get_tickers([symbol])
+        return tickers.get(symbol) if tickers else None
+
 # 매매 전략 기본 클래스 (나중에 알고리즘 추가용)
 class TradingStrategy:
     """매매 전략 기본 클래스"""
@@ -373,34 +481,18 @@ class ManualTradingStrategy(TradingStrategy):
         # 사용자가 직접 입력
         return None
 
-def get_symbol_from_choice(choice):
-    """선택 번호를 거래쌍으로 변환"""
-    symbol_map = {
-        1: 'btc_krw',
-        2: 'eth_krw',
-        3: 'usdt_krw'
-    }
-    return symbol_map.get(choice)
-
 def get_symbol_name(symbol):
     """거래쌍을 이름으로 변환"""
-    name_map = {
-        'btc_krw': 'Bitcoin (BTC/KRW)',
-        'eth_krw': 'Ethereum (ETH/KRW)',
-        'usdt_krw': 'Tether (USDT/KRW)'
-    }
-    return name_map.get(symbol, symbol)
+    return get_registry().display_name(symbol)
 
 def manual_buy_order(bot, symbol):
     """수동 매수 주문"""
     print(f"\n=== {get_symbol_name(symbol)} 매수 주문 ===")
 
     # 현재가 조회
-    price_info = bot.get_current_price(symbol)
+    price_info = get_snapshot().get(symbol)
     if price_info:
-        print(f"현재가: {price_info['close']:,} KRW")
-        print(f"매수 1호가: {price_info['bestBidPrice']:,} KRW")
-        print(f"매도 1호가: {price_info['bestAskPrice']:,} KRW")
+        korbit_view.print_price_info(price_info)
 
     try:
         print("\n주문 타입을 선택하세요:")
@@ -454,11 +546,9 @@ def manual_sell_order(bot, symbol):
     print(f"\n=== {get_symbol_name(symbol)} 매도 주문 ===")
 
     # 현재가 조회
-    price_info = bot.get_current_price(symbol)
+    price_info = get_snapshot().get(symbol)
     if price_info:
-        print(f"현재가: {price_info['close']:,} KRW")
-        print(f"매수 1호가: {price_info['bestBidPrice']:,} KRW")
-        print(f"매도 1호가: {price_info['bestAskPrice']:,} KRW")
+        korbit_view.print_price_info(price_info)
 
     try:
         print("\n주문 타입을 선택하세요:")
@@ -535,11 +625,13 @@ def main():
         binance_api_secret = None
 
     # AI 매매 전략 초기화 (기술적 지표 사용)
+    from impo_algo import AITradingStrategy, BinanceTechnicalSignals
     binance_signals = BinanceTechnicalSignals(binance_api_key, binance_api_secret)
     ai_strategy = AITradingStrategy(bot, binance_signals)
 
     while True:
         try:
+            event_log.flush()  # 이전 작업의 이벤트 출력을 메뉴보다 먼저 표시
             print("\n" + "="*60)
             print("🤖 Korbit + 기술적 지표 매매 시스템")
             print("="*60)
@@ -561,14 +653,8 @@ def main():
             choice = input("메뉴를 선택하세요: ").strip()
 
             if choice == "1":  # AI 자동 매매 시작
-                print("\n거래쌍을 선택하세요:")
-                print("1: Bitcoin (BTC/KRW)")
-                print("2: Ethereum (ETH/KRW)")
-                print("3: Tether (USDT/KRW)")
-
                 try:
-                    symbol_choice = int(input("선택: "))
-                    symbol = get_symbol_from_choice(symbol_choice)
+                    symbol = korbit_view.select_symbol()
 
                     if not symbol:
                         print("❌ 올바른 거래쌍을 선택해주세요.")
@@ -600,13 +686,7 @@ def main():
                 break
 
             elif choice in ["2", "3"]:  # 매수/매도
-                print("\n거래쌍을 선택하세요:")
-                print("1: Bitcoin (BTC/KRW)")
-                print("2: Ethereum (ETH/KRW)")
-                print("3: Tether (USDT/KRW)")
-
-                symbol_choice = int(input("선택: "))
-                symbol = get_symbol_from_choice(symbol_choice)
+                symbol = korbit_view.select_symbol()
 
                 if not symbol:
                     print("❌ 올바른 거래쌍을 선택해주세요.")
@@ -618,13 +698,7 @@ def main():
                     manual_sell_order(bot, symbol)
 
             elif choice == "4":  # 주문 상태 조회
-                print("\n거래쌍을 선택하세요:")
-                print("1: Bitcoin (BTC/KRW)")
-                print("2: Ethereum (ETH/KRW)")
-                print("3: Tether (USDT/KRW)")
-
-                symbol_choice = int(input("선택: "))
-                symbol = get_symbol_from_choice(symbol_choice)
+                symbol = korbit_view.select_symbol()
 
                 if not symbol:
                     print("❌ 올바른 거래쌍을 선택해주세요.")
@@ -632,33 +706,25 @@ def main():
 
                 order_id = input("주문 ID를 입력하세요: ").strip()
                 if order_id:
-                    bot.get_order_status(symbol, order_id=int(order_id))
+                    order = bot.get_order_status(symbol, order_id=int(order_id))
+                    if order:
+                        korbit_view.print_order_status(order)
                 else:
                     print("❌ 주문 ID를 입력해주세요.")
 
             elif choice == "5":  # 미체결 주문 조회
-                print("\n거래쌍을 선택하세요:")
-                print("1: Bitcoin (BTC/KRW)")
-                print("2: Ethereum (ETH/KRW)")
-                print("3: Tether (USDT/KRW)")
-
-                symbol_choice = int(input("선택: "))
-                symbol = get_symbol_from_choice(symbol_choice)
+                symbol = korbit_view.select_symbol()
 
                 if not symbol:
                     print("❌ 올바른 거래쌍을 선택해주세요.")
                     continue
 
-                bot.get_open_orders(symbol)
+                orders = bot.get_open_orders(symbol)
+                if orders is not None:
+                    korbit_view.print_open_orders(orders)
 
             elif choice == "6":  # 주문 취소
-                print("\n거래쌍을 선택하세요:")
-                print("1: Bitcoin (BTC/KRW)")
-                print("2: Ethereum (ETH/KRW)")
-                print("3: Tether (USDT/KRW)")
-
-                symbol_choice = int(input("선택: "))
-                symbol = get_symbol_from_choice(symbol_choice)
+                symbol = korbit_view.select_symbol()
 
                 if not symbol:
                     print("❌ 올바른 거래쌍을 선택해주세요.")
@@ -671,24 +737,16 @@ def main():
                     print("❌ 주문 ID를 입력해주세요.")
 
             elif choice == "7":  # 현재가 조회
-                print("\n거래쌍을 선택하세요:")
-                print("1: Bitcoin (BTC/KRW)")
-                print("2: Ethereum (ETH/KRW)")
-                print("3: Tether (USDT/KRW)")
-
-                symbol_choice = int(input("선택: "))
-                symbol = get_symbol_from_choice(symbol_choice)
+                symbol = korbit_view.select_symbol()
 
                 if not symbol:
                     print("❌ 올바른 거래쌍을 선택해주세요.")
                     continue
 
-                price_info = bot.get_current_price(symbol)
+                price_info = get_snapshot().get(symbol)
                 if price_info:
                     print(f"\n💰 {get_symbol_name(symbol)} 현재가 정보:")
-                    print(f"현재가: {price_info['close']:,} KRW")
-                    print(f"매수 1호가: {price_info['bestBidPrice']:,} KRW")
-                    print(f"매도 1호가: {price_info['bestAskPrice']:,} KRW")
+                    korbit_view.print_price_info(price_info)
                 else:
                     print("❌ 현재가 조회에 실패했습니다.")
 
@@ -0,0 +1,124 @@
+import os
+import struct
+import threading
+
+# 캔들 아카이브 (시계열 기록 저장소)
+# 시리즈마다 고정 길이 레코드를 이어 붙이는 바이너리 파일 하나를 사용한다.
+# 쓰기는 struct 로 레코드 단위 append, 읽기는 numpy memmap 으로 복사 없이 조회한다.
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'candles')
+
+# 레코드: 시작 시각(ms), 시가, 고가, 저가, 종가, 거래량 (little-endian)
+RECORD_FORMAT = '<q5d'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+FIELDS = ('ts', 'open', 'high', 'low', 'close', 'volume')
+
+
+def record_dtype():
+    """memmap 조회용 numpy 구조화 dtype (RECORD_FORMAT 과 동일한 배치)"""
+    import numpy as np
+    return np.dtype([('ts', '<i8'), ('open', '<f8'), ('high', '<f8'),
+                     ('low', '<f8'), ('close', '<f8'), ('volume', '<f8')])
+
+
+class CandleArchive:
+    """시리즈별 append-only 캔들 파일 저장소"""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def path(self, series):
+        """시리즈 파일 경로 (예: 'premium_btc_1m' -> data/candles/premium_btc_1m.bin)"""
+        return os.path.join(self.root, f"{series}.bin")
+
+    def append(self, series, ts, open, high, low, close, volume=0.0):
+        """마감된 캔들 한 개 추가"""
+        self.append_many(series, [(ts, open, high, low, close, volume)])
+
+    def append_many(self, series, rows):
+        """
+        마감된 캔들 여러 개 추가 (시각 오름차순)
+
+        Args:
+            series (str): 시리즈 이름
+            rows (list): (ts, open, high, low, close, volume) 튜플 목록
+        """
+        if not rows:
+            return
+        data = b''.join(struct.pack(RECORD_FORMAT, int(row[0]), *map(float, row[1:])) for row in rows)
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.path(series), 'ab') as f:
+                f.write(data)
+
+    def prepend_many(self, series, rows):
+        """
+        기존 캔들보다 앞선 캔들 여러 개를 앞에 추가 (과거 구간 보충용, 파일을 새로 써서 교체)
+
+        Args:
+            series (str): 시리즈 이름
+            rows (list): (ts, open, high, low, close, volume) 튜플 목록 (시각 오름차순, 첫 저장 봉보다 이전)
+        """
+        if not rows:
+            return
+        data = b''.join(struct.pack(RECORD_FORMAT, int(row[0]), *map(float, row[1:])) for row in rows)
+        path = self.path(series)
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            existing = b''
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    existing = f.read()
+                existing = existing[:len(existing) - len(existing) % RECORD_SIZE]  # 잘린 레코드 제외
+            tmp = f"{path}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(data + existing)
+            os.replace(tmp, path)
+
+    def count(self, series):
+        """저장된 캔들 수 (쓰기 도중 잘린 마지막 레코드는 제외)"""
+        try:
+            return os.path.getsize(self.path(series)) // RECORD_SIZE
+        except OSError:
+            return 0
+
+    def last(self, series):
+        """마지막 캔들 (dict, 없으면 None)"""
+        count = self.count(series)
+        if count == 0:
+            return None
+        with open(self.path(series), 'rb') as f:
+            f.seek((count - 1) * RECORD_SIZE)
+            return dict(zip(FIELDS, struct.unpack(RECORD_FORMAT, f.read(RECORD_SIZE))))
+
+    def read(self, series, start=None, end=None):
+        """
+        캔들 조회 (읽기 전용 memmap, 파일 전체를 메모리로 읽지 않음)
+
+        Args:
+            series (str): 시리즈 이름
+            start (int): 시작 시각(ms) 이상 (선택)
+            end (int): 종료 시각(ms) 미만 (선택)
+
+        Returns:
+            numpy.ndarray: FIELDS 를 필드로 가진 구조화 배열 (없으면 빈 배열)
+        """
+        import numpy as np
+
+        count = self.count(series)
+        if count == 0:
+            return np.empty(0, dtype=record_dtype())
+        candles = np.memmap(self.path(series), dtype=record_dtype(), mode='r', shape=(count,))
+
+        # 시각 오름차순으로 기록되므로 이진 탐색으로 구간 선택
+        ts = candles['ts']
+        lo = int(np.searchsorted(ts, start, side='left')) if start is not None else 0
+        hi = int(np.searchsorted(ts, end, side='left')) if end is not None else count
+        return candles[lo:hi]
+
+    def series(self):
+        """저장된 시리즈 이름 목록"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-4] for name in os.listdir(self.root) if name.endswith('.bin'))
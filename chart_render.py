@@ -0,0 +1,434 @@
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+import a_base
+import metrics
+import event_log
+from config import Config
+from candle_store import CandleArchive
+
+# 헤드리스 캔들 차트 렌더링 (PNG/SVG 파일)
+# Korbit 캔들을 캔들 아카이브에 증분 저장(마감된 봉만)하고, memmap 구조화 배열에서
+# DataFrame 을 열 단위로 한 번에 만든 뒤 Agg 백엔드로 파일에 그린다 (디스플레이 불필요).
+# 이미지는 (거래쌍, 간격, 구간, 첫·마지막 봉 시각, 형식)을 파일 이름으로 캐시하므로
+# 새 봉이 마감되기 전까지 같은 요청은 파일 경로만 돌려준다.
+#
+# 긴 이력(수년치 1분봉): render_history 는 구간 길이에 맞춰 표시 간격을 고르고
+# memmap 에서 바로 시간 버킷별 OHLCV 로 집계(reduceat)한 뒤, 지표 오버레이는 같은 버킷에
+# LTTB(Largest-Triangle-Three-Buckets)를 적용해 버킷당 한 점만 그린다.
+# 그리는 봉 수가 max_bars 이하로 고정되므로 렌더링 시간은 원본 행 수와 무관하다.
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'charts')
+FORMATS = ('png', 'svg')
+
+# Korbit /v2/candles 간격 -> 밀리초
+INTERVAL_MS = {
+    '1': 60_000,
+    '5': 5 * 60_000,
+    '15': 15 * 60_000,
+    '30': 30 * 60_000,
+    '60': 60 * 60_000,
+    '240': 240 * 60_000,
+    '1D': 24 * 60 * 60_000,
+    '1W': 7 * 24 * 60 * 60_000,
+}
+MAX_CANDLES_PER_REQUEST = 200
+
+# 긴 이력 표시 간격 후보 (밀리초, 작은 것부터)
+DISPLAY_INTERVALS_MS = (
+    60_000, 5 * 60_000, 15 * 60_000, 30 * 60_000,
+    60 * 60_000, 4 * 60 * 60_000, 12 * 60 * 60_000,
+    24 * 60 * 60_000, 7 * 24 * 60 * 60_000, 30 * 24 * 60 * 60_000,
+)
+DEFAULT_MAX_BARS = 500
+
+
+def series_name(symbol, interval):
+    """아카이브 시리즈 이름 (예: 'btc_krw', '1D' -> 'korbit_btc_krw_1D')"""
+    return f"korbit_{symbol}_{interval}"
+
+
+def _fetch_candles(symbol, interval, limit, start=None, end=None):
+    """/v2/candles 1페이지 조회 -> (응답 봉 수, 시각 오름차순 (ts, open, high, low, close, volume) 목록)"""
+    params = {'symbol': symbol, 'interval': interval, 'limit': min(limit, MAX_CANDLES_PER_REQUEST)}
+    if start is not None:
+        params['start'] = start
+    if end is not None:
+        params['end'] = end
+    response = a_base.transport.get(f"{Config.KORBIT_BASE_URL}/v2/candles", params=params)
+    response.raise_for_status()
+    candles = response.json().get('data') or []
+    rows = [(int(c['timestamp']), c['open'], c['high'], c['low'], c['close'], c.get('volume', 0))
+            for c in candles]
+    rows.sort(key=lambda row: row[0])
+    return len(candles), rows
+
+
+def sync_candles(symbol, interval='1D', limit=MAX_CANDLES_PER_REQUEST, archive=None, now_ms=None):
+    """
+    Korbit 캔들을 아카이브에 증분 저장 (마지막 저장 봉 이후의 마감된 봉만 추가)
+
+    처음에는 최근 페이지를 받고, 이후에는 마지막 봉 다음부터 페이지 단위로 받는다.
+    저장된 봉이 limit 개보다 적으면 첫 저장 봉 이전 구간을 end 로 거슬러 받아 앞에 채운다.
+
+    Returns:
+        int: 추가된 캔들 수 (조회 실패 시 None)
+    """
+    archive = archive or CandleArchive()
+    series = series_name(symbol, interval)
+    bar_ms = INTERVAL_MS[interval]
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    last = archive.last(series)
+    start = last['ts'] + bar_ms if last else None
+    added = 0
+
+    try:
+        # 1. 최근 구간 (진행 중인 봉은 아직 바뀌므로 저장하지 않음)
+        while True:
+            received, rows = _fetch_candles(symbol, interval, limit, start=start)
+            rows = [row for row in rows
+                    if row[0] + bar_ms <= now_ms and (start is None or row[0] >= start)]
+            archive.append_many(series, rows)
+            added += len(rows)
+            # 첫 조회이거나 마지막 페이지면 종료
+            if start is None or received < min(limit, MAX_CANDLES_PER_REQUEST) or not rows:
+                break
+            start = rows[-1][0] + bar_ms
+
+        # 2. 과거 구간 보충 (limit 개가 찰 때까지)
+        while archive.count(series) < limit:
+            first = int(archive.read(series)[0]['ts']) if archive.count(series) else now_ms
+            received, rows = _fetch_candles(symbol, interval, limit - archive.count(series), end=first - 1)
+            rows = [row for row in rows if row[0] < first and row[0] + bar_ms <= now_ms]
+            archive.prepend_many(series, rows)
+            added += len(rows)
+            if not rows:
+                break  # 거래소에 더 오래된 봉이 없음
+        return added
+    except Exception as e:
+        event_log.log('candle_sync_error', level='error', symbol=symbol, interval=interval, error=str(e))
+        return None
+
+
+def live_candle(symbol, interval='1D', now_ms=None):
+    """
+    진행 중인 봉 1개 (아카이브에는 저장하지 않음, 대화형 차트 표시용)
+
+    Returns:
+        numpy.ndarray: record_dtype() 구조화 배열 (0 또는 1개, 조회 실패 시 빈 배열)
+    """
+    from candle_store import record_dtype
+
+    bar_ms = INTERVAL_MS[interval]
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    try:
+        _, rows = _fetch_candles(symbol, interval, 1)
+    except Exception as e:
+        event_log.log('candle_sync_error', level='error', symbol=symbol, interval=interval, error=str(e))
+        rows = []
+    rows = [row for row in rows if row[0] + bar_ms > now_ms]
+    return np.array([(row[0], *map(float, row[1:])) for row in rows], dtype=record_dtype())
+
+
+def candles_frame(candles):
+    """
+    구조화 캔들 배열 -> mplfinance 용 DataFrame (열 단위 변환, 행 반복 없음)
+
+    Args:
+        candles (numpy.ndarray): CandleArchive.read 결과
+
+    Returns:
+        pandas.DataFrame: DatetimeIndex + Open/High/Low/Close/Volume
+    """
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            'Open': candles['open'],
+            'High': candles['high'],
+            'Low': candles['low'],
+            'Close': candles['close'],
+            'Volume': candles['volume'],
+        },
+        index=pd.DatetimeIndex(pd.to_datetime(candles['ts'], unit='ms'), name='Date'),
+    )
+
+
+def _use_agg():
+    """pyplot 이 아직 로드되지 않았으면 Agg 백엔드 사용 (디스플레이 없는 서버)"""
+    import matplotlib
+    if 'matplotlib.pyplot' not in sys.modules:
+        matplotlib.use('Agg')
+
+
+def render(symbol, interval='1D', limit=100, start=None, end=None, fmt='png',
+           cache_dir=DEFAULT_CACHE_DIR, archive=None, title=None):
+    """
+    아카이브 캔들로 차트 파일 생성 (캐시 적중 시 렌더링 없이 경로 반환)
+
+    Args:
+        limit (int): 구간 지정이 없을 때 최근 캔들 수
+        start, end (int): 구간 시각(ms, end 미포함)
+        fmt (str): 'png' 또는 'svg'
+
+    Returns:
+        str: 이미지 파일 경로 (캔들이 없으면 None)
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} ({', '.join(FORMATS)})")
+    archive = archive or CandleArchive()
+    candles = archive.read(series_name(symbol, interval), start, end)
+    if start is None and end is None:
+        candles = candles[-limit:]
+    if len(candles) == 0:
+        return None
+
+    range_key = f"{start}-{end}" if start is not None or end is not None else f"last{limit}"
+    prefix = f"{symbol}_{interval}_{range_key}_"
+    # 첫 봉도 키에 포함: 과거 구간이 보충되면 같은 마지막 봉이라도 다시 그림
+    path = os.path.join(cache_dir, f"{prefix}{int(candles['ts'][0])}_{int(candles['ts'][-1])}.{fmt}")
+    if os.path.exists(path):
+        metrics.registry.inc('chart_cache', result='hit')
+        return path
+    metrics.registry.inc('chart_cache', result='miss')
+
+    _use_agg()
+    import mplfinance as mpf
+
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f"{path}.tmp.{fmt}"
+    with metrics.time_stage('chart_render'):
+        mpf.plot(candles_frame(candles),
+                 type='candle',
+                 style='charles',
+                 title=title or f"{symbol.upper().replace('_', '/')} {interval} ({len(candles)})",
+                 ylabel='Price (KRW)',
+                 volume=True,
+                 figsize=(12, 8),
+                 show_nontrading=False,
+                 savefig=dict(fname=temp_path, format=fmt, dpi=100),
+                 closefig=True)
+    os.replace(temp_path, path)
+
+    # 같은 구간의 이전 봉 기준 이미지 정리
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix) and name.endswith(f".{fmt}") and name != os.path.basename(path):
+            os.remove(os.path.join(cache_dir, name))
+    return path
+
+
+# 긴 이력 다운샘플링
+def display_interval(span_ms, max_bars=DEFAULT_MAX_BARS):
+    """구간을 max_bars 개 이하의 봉으로 나타내는 가장 작은 표시 간격 (밀리초)"""
+    for interval_ms in DISPLAY_INTERVALS_MS:
+        if span_ms // interval_ms < max_bars:
+            return interval_ms
+    # 후보보다 긴 구간은 max_bars 개로 균등 분할
+    return -(-span_ms // max_bars)
+
+
+def bucket_starts(ts, interval_ms):
+    """시각 오름차순 배열에서 표시 간격 버킷이 바뀌는 위치 (첫 원소 0 포함)"""
+    bucket = ts // interval_ms
+    return np.concatenate(([0], np.flatnonzero(bucket[1:] != bucket[:-1]) + 1))
+
+
+def aggregate(candles, starts):
+    """
+    버킷별 OHLCV 집계 (시가=첫 봉, 고가=최대, 저가=최소, 종가=마지막 봉, 거래량=합계)
+
+    Args:
+        candles (numpy.ndarray): 구조화 캔들 배열 (memmap 가능)
+        starts (numpy.ndarray): bucket_starts 결과
+
+    Returns:
+        numpy.ndarray: 같은 dtype 의 집계 배열 (버킷 수만큼)
+    """
+    ends = np.append(starts[1:], len(candles)) - 1
+    result = np.empty(len(starts), dtype=candles.dtype)
+    result['ts'] = candles['ts'][starts]
+    result['open'] = candles['open'][starts]
+    result['high'] = np.maximum.reduceat(candles['high'], starts)
+    result['low'] = np.minimum.reduceat(candles['low'], starts)
+    result['close'] = candles['close'][ends]
+    result['volume'] = np.add.reduceat(candles['volume'], starts)
+    return result
+
+
+def lttb(values, starts, x=None):
+    """
+    버킷별 LTTB 대표점 선택 (버킷당 1개)
+
+    이전 선택점과 다음 버킷 평균점이 이루는 삼각형 넓이가 가장 큰 점을 고른다.
+    첫 버킷은 첫 점, 마지막 버킷은 마지막 점을 고정으로 사용한다.
+    선택은 순차적이지만 반복 횟수는 버킷 수이고, 버킷 안 계산은 배열 연산이다.
+
+    Args:
+        values (numpy.ndarray): 원본 값 (NaN 은 선택하지 않음)
+        starts (numpy.ndarray): bucket_starts 결과
+        x (numpy.ndarray): x 좌표 (기본: 위치)
+
+    Returns:
+        numpy.ndarray: 버킷별 선택 위치
+    """
+    values = np.asarray(values, dtype=np.float64)
+    count = len(values)
+    x = np.arange(count, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    ends = np.append(starts[1:], count)
+    buckets = len(starts)
+    selected = np.empty(buckets, dtype=np.int64)
+    selected[0] = starts[0]
+    if buckets == 1:
+        return selected
+    selected[-1] = count - 1
+
+    # 버킷별 평균점 (NaN 제외)
+    valid = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(valid, values, 0.0), starts)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    mean_y = np.divide(sums, counts, out=np.full(buckets, np.nan), where=counts > 0)
+    mean_x = np.add.reduceat(x, starts) / (ends - starts)
+
+    previous = selected[0]
+    for i in range(1, buckets - 1):
+        lo, hi = starts[i], ends[i]
+        px, py = x[previous], values[previous]
+        nx, ny = mean_x[i + 1], mean_y[i + 1]
+        if np.isnan(py) or np.isnan(ny):
+            # 기준점이 없으면 버킷의 첫 유효 값 (없으면 첫 점)
+            offsets = np.flatnonzero(valid[lo:hi])
+            selected[i] = lo + (offsets[0] if len(offsets) else 0)
+        else:
+            area = np.abs((px - nx) * (values[lo:hi] - py) - (px - x[lo:hi]) * (ny - py))
+            selected[i] = lo + int(np.nanargmax(area)) if valid[lo:hi].any() else lo
+        previous = selected[i]
+    return selected
+
+
+def render_history(series, start=None, end=None, max_bars=DEFAULT_MAX_BARS, fmt='png', overlays=None,
+                   cache_dir=DEFAULT_CACHE_DIR, archive=None, title=None):
+    """
+    긴 캔들 이력을 표시 간격으로 집계하여 차트 파일 생성 (캐시 적중 시 경로만 반환)
+
+    Args:
+        series (str): 아카이브 시리즈 이름 (예: 'korbit_btc_krw_1', 'premium_btc_1m')
+        start, end (int): 구간 시각(ms, end 미포함, 기본: 전체)
+        max_bars (int): 최대 표시 봉 수
+        overlays (dict): 이름 -> 오버레이
+                         - 값 배열 (구간 캔들과 같은 길이): 버킷별 LTTB 로 한 점씩 선택
+                         - 함수 closes -> 값 배열 (예: lambda c: indicators.ema(c, 20)):
+                           집계된 봉의 종가로 계산 (표시 간격 기준 지표, 비용이 봉 수에 비례)
+
+    Returns:
+        str: 이미지 파일 경로 (캔들이 없으면 None)
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} ({', '.join(FORMATS)})")
+    archive = archive or CandleArchive()
+    candles = archive.read(series, start, end)  # memmap 슬라이스 (복사 없음)
+    if len(candles) == 0:
+        return None
+
+    first, last = int(candles['ts'][0]), int(candles['ts'][-1])
+    labels = '+'.join(sorted(overlays or {}))
+    prefix = f"{series}_{start}-{end}_{max_bars}{'_' + labels if labels else ''}_"
+    path = os.path.join(cache_dir, f"{prefix}{first}_{last}.{fmt}")  # 과거 구간 보충 시에도 다시 그림
+    if os.path.exists(path):
+        metrics.registry.inc('chart_cache', result='hit')
+        return path
+    metrics.registry.inc('chart_cache', result='miss')
+
+    with metrics.time_stage('chart_downsample'):
+        interval_ms = display_interval(last - first + 1, max_bars)
+        starts = bucket_starts(candles['ts'], interval_ms)
+        bars = aggregate(candles, starts)
+        lines = {}
+        for name, overlay in (overlays or {}).items():
+            if callable(overlay):
+                lines[name] = np.asarray(overlay(bars['close']), dtype=np.float64)
+            else:
+                values = np.asarray(overlay, dtype=np.float64)
+                lines[name] = values[lttb(values, starts)]
+
+    _use_agg()
+    import mplfinance as mpf
+
+    frame = candles_frame(bars)
+    addplots = [mpf.make_addplot(values, label=name) for name, values in lines.items()
+                if not np.isnan(values).all()]
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f"{path}.tmp.{fmt}"
+    # 오버레이가 없으면 addplot 인자를 넘기지 않음 (mplfinance 는 None 을 허용하지 않음)
+    extra = {'addplot': addplots} if addplots else {}
+    with metrics.time_stage('chart_render'):
+        mpf.plot(frame,
+                 type='candle',
+                 style='charles',
+                 title=title or f"{series} ({len(candles):,} -> {len(bars)}, {interval_ms // 60_000}m)",
+                 volume=bool(bars['volume'].any()),
+                 figsize=(14, 8),
+                 show_nontrading=False,
+                 warn_too_much_data=len(bars) + 1,
+                 savefig=dict(fname=temp_path, format=fmt, dpi=100),
+                 closefig=True,
+                 **extra)
+    os.replace(temp_path, path)
+
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix) and name.endswith(f".{fmt}") and name != os.path.basename(path):
+            os.remove(os.path.join(cache_dir, name))
+    return path
+
+
+def _parse_date(text):
+    """'YYYY-mm-dd' -> 밀리초 타임스탬프 (없으면 None)"""
+    return int(datetime.strptime(text, '%Y-%m-%d').timestamp() * 1000) if text else None
+
+
+def main(argv=None):
+    """
+    메인 실행 함수
+      python chart_render.py btc_krw eth_krw [--interval 1D] [--limit 100] [--format svg]
+      python chart_render.py premium_btc_1m --history [--start 2024-01-01] [--end 2025-01-01] [--ema 20]
+    """
+    parser = argparse.ArgumentParser(description='캔들 차트 일괄 생성 (PNG/SVG)')
+    parser.add_argument('symbols', nargs='+', help='거래쌍 (--history 이면 아카이브 시리즈 이름)')
+    parser.add_argument('--interval', choices=sorted(INTERVAL_MS), default='1D')
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--format', choices=FORMATS, default='png')
+    parser.add_argument('--out', default=DEFAULT_CACHE_DIR, help='이미지 저장 디렉터리')
+    parser.add_argument('--no-sync', action='store_true', help='거래소 조회 없이 저장된 캔들만 사용')
+    parser.add_argument('--history', action='store_true', help='저장된 전체 이력을 표시 간격으로 집계하여 그리기')
+    parser.add_argument('--start', help='이력 시작일 (YYYY-mm-dd)')
+    parser.add_argument('--end', help='이력 종료일 (YYYY-mm-dd, 미포함)')
+    parser.add_argument('--max-bars', type=int, default=DEFAULT_MAX_BARS)
+    parser.add_argument('--ema', type=int, nargs='*', default=[], help='종가 EMA 오버레이 기간 (표시 봉 기준)')
+    args = parser.parse_args(argv)
+
+    archive = CandleArchive()
+    if args.history:
+        import indicators
+        overlays = {f"ema{span}": (lambda closes, span=span: indicators.ema(closes, span)) for span in args.ema}
+        for series in args.symbols:
+            started = time.perf_counter()
+            path = render_history(series, _parse_date(args.start), _parse_date(args.end), args.max_bars,
+                                  args.format, overlays, args.out, archive)
+            print(f"🖼️ {series}: {path or '캔들 데이터 없음'} ({time.perf_counter() - started:.2f}s)")
+        event_log.flush()
+        return
+
+    for symbol in args.symbols:
+        if not args.no_sync:
+            sync_candles(symbol, args.interval, args.limit, archive)
+        path = render(symbol, args.interval, args.limit, fmt=args.format, cache_dir=args.out, archive=archive)
+        print(f"🖼️ {symbol}: {path or '캔들 데이터 없음'}")
+    event_log.flush()
+
+
+if __name__ == "__main__":
+    main()
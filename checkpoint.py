@@ -0,0 +1,134 @@
+import os
+import json
+import time
+
+import numpy as np
+
+import event_log
+from resample import BAR_MS, CandleWindow
+
+# 재시작용 상태 체크포인트
+# 1분봉 윈도우(리샘플러 포함), 규칙 지표 증분 상태, 마지막 반영 봉 시각, 전략 상태를
+# 하나의 .npz 파일(배열 + JSON 메타데이터)에 저장한다.
+# 임시 파일에 쓴 뒤 os.replace 로 교체하므로 저장 도중 종료되어도 이전 체크포인트가 남는다.
+#
+# 복원 후에는 update_candle_window 가 마지막 봉 이후 분량만 요청하므로
+# 재시작 직후 한 번의 klines 요청으로 바로 유효한 신호를 낸다.
+
+CHECKPOINT_VERSION = 1
+DEFAULT_PATH = os.path.join('.cache', 'checkpoint.npz')
+
+
+def _render_restored(record):
+    """checkpoint_restored 이벤트 콘솔 출력"""
+    symbols = ', '.join(record['symbols']) or '없음'
+    return f"♻️ 체크포인트 복원: {symbols} ({record['age']:.0f}초 전 저장)"
+
+
+event_log.register_renderer('checkpoint_restored', _render_restored)
+
+
+def save(path, signals, strategies=None):
+    """
+    체크포인트 저장
+
+    Args:
+        path (str): 저장 경로 (.npz)
+        signals: BinanceTechnicalSignals
+        strategies (dict): 거래쌍 -> AITradingStrategy
+
+    Returns:
+        bool: 저장 성공 여부
+    """
+    try:
+        arrays = {}
+        with signals.state_lock:
+            for symbol, window in signals.candle_windows.items():
+                for name, array in window.dump().items():
+                    arrays[f"window/{symbol}/{name}"] = array
+            for symbol, stream in signals.rule_streams.items():
+                for name, array in stream.dump().items():
+                    arrays[f"stream/{symbol}/{name}"] = array
+
+        meta = {
+            'version': CHECKPOINT_VERSION,
+            'saved_at': time.time(),
+            'rules': signals.rules.sources,
+            'windows': sorted(signals.candle_windows),
+            'streams': sorted(signals.rule_streams),
+            'strategies': {symbol: strategy.checkpoint_state()
+                           for symbol, strategy in (strategies or {}).items()},
+        }
+        arrays['meta'] = np.array(json.dumps(meta))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        event_log.log('checkpoint_saved', level='debug', path=path, symbols=meta['windows'])
+        return True
+    except Exception as e:
+        event_log.log('checkpoint_error', level='error', action='save', path=path, error=str(e))
+        return False
+
+
+def _group(data, prefix):
+    """'prefix/이름' 배열들 -> {이름: 배열}"""
+    return {key[len(prefix):]: data[key] for key in data.files if key.startswith(prefix)}
+
+
+def restore(path, signals, strategies=None, now_ms=None):
+    """
+    체크포인트 복원
+
+    마지막 봉 이후 공백이 윈도우 크기(1분봉 개수)를 넘는 거래쌍은 한 번의 요청으로
+    메울 수 없으므로 복원하지 않고 처음부터 다시 받는다.
+    저장 시와 매매 규칙이 다르면 지표 상태는 버리고 윈도우 봉으로 다시 계산한다.
+
+    Returns:
+        list: 복원된 거래쌍 목록 (체크포인트가 없거나 읽을 수 없으면 빈 목록)
+    """
+    if not os.path.exists(path):
+        return []
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    try:
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != CHECKPOINT_VERSION:
+                print(f"⚠️ 체크포인트 버전이 달라 복원하지 않습니다: {path}")
+                return []
+            same_rules = meta['rules'] == signals.rules.sources
+
+            restored = []
+            with signals.state_lock:
+                for symbol in meta['windows']:
+                    window = CandleWindow(symbol, signals.timeframes)
+                    window.load(_group(data, f"window/{symbol}/"))
+                    last = window.last_open_time
+                    if last is None or (now_ms - last) // BAR_MS >= window.capacity:
+                        continue
+                    signals.candle_windows[symbol] = window
+                    restored.append(symbol)
+
+                    if same_rules and symbol in meta['streams']:
+                        stream = signals.rules.stream()
+                        stream.load(_group(data, f"stream/{symbol}/"))
+                        signals.rule_streams[symbol] = stream
+
+        for symbol, state in meta['strategies'].items():
+            strategy = (strategies or {}).get(symbol)
+            if strategy is not None:
+                strategy.restore_state(state)
+
+        age = time.time() - meta['saved_at']
+        event_log.log('checkpoint_restored', path=path, symbols=restored, age=round(age, 1),
+                      indicator_state=same_rules)
+        return restored
+    except Exception as e:
+        event_log.log('checkpoint_error', level='error', action='restore', path=path, error=str(e))
+        return []
@@ -11,6 +11,7 @@ class Config:
     KORBIT_API_KEY = os.getenv('KORBIT_API_KEY', 'your_korbit_api_key_here')
     KORBIT_API_SECRET = os.getenv('KORBIT_API_SECRET', 'your_korbit_api_secret_here')
     KORBIT_BASE_URL = "https://api.korbit.co.kr"
+    KORBIT_PRIVATE_WS_URL = os.getenv('KORBIT_PRIVATE_WS_URL', "wss://ws-api.korbit.co.kr/v2/private")
     
     # Binance API 설정
     BINANCE_API_KEY = os.getenv('BINANCE_API_KEY', 'your_binance_api_key_here')
@@ -0,0 +1,384 @@
+import os
+import sys
+import json
+import signal
+import argparse
+import time
+import threading
+import tempfile
+
+# 헤드리스 자동매매 실행 진입점
+# 메뉴/차트 모듈(ab_all, b_view_nowprice, d_wallet)은 import 하지 않고
+# 전송(a_base) · 신호(impo_algo) · 주문 실행(c_buy_and_sell) 경로만 로드한다.
+import a_base
+import metrics
+import event_log
+from c_buy_and_sell import TradingBot
+from impo_algo import AITradingStrategy, BinanceTechnicalSignals
+from symbol_registry import get_registry
+from market_snapshot import get_snapshot
+from candle_store import CandleArchive
+from premium_tracker import PremiumTracker
+from rules import DEFAULT_RULES
+from scheduler import INTERVAL_SECONDS
+import checkpoint
+import portfolio
+import ledger
+import order_journal
+from ledger import get_ledger
+from order_journal import get_journal
+from balance_service import get_balance_service
+import user_stream
+import traffic_recorder
+
+# 설정 파일 기본값 (daemon_config_example.json 참고)
+DEFAULT_CONFIG = {
+    'symbols': ['btc_krw'],
+    'strategy': {
+        'target_ratios': {'cash': 0.4, 'crypto': 0.6},
+        'min_trade_amount': 10000,
+        'min_confidence': 0.7,
+    },
+    'schedule': {
+        'candle_interval': '1m',
+        'candle_offset': 1.0,
+        'retry_interval': 5,
+    },
+    'rules': dict(DEFAULT_RULES),  # 매수/매도 규칙 문자열 (rules.py 문법, 모든 거래쌍 공통)
+    'signals': {
+        'cache_epsilon': 0.0,  # 진행 중인 봉 종가 변화가 이 비율 이하이면 캐시된 신호 재사용
+    },
+    'overrides': {},  # 거래쌍별 strategy/schedule 덮어쓰기
+    'shutdown': {
+        'cancel_open_orders': True,
+        'cancel_scope': 'own',  # 'own': 이 프로세스가 낸 주문만 취소, 'all': 거래쌍의 모든 미체결 주문 취소
+    },
+    'premium': {
+        'enabled': False,   # Binance/Korbit 프리미엄 추적 (1분 캔들을 data/candles 에 기록)
+        'interval': 5.0,    # 전체 시세 조회 주기 (초)
+    },
+    'checkpoint': {
+        'path': checkpoint.DEFAULT_PATH,  # 재시작용 상태 저장 파일 (None 이면 사용 안 함)
+        'interval': 60.0,                 # 저장 주기 (초), 종료 시에도 저장
+    },
+    'portfolio': {
+        'enabled': False,   # 보유 자산 전체를 목표 비중으로 리밸런싱 (거래쌍별 전략과 별도)
+        'interval': 3600.0, # 리밸런싱 주기 (초)
+        'cash_ratio': 0.4,  # targets 미지정 시 현금 비중 (나머지는 보유 자산 균등 분배)
+        'targets': None,    # 자산 -> 목표 비중 (예: {"btc": 0.3, "eth": 0.3, "krw": 0.4})
+        'tolerance': 0.02,  # 총 자산 대비 이 비율 이하의 차이는 주문하지 않음
+        'dry_run': True,    # True 면 주문 목록만 기록
+    },
+    'user_stream': {
+        'enabled': False,  # Korbit 비공개 WebSocket 으로 주문/체결/자산 이벤트 수신 (websocket-client 필요)
+        'url': None,       # 접속 주소 (None 이면 Config.KORBIT_PRIVATE_WS_URL)
+    },
+    'traffic': {
+        'record': None,  # 거래소 통신 기록 디렉터리 (예: "data/traffic")
+        'replay': None,  # 기록 파일/디렉터리를 네트워크 대신 재생 (성능 측정/회귀 확인용)
+        'speed': None,   # 재생 속도 (None: 지연 없음, 1.0: 기록된 응답 시간 그대로)
+        'scratch': None, # 재생 중 저널/체크포인트를 둘 디렉터리 (None: 임시 디렉터리, 원장은 메모리)
+    },
+    'metrics': {
+        'port': None,  # 지정 시 http://host:port/metrics 로 Prometheus 텍스트 노출
+        'host': '127.0.0.1',
+    },
+    'logging': {
+        'level': 'info',
+        'console': True,    # 사람이 읽는 콘솔 출력 (False 면 JSON 로그만 기록)
+        'json_path': None,  # JSON lines 이벤트 로그 파일
+        'sampling': {},     # 이벤트 이름 -> N (N건 중 1건만 기록)
+    },
+}
+
+
+def load_binance_keys():
+    """Binance API 키 로드 (기본값이면 None)"""
+    api_key = a_base.binance_api_key
+    api_secret = a_base.binance_api_secret
+    if (api_key == 'your_binance_api_key_here' or
+            api_secret == 'your_binance_api_secret_here'):
+        return None, None
+    return api_key, api_secret
+
+
+def load_config(path=None):
+    """
+    데몬 설정 파일(JSON) 로드
+
+    Args:
+        path (str): 설정 파일 경로 (None 이면 기본값만 사용)
+
+    Returns:
+        dict: 기본값과 병합된 설정
+    """
+    config = json.loads(json.dumps(DEFAULT_CONFIG))  # 깊은 복사
+    if not path:
+        return config
+
+    with open(path, encoding='utf-8') as f:
+        user_config = json.load(f)
+
+    for key, value in user_config.items():
+        if key not in config:
+            raise ValueError(f"알 수 없는 설정 항목입니다: {key}")
+        if isinstance(config[key], dict) and isinstance(value, dict):
+            config[key].update(value)
+        else:
+            config[key] = value
+
+    if not config['symbols']:
+        raise ValueError("symbols 에 최소 한 개의 거래쌍이 필요합니다.")
+    if config['shutdown']['cancel_scope'] not in ('own', 'all'):
+        raise ValueError(f"shutdown.cancel_scope 는 'own' 또는 'all' 이어야 합니다: {config['shutdown']['cancel_scope']}")
+    return config
+
+
+def configure_logging(params):
+    """event_log 전역 로거에 레벨/싱크/샘플링 설정 적용"""
+    logger = event_log.logger
+    logger.set_level(params['level'])
+    if params.get('json_path'):
+        logger.add_sink(event_log.JsonLinesSink(params['json_path']))
+    if not params.get('console', True):
+        logger.remove_sinks(event_log.ConsoleSink)
+    for event, every_n in params.get('sampling', {}).items():
+        logger.set_sampling(event, every_n)
+
+
+def _number(name, value, minimum=None, maximum=None, integer=False):
+    """설정 숫자 검증 (bool 은 숫자로 보지 않음)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or (integer and not isinstance(value, int)):
+        raise ValueError(f"{name} 는 {'정수' if integer else '숫자'}여야 합니다: {value!r}")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"{name} 는 {minimum} 이상이어야 합니다: {value!r}")
+    if maximum is not None and value > maximum:
+        raise ValueError(f"{name} 는 {maximum} 이하여야 합니다: {value!r}")
+    return value
+
+
+def _target_ratios(name, value):
+    if not isinstance(value, dict) or set(value) != {'cash', 'crypto'}:
+        raise ValueError(f"{name} 는 {{'cash': 비율, 'crypto': 비율}} 형식이어야 합니다: {value!r}")
+    ratios = {key: float(_number(f"{name}.{key}", value[key], 0, 1)) for key in ('cash', 'crypto')}
+    if ratios['cash'] + ratios['crypto'] > 1.0 + 1e-9:
+        raise ValueError(f"{name} 합계는 1 이하여야 합니다: {value!r}")
+    return ratios
+
+
+def _candle_interval(name, value):
+    if value not in INTERVAL_SECONDS:
+        raise ValueError(f"{name} 는 {', '.join(INTERVAL_SECONDS)} 중 하나여야 합니다: {value!r}")
+    return value
+
+
+# 설정으로 바꿀 수 있는 전략 파라미터 -> 검증 함수 (전략 내부 객체는 덮어쓸 수 없음)
+STRATEGY_PARAMS = {
+    'target_ratios': _target_ratios,
+    'min_trade_amount': lambda name, value: None if value is None else _number(name, value, 0, integer=True),
+    'min_confidence': lambda name, value: float(_number(name, value, 0, 1)),
+    'candle_interval': _candle_interval,
+    'candle_offset': lambda name, value: float(_number(name, value, 0)),
+    'retry_interval': lambda name, value: float(_number(name, value, 0.1)),
+}
+
+
+def apply_strategy_config(strategy, params):
+    """설정값을 검증하여 AITradingStrategy 속성에 적용 (STRATEGY_PARAMS 에 있는 항목만)"""
+    for name, value in params.items():
+        validate = STRATEGY_PARAMS.get(name)
+        if validate is None:
+            raise ValueError(f"알 수 없는 전략 파라미터입니다: {name} (가능: {', '.join(STRATEGY_PARAMS)})")
+        setattr(strategy, name, validate(name, value))
+
+
+class TradingDaemon:
+    """입력 없이 여러 거래쌍의 자동매매를 실행하는 헤드리스 엔진"""
+
+    def __init__(self, config):
+        self.config = config
+        self.symbols = list(config['symbols'])
+        self.bot = TradingBot()
+        # 이전 실행에서 결과를 확인하지 못한 주문 정리
+        get_journal().reconcile(self.bot)
+        get_journal().compact()
+        self.signals = BinanceTechnicalSignals(*load_binance_keys())
+        self.signals.set_rules(config['rules'])
+        self.signals.cache_epsilon = float(_number('signals.cache_epsilon', config['signals']['cache_epsilon'], 0))
+        self.strategies = {}
+        # 모든 거래쌍의 현재가를 틱마다 한 번의 요청으로 조회
+        get_snapshot().track(*self.symbols)
+        for symbol in self.symbols:
+            strategy = AITradingStrategy(self.bot, self.signals)
+            override = config['overrides'].get(symbol, {})
+            apply_strategy_config(strategy, {**config['strategy'], **override.get('strategy', {})})
+            apply_strategy_config(strategy, {**config['schedule'], **override.get('schedule', {})})
+            self.strategies[symbol] = strategy
+        # 이전 실행 상태 복원 (마지막 봉 이후 분량만 다시 받음)
+        self.checkpoint_path = config['checkpoint'].get('path')
+        if self.checkpoint_path:
+            checkpoint.restore(self.checkpoint_path, self.signals, self.strategies)
+        self.user_stream = None
+        if config['user_stream'].get('enabled'):
+            if user_stream.STREAM_AVAILABLE:
+                self.user_stream = user_stream.UserDataStream(
+                    self.bot, self.symbols, config['user_stream'].get('url'), balances=get_balance_service())
+                for strategy in self.strategies.values():
+                    strategy.user_stream = self.user_stream
+            else:
+                print("⚠️ websocket-client 가 설치되어 있지 않아 REST 조회로 주문 상태를 확인합니다.")
+        # 체결/입출금으로 코인 잔고가 바뀌면 해당 거래쌍을 다음 캔들까지 기다리지 않고 재평가
+        get_balance_service().add_listener(self.on_balance_changed)
+        self.premium_tracker = None
+        if config['premium'].get('enabled'):
+            self.premium_tracker = PremiumTracker(self.bot, CandleArchive())
+        self._shutdown = threading.Event()
+
+    def install_signal_handlers(self):
+        """SIGTERM/SIGINT 수신 시 정상 종료하도록 핸들러 등록 (메인 스레드에서 호출)"""
+        def handle(signum, frame):
+            print(f"\n📴 종료 신호 수신 ({signal.Signals(signum).name}), 정리 후 종료합니다.")
+            self._shutdown.set()
+
+        signal.signal(signal.SIGTERM, handle)
+        signal.signal(signal.SIGINT, handle)
+
+    def start(self):
+        """모든 거래쌍의 매매 루프 시작"""
+        if self.user_stream:
+            self.user_stream.start()
+        for symbol, strategy in self.strategies.items():
+            strategy.start_auto_trading(symbol)
+        if self.premium_tracker:
+            self.premium_tracker.start(self.config['premium']['interval'])
+
+    def stop(self):
+        """모든 매매 루프 중지 후 미체결 주문 정리"""
+        self._shutdown.set()
+        for strategy in self.strategies.values():
+            if strategy.is_running:
+                strategy.stop_auto_trading()
+        if self.premium_tracker:
+            self.premium_tracker.stop()
+        if self.user_stream:
+            self.user_stream.stop()
+        if self.config['shutdown'].get('cancel_open_orders'):
+            self.cancel_open_orders()
+        self.save_checkpoint()
+        get_journal().close()
+        get_ledger().close()
+
+    def on_balance_changed(self, changes, balances):
+        """잔고 변화 리스너: 보유 수량이 바뀐 코인의 거래쌍 즉시 평가 (같은 캔들 같은 방향 재주문은 전략이 막음)"""
+        for symbol, strategy in self.strategies.items():
+            if symbol.split('_')[0] in changes and strategy.is_running:
+                strategy.trigger_evaluation()
+
+    def save_checkpoint(self):
+        """현재 윈도우/지표/전략 상태 저장"""
+        if self.checkpoint_path:
+            checkpoint.save(self.checkpoint_path, self.signals, self.strategies)
+
+    def rebalance_portfolio(self):
+        """잔고/현재가 스냅샷 1회로 포트폴리오 리밸런싱"""
+        params = self.config['portfolio']
+        portfolio.rebalance(self.bot, params.get('targets'), float(params['cash_ratio']),
+                            float(params['tolerance']), dry_run=params.get('dry_run', True))
+
+    def cancel_open_orders(self):
+        """
+        거래쌍별 미체결 주문 취소
+
+        기본(cancel_scope='own')은 이 프로세스가 주문 저널에 기록한 clientOrderId 의 주문만 취소하여
+        같은 계정의 수동 주문이나 다른 봇의 주문은 건드리지 않는다.
+        """
+        scope = self.config['shutdown']['cancel_scope']
+        issued = get_journal().issued
+        for symbol in self.symbols:
+            orders = self.bot.get_open_orders(symbol)
+            for order in orders or []:
+                if not order.order_id:
+                    continue
+                if scope == 'own' and order.client_order_id not in issued:
+                    continue
+                self.bot.cancel_order(symbol, order_id=order.order_id)
+
+    def run_forever(self):
+        """종료 신호가 올 때까지 메인 스레드 대기"""
+        metrics_config = self.config['metrics']
+        metrics_server = None
+        if metrics_config.get('port') is not None:
+            metrics_server = metrics.start_metrics_server(metrics_config['port'], metrics_config['host'])
+
+        self.start()
+        checkpoint_interval = float(self.config['checkpoint'].get('interval') or 60.0)
+        next_refresh = time.monotonic() + 60.0
+        next_checkpoint = time.monotonic() + checkpoint_interval
+        rebalance_interval = float(self.config['portfolio'].get('interval') or 3600.0)
+        next_rebalance = time.monotonic() if self.config['portfolio'].get('enabled') else float('inf')
+        try:
+            # 대기 중 거래소 메타데이터(호가 단위, 최소 주문 금액) 갱신, 상태 체크포인트 저장, 리밸런싱
+            while not self._shutdown.wait(
+                    max(0.0, min(next_refresh, next_checkpoint, next_rebalance) - time.monotonic())):
+                now = time.monotonic()
+                if now >= next_refresh:
+                    get_registry().maybe_refresh()
+                    get_journal().reconcile(self.bot, min_age=30.0)  # 응답 없이 끝난 주문 확인
+                    next_refresh = now + 60.0
+                if now >= next_checkpoint:
+                    self.save_checkpoint()
+                    next_checkpoint = now + checkpoint_interval
+                if now >= next_rebalance:
+                    self.rebalance_portfolio()
+                    next_rebalance = now + rebalance_interval
+        finally:
+            self.stop()
+            if metrics_server:
+                metrics_server.shutdown()
+            event_log.flush()
+        print("👋 데몬을 종료합니다.")
+
+
+def use_scratch_paths(config, directory=None):
+    """
+    재생 모드에서 실제 원장/주문 저널/체크포인트를 건드리지 않도록 경로 변경
+
+    재생 응답으로 만든 주문/체결이 실제 기록에 섞이거나, 실제 저널의 미확인 주문이
+    재생 트래픽으로 대조되어 실패 처리되는 것을 막는다.
+    """
+    directory = directory or tempfile.mkdtemp(prefix='replay_')
+    os.makedirs(directory, exist_ok=True)
+    ledger.use_path(':memory:')
+    order_journal.use_path(os.path.join(directory, 'order_journal.jsonl'))
+    if config['checkpoint'].get('path'):
+        config['checkpoint']['path'] = os.path.join(directory, 'checkpoint.npz')
+    print(f"🧪 재생 모드: 원장은 메모리, 저널/체크포인트는 {directory} 에 기록합니다.")
+    return directory
+
+
+def main(argv=None):
+    """메인 실행 함수: python daemon.py [--config daemon.json] [거래쌍 ...]"""
+    parser = argparse.ArgumentParser(description='헤드리스 자동매매 데몬')
+    parser.add_argument('symbols', nargs='*', help='거래쌍 (설정 파일의 symbols 대신 사용)')
+    parser.add_argument('--config', help='데몬 설정 파일 (JSON)')
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    if args.symbols:
+        config['symbols'] = args.symbols
+
+    configure_logging(config['logging'])
+    traffic = config['traffic']
+    if traffic.get('replay'):
+        use_scratch_paths(config, traffic.get('scratch'))
+        traffic_recorder.install_replay(traffic['replay'], traffic.get('speed'))
+    elif traffic.get('record'):
+        traffic_recorder.install_recorder(traffic['record'])
+    print(f"🚀 헤드리스 자동매매 데몬 시작 (거래쌍: {', '.join(config['symbols'])})")
+    daemon = TradingDaemon(config)
+    daemon.install_signal_handlers()
+    daemon.run_forever()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,175 @@
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from datetime import datetime
+
+# 구조화 이벤트 로깅 (JSON lines)
+# 매매 루프 등 핫 패스에서는 이벤트를 큐에 넣기만 하고,
+# 직렬화/출력은 백그라운드 스레드가 싱크(JSON 파일, 콘솔)로 처리한다.
+
+LEVELS = {
+    'debug': 10,
+    'info': 20,
+    'warning': 30,
+    'error': 40,
+}
+
+# 이벤트 이름 -> 사람이 읽는 콘솔 출력 함수 (record -> str)
+RENDERERS = {}
+
+
+def register_renderer(event, renderer):
+    """콘솔 싱크에서 사용할 이벤트별 출력 함수 등록"""
+    RENDERERS[event] = renderer
+
+
+def format_time(record):
+    """레코드 타임스탬프를 'YYYY-mm-dd HH:MM:SS' 로 변환"""
+    return datetime.fromtimestamp(record['ts']).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class JsonLinesSink:
+    """레코드를 한 줄에 하나씩 JSON 으로 기록"""
+
+    def __init__(self, path=None, stream=None):
+        if path:
+            self.stream = open(path, 'a', encoding='utf-8')
+            self._owns_stream = True
+        else:
+            self.stream = stream or sys.stdout
+            self._owns_stream = False
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        if self._owns_stream:
+            self.stream.close()
+
+
+class ConsoleSink:
+    """등록된 렌더러로 사람이 읽기 쉬운 형태로 출력 (선택 싱크)"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def write(self, record):
+        renderer = RENDERERS.get(record['event'])
+        if renderer:
+            text = renderer(record)
+        else:
+            fields = {k: v for k, v in record.items() if k not in ('ts', 'level', 'event')}
+            text = f"[{format_time(record)}] {record['level'].upper()} {record['event']} {fields}"
+        self.stream.write(text + '\n')
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+
+class EventLogger:
+    """백그라운드 큐 기반 구조화 이벤트 로거"""
+
+    def __init__(self, level='info', sinks=None, queue_size=10000):
+        self.level = LEVELS[level]
+        self.sinks = list(sinks) if sinks is not None else []
+        self.sampling = {}   # 이벤트 이름 -> N (N건 중 1건만 기록)
+        self._sample_counts = {}
+        self.dropped = 0     # 큐가 가득 차 버려진 이벤트 수
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._sinks_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def set_level(self, level):
+        self.level = LEVELS[level]
+
+    def set_sampling(self, event, every_n):
+        """고빈도 이벤트 샘플링 설정 (every_n <= 1 이면 전부 기록)"""
+        if every_n <= 1:
+            self.sampling.pop(event, None)
+        else:
+            self.sampling[event] = every_n
+
+    def add_sink(self, sink):
+        with self._sinks_lock:
+            self.sinks.append(sink)
+
+    def remove_sinks(self, sink_type):
+        """특정 타입의 싱크 제거 (예: 헤드리스 실행 시 ConsoleSink)"""
+        with self._sinks_lock:
+            removed = [s for s in self.sinks if isinstance(s, sink_type)]
+            self.sinks = [s for s in self.sinks if not isinstance(s, sink_type)]
+        for sink in removed:
+            sink.close()
+
+    def log(self, event, level='info', **fields):
+        """
+        이벤트 기록 (호출 스레드에서는 큐 적재만 수행)
+
+        Args:
+            event (str): 이벤트 이름 (예: 'order_placed')
+            level (str): 'debug' | 'info' | 'warning' | 'error'
+            **fields: JSON 으로 직렬화할 이벤트 필드
+        """
+        if LEVELS[level] < self.level:
+            return
+
+        every_n = self.sampling.get(event)
+        if every_n and level != 'error':
+            count = self._sample_counts.get(event, 0)
+            self._sample_counts[event] = count + 1
+            if count % every_n:
+                return
+
+        record = {'ts': time.time(), 'level': level, 'event': event}
+        record.update(fields)
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=2.0):
+        """큐에 쌓인 이벤트가 모두 출력될 때까지 대기 (대화형 메뉴 출력 순서 보장용)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def _writer_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            # 쌓여 있는 레코드를 한 번에 처리하여 flush 횟수를 줄임
+            while len(batch) < 500:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            with self._sinks_lock:
+                sinks = list(self.sinks)
+            for sink in sinks:
+                try:
+                    for record in batch:
+                        sink.write(record)
+                    sink.flush()
+                except Exception as e:
+                    sys.stderr.write(f"❌ 로그 출력 오류: {e}\n")
+
+            for _ in batch:
+                self._queue.task_done()
+
+
+# 프로세스 전역 로거 (기본: 콘솔 출력)
+logger = EventLogger(sinks=[ConsoleSink()])
+log = logger.log
+flush = logger.flush
+
+atexit.register(logger.flush)
@@ -0,0 +1,172 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+
+# 가격/수량 고정소수점(정수) 표현
+# 거래소 문자열 값은 파싱 시 한 번 정수 단위로 변환하고,
+# 주문 전송 시(와이어 경계)에서만 호가/수량 단위로 반올림하여 문자열로 되돌린다.
+
+# 원화 금액 소수 자릿수 (KRW 는 정수 원 단위)
+KRW_DECIMALS = 0
+
+# 거래쌍별 (가격 소수 자릿수, 수량 소수 자릿수) 기본값
+DEFAULT_SYMBOL_DECIMALS = {
+    'btc_krw': (0, 8),
+    'eth_krw': (0, 8),
+    'usdt_krw': (0, 8),
+}
+
+# 알 수 없는 KRW 거래쌍 기본값 (저가 코인 대비 가격 소수 2자리)
+FALLBACK_DECIMALS = (2, 8)
+
+
+def parse_units(value, decimals, rounding=ROUND_HALF_EVEN):
+    """
+    숫자 문자열을 10^-decimals 단위 정수로 변환 (float 를 거치지 않음)
+
+    Args:
+        value (str | int | float): API 문자열 값 (예: '0.12345678')
+        decimals (int): 소수 자릿수
+        rounding (str): 초과 자릿수 처리 (기본 ROUND_HALF_EVEN, 잔고는 ROUND_DOWN 으로 0 방향 버림)
+
+    Returns:
+        int: 정수 단위 값
+    """
+    if value is None or value == '':
+        return 0
+    if isinstance(value, int):
+        return value * 10 ** decimals
+    text = value if isinstance(value, str) else repr(value)
+
+    if 'e' in text or 'E' in text:
+        scaled = Decimal(text).scaleb(decimals)
+        return int(scaled.quantize(Decimal(1), rounding=rounding))
+
+    negative = text.startswith('-')
+    if negative or text.startswith('+'):
+        text = text[1:]
+    whole, _, frac = text.partition('.')
+    if len(frac) > decimals:
+        # 초과 자릿수는 Decimal 로 정확히 반올림 (부호는 아래에서 붙이므로 ROUND_DOWN 은 0 방향)
+        scaled = Decimal(whole + '.' + frac).scaleb(decimals)
+        units = int(scaled.quantize(Decimal(1), rounding=rounding))
+    else:
+        units = int((whole or '0') + frac.ljust(decimals, '0'))
+    return -units if negative else units
+
+
+def format_units(units, decimals):
+    """정수 단위 값을 숫자 문자열로 변환 (불필요한 0 제거)"""
+    if decimals == 0:
+        return str(units)
+    sign = '-' if units < 0 else ''
+    whole, frac = divmod(abs(units), 10 ** decimals)
+    frac_text = str(frac).rjust(decimals, '0').rstrip('0')
+    return f"{sign}{whole}.{frac_text}" if frac_text else f"{sign}{whole}"
+
+
+class SymbolScale:
+    """거래쌍별 가격/수량 정수 스케일과 호가/수량 단위"""
+
+    __slots__ = ('symbol', 'price_decimals', 'qty_decimals', 'price_scale', 'qty_scale',
+                 'tick_units', 'lot_units')
+
+    def __init__(self, symbol, price_decimals, qty_decimals, tick_units=1, lot_units=1):
+        self.symbol = symbol
+        self.price_decimals = price_decimals
+        self.qty_decimals = qty_decimals
+        self.price_scale = 10 ** price_decimals
+        self.qty_scale = 10 ** qty_decimals
+        self.tick_units = tick_units  # 호가 단위 (가격 정수 단위 기준)
+        self.lot_units = lot_units    # 수량 단위 (수량 정수 단위 기준)
+
+    # 파싱 (API 문자열 -> 정수)
+    def price_units(self, value):
+        return parse_units(value, self.price_decimals)
+
+    def qty_units(self, value):
+        return parse_units(value, self.qty_decimals)
+
+    # 정수 연산
+    def notional(self, price_units, qty_units):
+        """가격 x 수량 -> 원화 정수 금액 (내림)"""
+        return price_units * qty_units // (self.price_scale * self.qty_scale // 10 ** KRW_DECIMALS)
+
+    def qty_for_amount(self, krw_units, price_units):
+        """원화 금액으로 살 수 있는 수량 (정수 단위, 내림)"""
+        if price_units <= 0:
+            return 0
+        return krw_units * self.price_scale * self.qty_scale // (price_units * 10 ** KRW_DECIMALS)
+
+    # 와이어 경계 반올림
+    def round_price(self, price_units, side):
+        """호가 단위로 반올림 (매수는 내림, 매도는 올림: 불리한 체결 방지)"""
+        tick = self.tick_units
+        if side == 'sell':
+            return -(-price_units // tick) * tick
+        return price_units // tick * tick
+
+    def round_qty(self, qty_units):
+        """수량 단위로 내림 (보유량 초과 주문 방지)"""
+        return qty_units // self.lot_units * self.lot_units
+
+    # 문자열 변환 (전송/표시용)
+    def price_str(self, price_units):
+        return format_units(price_units, self.price_decimals)
+
+    def qty_str(self, qty_units):
+        return format_units(qty_units, self.qty_decimals)
+
+    def price_float(self, price_units):
+        """표시용 float 변환"""
+        return price_units / self.price_scale
+
+    def qty_float(self, qty_units):
+        return qty_units / self.qty_scale
+
+    def __repr__(self):
+        return f"SymbolScale({self.symbol} price_dp={self.price_decimals} qty_dp={self.qty_decimals})"
+
+
+_scales = {}
+
+
+def scale_for(symbol):
+    """거래쌍 스케일 조회 (거래쌍별로 한 번 생성 후 재사용)"""
+    scale = _scales.get(symbol)
+    if scale is None:
+        price_decimals, qty_decimals = DEFAULT_SYMBOL_DECIMALS.get(symbol, FALLBACK_DECIMALS)
+        scale = _scales[symbol] = SymbolScale(symbol, price_decimals, qty_decimals)
+    return scale
+
+
+def register_scale(scale):
+    """거래소 메타데이터로 만든 스케일 등록 (기본값 대체)"""
+    _scales[scale.symbol] = scale
+
+
+def currency_decimals(currency):
+    """자산별 잔고 소수 자릿수 (가상자산은 해당 KRW 거래쌍의 수량 자릿수와 동일)"""
+    if currency == 'krw':
+        return KRW_DECIMALS
+    return scale_for(f"{currency}_krw").qty_decimals
+
+
+def krw_str(krw_units):
+    """원화 정수 금액 -> 전송용 문자열"""
+    return format_units(krw_units, KRW_DECIMALS)
+
+
+def to_units_array(values, decimals):
+    """
+    float 배열을 int64 정수 단위 배열로 변환 (백테스트 등 벡터 연산용)
+
+    입력 경계에서 한 번만 반올림하고 이후 연산은 int64 로 수행한다.
+    """
+    import numpy as np
+    return np.rint(np.asarray(values, dtype=np.float64) * 10 ** decimals).astype(np.int64)
+
+
+def notional_array(price_units, qty_units, scale):
+    """int64 가격 x 수량 배열 -> 원화 정수 금액 배열 (내림)"""
+    import numpy as np
+    divisor = scale.price_scale * scale.qty_scale // 10 ** KRW_DECIMALS
+    return np.floor_divide(np.asarray(price_units, dtype=np.int64) * np.asarray(qty_units, dtype=np.int64), divisor)
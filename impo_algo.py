@@ -1,11 +1,25 @@
 import time
 import threading
-from datetime import datetime
 from typing import Optional
 import a_base
-import requests
-import pandas as pd
-import numpy as np
+import metrics
+import event_log
+from fixed_point import scale_for
+from symbol_registry import get_registry
+from market_snapshot import get_snapshot
+from balance_service import get_balance_service
+from scheduler import CandleScheduler, interval_to_seconds
+from resample import CandleWindow
+from rules import RuleSet, DEFAULT_RULES
+
+
+# 상위 타임프레임 지표별 최소 봉 수 (이보다 짧으면 초기값에 끌려간 값이라 None 으로 처리)
+TIMEFRAME_WARMUP = {
+    'rsi': 14 + 1,       # 변화량 14개
+    'ema20': 20,
+    'macd': 26,          # 느린 EMA
+    'signal': 26 + 9,    # MACD 위의 9 EMA
+}
 
 
 # Binance API 기반 기술적 지표 매매 신호 생성
@@ -27,30 +41,109 @@ class BinanceTechnicalSignals:
         else:
             self.api_secret = api_secret
         
-        # 거래할 코인 심볼들 (Korbit 심볼과 매핑)
-        self.symbol_mapping = {
-            'btc_krw': 'BTCUSDT',
-            'eth_krw': 'ETHUSDT', 
-            'usdt_krw': 'ADAUSDT'  # USDT 대신 ADA 사용
-        }
+        # Korbit <-> Binance 심볼 매핑은 거래소 메타데이터 레지스트리에서 조회
+        self.registry = get_registry()
+
+        # 거래쌍별 1분봉 윈도우 (상위 타임프레임은 1분봉을 리샘플링하여 생성)
+        self.timeframes = ('5m', '15m', '1h')
+        self.candle_windows = {}
+        # 윈도우/지표 상태 변경 구간 보호 (체크포인트 저장과 매매 스레드 간)
+        self.state_lock = threading.Lock()
+
+        # 신호 캐시: (거래쌍, 캔들 간격, 파라미터) -> (마지막 마감 봉 시각, 진행 중인 봉 종가, 신호)
+        # 새 봉이 마감되거나 진행 중인 봉 종가가 cache_epsilon(비율) 넘게 바뀔 때만 다시 계산
+        self.cache_epsilon = 0.0
+        self.signal_cache = {}
+
+        # 매매 규칙 (거래쌍별 증분 평가 상태는 규칙이 바뀌면 초기화)
+        self.set_rules(DEFAULT_RULES)
+
+    def set_rules(self, rules):
+        """
+        매매 규칙 교체
+
+        Args:
+            rules (dict): {'buy': 규칙 문자열, 'sell': 규칙 문자열} (rules.py 문법)
+        """
+        missing = {'buy', 'sell'} - set(rules)
+        if missing:
+            raise ValueError(f"매매 규칙이 없습니다: {', '.join(sorted(missing))}")
+        self.rules = RuleSet(rules)
+        self.rule_streams = {}
+        self.signal_cache = {}
+
+    def _signal_params(self):
+        """신호 캐시 키에 들어가는 파라미터 (규칙 + 상위 타임프레임)"""
+        return tuple(sorted(self.rules.sources.items())), self.timeframes
+
+    def _cached_signal(self, key, window):
+        """캐시된 신호가 현재 윈도우에도 유효하면 반환 (없으면 None)"""
+        cached = self.signal_cache.get(key)
+        if cached is None:
+            return None
+        last_open_time, live_close, signal = cached
+        if last_open_time != window.last_open_time:
+            return None
+        current = window.live[4] if window.live is not None else None
+        if current != live_close:
+            if current is None or live_close is None:
+                return None
+            if abs(current - live_close) > self.cache_epsilon * abs(live_close):
+                return None
+        return signal
+
+    def evaluate_rules(self, symbol, window):
+        """
+        1분봉 윈도우에 매매 규칙을 증분 평가
+
+        새로 마감된 봉만 지표 상태에 반영하고, 진행 중인 봉은 상태를 바꾸지 않고 평가한다.
+
+        Returns:
+            dict: 지표 키 -> 최신 값, 'buy'/'sell' -> 규칙 충족 여부
+        """
+        stream = self.rule_streams.get(symbol)
+        if stream is None:
+            stream = self.rule_streams[symbol] = self.rules.stream()
+
+        new_bars = []
+        for bar in reversed(window.bars):
+            if stream.last_time is not None and bar[0] <= stream.last_time:
+                break
+            new_bars.append(bar)
+        for bar in reversed(new_bars):
+            stream.update(bar[4], bar[0])
+
+        if window.live is not None:
+            return stream.peek(window.live[4])
+        return stream.last
         
+    def _fetch_kline_rows(self, symbol, interval='1m', limit=100):
+        """Binance klines 원본 응답 행 목록 (대응 마켓이 없으면 None)"""
+        # Korbit 심볼을 Binance 심볼로 변환 (대응 마켓이 없으면 조회하지 않음)
+        binance_symbol = self.registry.binance_symbol(symbol) if '_' in symbol else symbol
+        if binance_symbol is None:
+            print(f"⚠️ {symbol} 에 대응하는 Binance 마켓이 없습니다.")
+            return None
+
+        url = f"{self.base_url}/api/v3/klines"
+        params = {
+            'symbol': binance_symbol,
+            'interval': interval,
+            'limit': limit
+        }
+
+        response = a_base.transport.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+
     def get_klines(self, symbol, interval='1m', limit=100):
         """Binance에서 캔들스틱 데이터 가져오기"""
+        import pandas as pd  # 첫 조회 시점에 로드 (시작 시간 단축)
+
         try:
-            # Korbit 심볼을 Binance 심볼로 변환
-            binance_symbol = self.symbol_mapping.get(symbol, symbol)
-            
-            url = f"{self.base_url}/api/v3/klines"
-            params = {
-                'symbol': binance_symbol,
-                'interval': interval,
-                'limit': limit
-            }
-            
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._fetch_kline_rows(symbol, interval, limit)
+            if data is None:
+                return None
             
             # DataFrame으로 변환
             df = pd.DataFrame(data, columns=[
@@ -72,6 +165,66 @@ class BinanceTechnicalSignals:
         except Exception as e:
             print(f"❌ {symbol} 데이터 가져오기 실패: {e}")
             return None
+
+    def update_candle_window(self, symbol):
+        """
+        거래쌍 1분봉 윈도우를 증분 갱신 (마지막 봉 이후 분량만 요청)
+
+        최초 호출 시에만 윈도우 전체(최대 1000개)를 받고, 이후에는 새로 마감된 봉과
+        진행 중인 봉만 받는다. 상위 타임프레임 캔들은 윈도우가 1분봉 마감마다 갱신한다.
+
+        Returns:
+            CandleWindow: 갱신된 윈도우 (조회 실패 시 None)
+        """
+        window = self.candle_windows.get(symbol)
+        if window is None:
+            window = self.candle_windows[symbol] = CandleWindow(symbol, self.timeframes)
+
+        try:
+            limit = window.missing_bars(int(time.time() * 1000)) + 1
+            rows = self._fetch_kline_rows(symbol, '1m', min(limit, window.capacity))
+            if rows is None:
+                return None
+            with self.state_lock:
+                window.update(rows)
+            return window
+        except Exception as e:
+            print(f"❌ {symbol} 데이터 가져오기 실패: {e}")
+            return None
+
+    def get_timeframe_indicators(self, window):
+        """
+        상위 타임프레임별 지표 (리샘플링 캔들 기준, 추가 요청 없음)
+
+        Returns:
+            dict: 타임프레임 -> {'close', 'rsi', 'ema20', 'macd', 'signal'}
+                  (계산 불가 값과 봉 수가 TIMEFRAME_WARMUP 미만인 지표는 None)
+        """
+        import math
+
+        def latest(series):
+            if series is None or len(series) == 0:
+                return None
+            value = float(series.iloc[-1])
+            return None if math.isnan(value) else value
+
+        indicators = {}
+        for interval in self.timeframes:
+            df = window.frame(interval, limit=100)
+            if len(df) == 0:
+                continue
+            macd_line, signal_line = self.calculate_macd(df['close'])
+            values = {
+                'rsi': latest(self.calculate_rsi(df['close'], 14)),
+                'ema20': latest(self.calculate_ema(df['close'], 20)),
+                'macd': latest(macd_line),
+                'signal': latest(signal_line),
+            }
+            indicators[interval] = {
+                'close': latest(df['close']),
+                **{name: value if len(df) >= TIMEFRAME_WARMUP[name] else None for name, value in values.items()},
+            }
+        return indicators
     
     def calculate_rsi(self, prices, period=14):
         """RSI 계산"""
@@ -129,10 +282,12 @@ class BinanceTechnicalSignals:
             }
         """
         try:
-            # 1분봉 데이터 가져오기
-            df = self.get_klines(symbol, '1m', 100)
+            # 1분봉 데이터 가져오기 (증분 갱신)
+            with metrics.time_stage('kline_fetch'):
+                window = self.update_candle_window(symbol)
+            bars = len(window.bars) + (window.live is not None) if window else 0
             
-            if df is None or len(df) < 50:
+            if bars < 50:
                 return {
                     'action': 'hold',
                     'confidence': 0.0,
@@ -142,62 +297,56 @@ class BinanceTechnicalSignals:
                     'timestamp': int(time.time() * 1000)
                 }
             
-            # 기술적 지표 계산
-            rsi = self.calculate_rsi(df['close'], 14)
-            ema20 = self.calculate_ema(df['close'], 20)
-            macd_line, signal_line = self.calculate_macd(df['close'])
+            # 마지막 마감 봉과 진행 중인 봉 종가가 그대로면 이전 신호 재사용
+            cache_key = (symbol, '1m', self._signal_params())
+            cached = self._cached_signal(cache_key, window)
+            if cached is not None:
+                metrics.registry.inc('signal_cache', result='hit')
+                return {**cached, 'timestamp': int(time.time() * 1000)}
+            metrics.registry.inc('signal_cache', result='miss')
             
-            if rsi is None or ema20 is None or macd_line is None or signal_line is None:
-                return {
-                    'action': 'hold',
-                    'confidence': 0.0,
-                    'target_ratio': {'cash': 0.4, 'crypto': 0.6},
-                    'reason': '지표 계산 실패',
-                    'risk_level': 'high',
-                    'timestamp': int(time.time() * 1000)
-                }
-            
-            # 최신 값들
-            current_rsi = rsi.iloc[-1]
-            current_close = df['close'].iloc[-1]
-            current_ema = ema20.iloc[-1]
-            current_macd = macd_line.iloc[-1]
-            current_signal = signal_line.iloc[-1]
+            # 매매 규칙 평가 (마감된 봉은 증분 반영)
+            with metrics.time_stage('signal_compute'):
+                with self.state_lock:
+                    values = self.evaluate_rules(symbol, window)
+                timeframes = self.get_timeframe_indicators(window)
             
-            # 매매 신호 조건 확인
-            if (current_rsi < 30 and 
-                current_macd > current_signal and 
-                current_close > current_ema):
-                return {
+            if values['buy']:
+                signal = {
                     'action': 'buy',
                     'confidence': 0.85,
                     'target_ratio': {'cash': 0.4, 'crypto': 0.6},
-                    'reason': f"RSI: {current_rsi:.2f} (과매도), MACD > Signal, Close > EMA20",
+                    'reason': f"매수 규칙 충족 ({self.rules.describe(values, 'buy')})",
                     'risk_level': 'low',
-                    'timestamp': int(time.time() * 1000)
+                    'timestamp': int(time.time() * 1000),
+                    'timeframes': timeframes
                 }
             
-            elif (current_rsi > 70 and 
-                  current_macd < current_signal and 
-                  current_close < current_ema):
-                return {
+            elif values['sell']:
+                signal = {
                     'action': 'sell',
                     'confidence': 0.85,
                     'target_ratio': {'cash': 0.4, 'crypto': 0.6},
-                    'reason': f"RSI: {current_rsi:.2f} (과매수), MACD < Signal, Close < EMA20",
+                    'reason': f"매도 규칙 충족 ({self.rules.describe(values, 'sell')})",
                     'risk_level': 'low',
-                    'timestamp': int(time.time() * 1000)
+                    'timestamp': int(time.time() * 1000),
+                    'timeframes': timeframes
                 }
             
             else:
-                return {
+                signal = {
                     'action': 'hold',
                     'confidence': 0.6,
                     'target_ratio': {'cash': 0.4, 'crypto': 0.6},
-                    'reason': f"RSI: {current_rsi:.2f}, MACD: {current_macd:.6f}, Signal: {current_signal:.6f}",
+                    'reason': self.rules.describe(values),
                     'risk_level': 'medium',
-                    'timestamp': int(time.time() * 1000)
+                    'timestamp': int(time.time() * 1000),
+                    'timeframes': timeframes
                 }
+            
+            live_close = window.live[4] if window.live is not None else None
+            self.signal_cache[cache_key] = (window.last_open_time, live_close, signal)
+            return signal
                 
         except Exception as e:
             print(f"❌ 신호 생성 오류: {e}")
@@ -211,6 +360,41 @@ class BinanceTechnicalSignals:
             }
 
 
+def _timeframe_lines(timeframes):
+    """상위 타임프레임 지표 요약 줄 (없으면 빈 목록)"""
+    if not timeframes:
+        return []
+    parts = []
+    for interval, values in timeframes.items():
+        rsi = values.get('rsi')
+        parts.append(f"{interval} RSI {rsi:.1f}" if rsi is not None else f"{interval} RSI N/A")
+    return [f"⏱️ 상위 타임프레임: {' | '.join(parts)}"]
+
+
+def _render_trading_status(record):
+    """trading_status 이벤트 콘솔 출력"""
+    portfolio = record['portfolio']
+    target_ratios = record['target_ratios']
+    scale = scale_for(record['symbol'])
+    return "\n".join([
+        f"\n{'='*60}",
+        f"🤖 AI 매매 분석 결과 - {event_log.format_time(record)}",
+        f"{'='*60}",
+        f"📈 {record['symbol'].upper()}: {scale.price_float(record['price']):,.0f} KRW",
+        f"💰 총 자산: {portfolio['total_krw_value']:,} KRW",
+        f"💵 현금: {portfolio['krw_balance']:,} KRW ({portfolio['current_cash_ratio']*100:.1f}%)",
+        f"🪙 코인: {scale.qty_float(portfolio['crypto_balance']):.6f} ({portfolio['current_crypto_ratio']*100:.1f}%)",
+        f"🎯 목표 비율: 현금 {target_ratios['cash']*100}% : 코인 {target_ratios['crypto']*100}%",
+        f"🧠 AI 판단: {record['action'].upper()} (신뢰도: {record['confidence']*100:.1f}%)",
+        f"📝 근거: {record['reason']}",
+        *_timeframe_lines(record.get('timeframes')),
+        f"{'='*60}",
+    ])
+
+
+event_log.register_renderer('trading_status', _render_trading_status)
+
+
 class AITradingStrategy:
     """기술적 지표 기반 자동 매매 전략"""
 
@@ -220,8 +404,34 @@ class AITradingStrategy:
         self.is_running = False
         self.trading_thread = None
         self.target_ratios = {'cash': 0.4, 'crypto': 0.6}  # 현금 4: 코인 6
-        self.min_trade_amount = 10000  # 최소 거래 금액 (KRW)
-        self.check_interval = 30  # 30초마다 체크
+        self.min_trade_amount = None  # 최소 거래 금액 (KRW, None 이면 거래소 최소 주문 금액)
+        self.min_confidence = 0.7  # 매매 실행 최소 신뢰도
+        self.candle_interval = '1m'  # 평가 기준 캔들 간격
+        self.candle_offset = 1.0  # 캔들 마감 후 평가까지 대기 (초)
+        self.retry_interval = 5  # 조회 실패 시 재시도 대기 (초)
+        self.scheduler = None
+        self.snapshot = get_snapshot()  # 거래쌍 간 공유 현재가 스냅샷 (일괄 조회)
+        self.balances = get_balance_service()  # 거래쌍 간 공유 잔고 인덱스
+        self.user_stream = None  # UserDataStream (연결되어 있으면 체결을 폴링 대신 이벤트로 확인)
+        # 재시작 시 이어받는 상태 (checkpoint.py): 같은 캔들에서 같은 방향으로 다시 주문하지 않는 데 사용
+        self.last_trade = None  # 마지막 체결 주문 {'side', 'price', 'amount'|'qty', 'timestamp'}
+
+    def checkpoint_state(self) -> dict:
+        """체크포인트에 저장할 전략 상태 (JSON 직렬화 가능)"""
+        return {'last_trade': self.last_trade}
+
+    def restore_state(self, state: dict):
+        """checkpoint_state 결과로 전략 상태 복원"""
+        self.last_trade = state.get('last_trade')
+
+    def _traded_this_candle(self, side: str, now_ms: int = None) -> bool:
+        """현재 평가 캔들 안에서 같은 방향 주문을 이미 냈는지 (재시작 직후 재진입 방지)"""
+        trade = self.last_trade
+        if not trade or trade.get('side') != side:
+            return False
+        period_ms = interval_to_seconds(self.candle_interval) * 1000
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        return trade.get('timestamp', 0) >= now_ms - now_ms % period_ms
 
     def start_auto_trading(self, symbol: str = 'btc_krw'):
         """자동 매매 시작"""
@@ -230,6 +440,7 @@ class AITradingStrategy:
             return
 
         self.is_running = True
+        self.scheduler = CandleScheduler(self.candle_interval, self.candle_offset)
         self.trading_thread = threading.Thread(
             target=self._trading_loop,
             args=(symbol,),
@@ -238,7 +449,7 @@ class AITradingStrategy:
         self.trading_thread.start()
         print(f"🤖 AI 자동 매매가 시작되었습니다! (거래쌍: {symbol})")
         print(f"📊 목표 비율: 현금 {self.target_ratios['cash']*100}% : 코인 {self.target_ratios['crypto']*100}%")
-        print("⏰ 30초마다 AI 분석을 수행합니다.")
+        print(f"⏰ {self.candle_interval} 캔들 마감 {self.candle_offset:g}초 후마다 AI 분석을 수행합니다.")
         print("🛑 중지하려면 '0'을 입력하세요.")
 
     def stop_auto_trading(self):
@@ -248,99 +459,86 @@ class AITradingStrategy:
             return
 
         self.is_running = False
+        if self.scheduler:
+            self.scheduler.stop()
         if self.trading_thread:
             self.trading_thread.join(timeout=5)
         print("🛑 AI 자동 매매가 중지되었습니다.")
 
+    def trigger_evaluation(self):
+        """데이터 이벤트(체결, 가격 급변 등) 발생 시 다음 캔들을 기다리지 않고 즉시 평가"""
+        if self.scheduler:
+            self.scheduler.trigger()
+
     def _trading_loop(self, symbol: str):
         """매매 루프 (별도 스레드에서 실행)"""
         print(f"🔄 AI 매매 루프 시작 (거래쌍: {symbol})")
 
+        scheduler = self.scheduler
+
+        # 시작 직후 한 번 평가한 뒤, 이후에는 캔들 마감 시각에 맞춰 평가
         while self.is_running:
             try:
                 # 1. 현재 포트폴리오 상태 조회
-                portfolio = self._get_portfolio_status(symbol)
+                with metrics.time_stage('portfolio_fetch'):
+                    portfolio = self._get_portfolio_status(symbol)
                 if not portfolio:
-                    print("❌ 포트폴리오 조회 실패, 30초 후 재시도...")
-                    time.sleep(self.check_interval)
+                    print(f"❌ 포트폴리오 조회 실패, {self.retry_interval}초 후 재시도...")
+                    scheduler.wait(self.retry_interval)
                     continue
 
                 # 2. 현재가 조회
-                price_info = self.bot.get_current_price(symbol)
+                with metrics.time_stage('price_fetch'):
+                    price_info = self.snapshot.get(symbol)
                 if not price_info:
-                    print("❌ 현재가 조회 실패, 30초 후 재시도...")
-                    time.sleep(self.check_interval)
+                    print(f"❌ 현재가 조회 실패, {self.retry_interval}초 후 재시도...")
+                    scheduler.wait(self.retry_interval)
                     continue
 
-                current_price = price_info['close']
+                current_price = price_info.close
 
                 # 3. 기술적 지표에서 매매 신호 받기
                 signal = self.technical_signals.get_trading_signal(symbol, current_price, portfolio)
 
-                # 4. 매매 신호 출력
-                self._print_trading_status(symbol, current_price, portfolio, signal)
+                # 4. 매매 신호 기록
+                self._log_trading_status(symbol, current_price, portfolio, signal)
 
                 # 5. 매매 실행
-                if signal['action'] != 'hold' and signal['confidence'] > 0.7:
+                if signal['action'] != 'hold' and signal['confidence'] > self.min_confidence:
                     self._execute_trade(symbol, signal, portfolio, current_price)
 
-                # 6. 다음 체크까지 대기
-                time.sleep(self.check_interval)
+                # 6. 다음 캔들 마감(또는 데이터 이벤트)까지 대기
+                scheduler.wait_next()
 
             except Exception as e:
                 print(f"❌ 매매 루프 오류: {e}")
-                time.sleep(self.check_interval)
+                scheduler.wait(self.retry_interval)
 
         print("🔄 AI 매매 루프 종료")
 
     def _get_portfolio_status(self, symbol: str) -> Optional[dict]:
         """포트폴리오 상태 조회"""
         try:
-            # 잔고 조회 (d_wallet.py의 로직 활용)
-            timestamp = int(time.time() * 1000)
-            params = {"timestamp": timestamp}
-
-            from urllib.parse import urlencode
-            query_string = urlencode(params)
-            signature = a_base.create_signature(a_base.api_secret, query_string)
-            params["signature"] = signature
-
-            headers = {"X-KAPI-KEY": a_base.api_key}
-            url = f"{a_base.base_url}/v2/balance"
-
-            response = a_base.requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-
-            data = response.json()
-            if not data.get('success'):
+            # 잔고 조회 (공유 잔고 인덱스, 같은 틱의 다른 거래쌍 루프와 조회 1회 공유)
+            balances = self.balances.snapshot()
+            if balances is None:
                 return None
 
-            balances = data.get('data', [])
-
             # KRW와 암호화폐 잔고 추출
-            krw_balance = 0
-            crypto_balance = 0
             crypto_symbol = symbol.split('_')[0]  # 'btc_krw' -> 'btc'
+            krw_balance = balances['krw'].available if 'krw' in balances else 0
+            crypto_balance = balances[crypto_symbol].available if crypto_symbol in balances else 0
 
-            for balance in balances:
-                currency = balance.get('currency', '').lower()
-                available = float(balance.get('available', 0))
-
-                if currency == 'krw':
-                    krw_balance = available
-                elif currency == crypto_symbol:
-                    crypto_balance = available
-
-            # 현재가로 총 자산 가치 계산
-            price_info = self.bot.get_current_price(symbol)
-            current_price = price_info['close'] if price_info else 0
+            # 현재가로 총 자산 가치 계산 (원화 정수 단위, 공유 스냅샷 사용)
+            price_info = self.snapshot.get(symbol)
+            current_price = price_info.close if price_info else 0
 
-            crypto_krw_value = crypto_balance * current_price
+            crypto_krw_value = scale_for(symbol).notional(current_price, crypto_balance)
             total_krw_value = krw_balance + crypto_krw_value
 
             return {
-                'krw_balance': krw_balance,
-                'crypto_balance': crypto_balance,
+                'krw_balance': krw_balance,          # 원화 정수
+                'crypto_balance': crypto_balance,    # 수량 정수 단위
                 'crypto_krw_value': crypto_krw_value,
                 'total_krw_value': total_krw_value,
                 'current_cash_ratio': krw_balance / total_krw_value if total_krw_value > 0 else 0,
@@ -351,26 +549,30 @@ class AITradingStrategy:
             print(f"❌ 포트폴리오 조회 오류: {e}")
             return None
 
-    def _print_trading_status(self, symbol: str, current_price: float, portfolio: dict, signal: dict):
-        """현재 매매 상태 출력"""
-        print(f"\n{'='*60}")
-        print(f"🤖 AI 매매 분석 결과 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"{'='*60}")
-        print(f"📈 {symbol.upper()}: {current_price:,.0f} KRW")
-        print(f"💰 총 자산: {portfolio['total_krw_value']:,.0f} KRW")
-        print(f"💵 현금: {portfolio['krw_balance']:,.0f} KRW ({portfolio['current_cash_ratio']*100:.1f}%)")
-        print(f"🪙 코인: {portfolio['crypto_balance']:.6f} ({portfolio['current_crypto_ratio']*100:.1f}%)")
-        print(f"🎯 목표 비율: 현금 {self.target_ratios['cash']*100}% : 코인 {self.target_ratios['crypto']*100}%")
-        print(f"🧠 AI 판단: {signal['action'].upper()} (신뢰도: {signal['confidence']*100:.1f}%)")
-        print(f"📝 근거: {signal['reason']}")
-        print(f"{'='*60}")
-
-    def _execute_trade(self, symbol: str, signal: dict, portfolio: dict, current_price: float):
+    def _log_trading_status(self, symbol: str, current_price: int, portfolio: dict, signal: dict):
+        """현재 매매 상태를 이벤트로 기록 (콘솔 출력은 event_log 콘솔 싱크가 담당)"""
+        event_log.log(
+            'trading_status',
+            symbol=symbol,
+            price=current_price,
+            portfolio=portfolio,
+            target_ratios=self.target_ratios,
+            action=signal['action'],
+            confidence=signal['confidence'],
+            reason=signal['reason'],
+            timeframes=signal.get('timeframes'),
+        )
+
+    def _execute_trade(self, symbol: str, signal: dict, portfolio: dict, current_price: int):
         """매매 실행"""
         try:
             action = signal['action']
             confidence = signal['confidence']
 
+            if self._traded_this_candle(action):
+                print(f"⏭️ {action} 스킵: 이번 {self.candle_interval} 캔들에서 이미 주문했습니다.")
+                return
+
             if action == 'buy':
                 self._execute_buy(symbol, portfolio, current_price, confidence)
             elif action == 'sell':
@@ -379,7 +581,13 @@ class AITradingStrategy:
         except Exception as e:
             print(f"❌ 매매 실행 오류: {e}")
 
-    def _execute_buy(self, symbol: str, portfolio: dict, current_price: float, confidence: float):
+    def _min_trade_amount(self, symbol: str) -> int:
+        """설정된 최소 거래 금액과 거래소 최소 주문 금액 중 큰 값"""
+        info = get_registry().get(symbol)
+        exchange_min = info.min_notional if info else 0
+        return max(self.min_trade_amount or 0, exchange_min)
+
+    def _execute_buy(self, symbol: str, portfolio: dict, current_price: int, confidence: float):
         """매수 실행"""
         krw_balance = portfolio['krw_balance']
         current_cash_ratio = portfolio['current_cash_ratio']
@@ -393,28 +601,48 @@ class AITradingStrategy:
         # 매수 금액 계산 (신뢰도와 비율 차이에 따라 조정)
         ratio_diff = current_cash_ratio - target_cash_ratio
         buy_ratio = min(ratio_diff * confidence, 0.1)  # 최대 10%씩 매수
-        buy_amount = krw_balance * buy_ratio
+        buy_amount = int(krw_balance * buy_ratio)  # 원화 정수 (내림)
 
-        if buy_amount < self.min_trade_amount:
-            print(f"⏭️ 매수 스킵: 거래 금액이 최소 금액 미만 ({buy_amount:,.0f} < {self.min_trade_amount:,.0f})")
+        min_trade_amount = self._min_trade_amount(symbol)
+        if buy_amount < min_trade_amount:
+            print(f"⏭️ 매수 스킵: 거래 금액이 최소 금액 미만 ({buy_amount:,} < {min_trade_amount:,})")
             return
 
-        print(f"🟢 AI 매수 실행: {buy_amount:,.0f} KRW")
+        print(f"🟢 AI 매수 실행: {buy_amount:,} KRW")
 
         # 시장가 매수 주문
-        result = self.bot.place_order(
-            symbol=symbol,
-            side='buy',
-            amt=str(int(buy_amount)),
-            order_type='market'
-        )
-
-        if result and result.get('success'):
+        with metrics.time_stage('order_submit'):
+            result = self.bot.place_order_units(
+                symbol=symbol,
+                side='buy',
+                amt_units=buy_amount,
+                order_type='market'
+            )
+
+        if result:
             print(f"✅ 매수 주문 성공!")
+            self._confirm_order(symbol, result)
+            self.last_trade = {'side': 'buy', 'price': current_price, 'amount': buy_amount,
+                               'timestamp': int(time.time() * 1000)}
         else:
             print(f"❌ 매수 주문 실패")
 
-    def _execute_sell(self, symbol: str, portfolio: dict, current_price: float, confidence: float):
+    def _confirm_order(self, symbol: str, order):
+        """
+        시장가(ioc) 주문 완료 확인 (체결 내역 원장 반영)
+
+        사용자 데이터 스트림이 연결되어 있으면 완료 이벤트를 기다리고,
+        없거나 제한 시간 안에 오지 않으면 REST 로 한 번 조회한다.
+        """
+        stream = self.user_stream
+        if stream is not None and stream.connected:
+            done = stream.wait_for(order.order_id)
+            if done is not None:
+                stream.forget(order.order_id)
+                return done
+        return self.bot.get_order_status(symbol, order_id=order.order_id)
+
+    def _execute_sell(self, symbol: str, portfolio: dict, current_price: int, confidence: float):
         """매도 실행"""
         crypto_balance = portfolio['crypto_balance']
         current_crypto_ratio = portfolio['current_crypto_ratio']
@@ -428,25 +656,31 @@ class AITradingStrategy:
         # 매도 수량 계산
         ratio_diff = current_crypto_ratio - target_crypto_ratio
         sell_ratio = min(ratio_diff * confidence, 0.1)  # 최대 10%씩 매도
-        sell_quantity = crypto_balance * sell_ratio
+        scale = scale_for(symbol)
+        sell_quantity = scale.round_qty(int(crypto_balance * sell_ratio))  # 수량 정수 단위
 
         # 최소 거래 금액 체크
-        sell_value = sell_quantity * current_price
-        if sell_value < self.min_trade_amount:
-            print(f"⏭️ 매도 스킵: 거래 금액이 최소 금액 미만 ({sell_value:,.0f} < {self.min_trade_amount:,.0f})")
+        sell_value = scale.notional(current_price, sell_quantity)
+        min_trade_amount = self._min_trade_amount(symbol)
+        if sell_value < min_trade_amount:
+            print(f"⏭️ 매도 스킵: 거래 금액이 최소 금액 미만 ({sell_value:,} < {min_trade_amount:,})")
             return
 
-        print(f"🔴 AI 매도 실행: {sell_quantity:.6f} (약 {sell_value:,.0f} KRW)")
+        print(f"🔴 AI 매도 실행: {scale.qty_str(sell_quantity)} (약 {sell_value:,} KRW)")
 
         # 시장가 매도 주문
-        result = self.bot.place_order(
-            symbol=symbol,
-            side='sell',
-            qty=f"{sell_quantity:.6f}",
-            order_type='market'
-        )
-
-        if result and result.get('success'):
+        with metrics.time_stage('order_submit'):
+            result = self.bot.place_order_units(
+                symbol=symbol,
+                side='sell',
+                qty_units=sell_quantity,
+                order_type='market'
+            )
+
+        if result:
             print(f"✅ 매도 주문 성공!")
+            self._confirm_order(symbol, result)
+            self.last_trade = {'side': 'sell', 'price': current_price, 'qty': sell_quantity,
+                               'timestamp': int(time.time() * 1000)}
         else:
             print(f"❌ 매도 주문 실패")
\ No newline at end of file
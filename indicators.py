@@ -0,0 +1,282 @@
+import numpy as np
+
+try:
+    import numba  # 선택 의존성: 설치되어 있으면 재귀 루프를 JIT 컴파일
+except ImportError:
+    numba = None
+
+# 2차원(종목 x 시간) 배열용 기술적 지표 커널
+# 행마다 종목 하나의 가격 시계열이며, 이력이 짧은 종목은 앞쪽을 NaN 으로 채운다.
+# 결과는 BinanceTechnicalSignals.calculate_rsi/ema/macd (pandas) 와 같은 값을 낸다.
+#
+# EMA/Wilder 재귀처럼 시간 축으로 벡터화되지 않는 루프는 numba 가 있으면 JIT 커널을,
+# 없으면 행 방향으로 벡터화한 NumPy 구현을 사용한다 (set_backend 로 전환 가능).
+
+JIT_AVAILABLE = numba is not None
+_backend = 'numba' if JIT_AVAILABLE else 'numpy'
+
+
+def jit(fn):
+    """numba 가 있으면 nopython JIT 컴파일한 함수, 없으면 None"""
+    return numba.njit(cache=True)(fn) if JIT_AVAILABLE else None
+
+
+def get_backend():
+    return _backend
+
+
+def set_backend(name):
+    """재귀 루프 구현 선택 ('numba' | 'numpy', 벤치마크/일치 검증용)"""
+    global _backend
+    if name not in ('numba', 'numpy'):
+        raise ValueError(f"알 수 없는 백엔드입니다: {name}")
+    if name == 'numba' and not JIT_AVAILABLE:
+        raise ValueError("numba 가 설치되어 있지 않습니다.")
+    _backend = name
+
+
+def _as_2d(values):
+    """1차원 입력은 (1, T) 로 변환 (반환 시 원래 차원으로 되돌리기 위해 여부도 반환)"""
+    array = np.asarray(values, dtype=np.float64)
+    return (array[np.newaxis, :], True) if array.ndim == 1 else (array, False)
+
+
+def first_valid(values):
+    """행별 첫 유효(NaN 아닌) 값 위치 (전부 NaN 이면 T)"""
+    values, _ = _as_2d(values)
+    valid = ~np.isnan(values)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), values.shape[1])
+
+
+def _alphas(span, rows):
+    """span(스칼라 또는 행별 배열) -> 행별 평활 계수 (rows, )"""
+    span = np.broadcast_to(np.asarray(span, dtype=np.float64), (rows,))
+    return 2.0 / (span + 1.0)
+
+
+def ema(values, span, min_periods=0):
+    """
+    지수이동평균 (pandas ewm(span, adjust=False, min_periods).mean() 과 동일)
+
+    NaN 처리:
+      - 각 행의 첫 유효 값 이전(워밍업 구간)은 NaN
+      - 중간의 NaN(누락된 봉)은 직전 값을 유지하고, 그동안 과거 가중치는 계속 감소한다
+      - min_periods 개의 유효 값이 모이기 전까지는 NaN
+
+    Args:
+        values: (T,) 또는 (N, T) 배열
+        span: 스칼라 또는 행별 span 배열 (N,) - 파라미터 스윕용
+    """
+    values, squeeze = _as_2d(values)
+    out = ewm(values, _alphas(span, values.shape[0]), min_periods)
+    return out[0] if squeeze else out
+
+
+def wilder(values, period, min_periods=None):
+    """
+    Wilder 평활 (RMA, pandas ewm(alpha=1/period, adjust=False, min_periods=period) 와 동일)
+
+    NaN 처리는 ema 와 같고, 기본적으로 period 개가 모이기 전까지는 NaN.
+    """
+    values, squeeze = _as_2d(values)
+    period = np.broadcast_to(np.asarray(period, dtype=np.float64), (values.shape[0],))
+    out = ewm(values, 1.0 / period, int(period.max()) if min_periods is None else min_periods)
+    return out[0] if squeeze else out
+
+
+def ewm(values, alpha, min_periods=0):
+    """
+    (N, T) 배열의 행별 지수가중평균 (adjust=False, 행별 평활 계수 alpha (N,))
+
+    ema/wilder 공통 재귀 루프. 백엔드에 따라 JIT 커널 또는 NumPy 구현을 사용한다.
+    """
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    alpha = np.ascontiguousarray(alpha, dtype=np.float64)
+    out = np.empty_like(values)
+    if _backend == 'numba':
+        _ewm_kernel_jit(values, alpha, out)
+    elif not _has_gaps(values):
+        _ewm_numpy_dense(values, alpha, out)
+    else:
+        _ewm_numpy(values, alpha, out)
+    if min_periods > 1:
+        out[_observed_counts(values) < min_periods] = np.nan
+    return out
+
+
+def _ewm_kernel(values, alpha, out):
+    """행/시간 이중 루프 (numba 컴파일 대상, pandas ignore_na=False 규칙과 동일)"""
+    rows, length = values.shape
+    for i in range(rows):
+        a = alpha[i]
+        weighted = np.nan
+        old_weight = 1.0
+        for t in range(length):
+            x = values[i, t]
+            if weighted == weighted:  # 시작 이후 (NaN 이 아님)
+                old_weight *= 1.0 - a
+                if x == x:
+                    weighted = (old_weight * weighted + a * x) / (old_weight + a)
+                    old_weight = 1.0
+            elif x == x:
+                weighted = x
+            out[i, t] = weighted
+
+
+_ewm_kernel_jit = jit(_ewm_kernel)
+
+
+def _ewm_numpy_dense(values, alpha, out):
+    """중간 NaN 이 없는 경우의 단순 재귀식 (워밍업 구간만 NaN 으로 유지, 행 방향 벡터화)"""
+    decay = 1.0 - alpha
+    prev = np.full(values.shape[0], np.nan)
+    for t in range(values.shape[1]):
+        x = values[:, t]
+        blended = alpha * x + decay * prev
+        prev = np.where(np.isnan(prev), x, blended)
+        out[:, t] = prev
+
+
+def _ewm_numpy(values, alpha, out):
+    """중간 NaN 이 있는 경우 (행 방향 벡터화)"""
+    decay = 1.0 - alpha
+    weighted = np.full(values.shape[0], np.nan)
+    old_weight = np.ones(values.shape[0])
+    for t in range(values.shape[1]):
+        x = values[:, t]
+        is_obs = ~np.isnan(x)
+        started = ~np.isnan(weighted)
+
+        # 시작 이후에는 관측 여부와 관계없이 과거 가중치 감소 (pandas ignore_na=False)
+        old_weight = np.where(started, old_weight * decay, old_weight)
+        update = started & is_obs
+        blended = (old_weight * weighted + alpha * x) / (old_weight + alpha)
+        weighted = np.where(update, blended, weighted)
+        old_weight = np.where(update, 1.0, old_weight)
+        weighted = np.where(~started & is_obs, x, weighted)
+
+        out[:, t] = weighted
+
+
+def _has_gaps(values):
+    """첫 유효 값 이후에 NaN 이 있는 행이 있는지"""
+    missing = np.isnan(values)
+    if not missing.any():
+        return False
+    valid = np.logical_not(missing)
+    return bool((missing & (np.cumsum(valid, axis=1) > 0)).any())
+
+
+def _observed_counts(values):
+    """행별 누적 유효 값 개수 (N, T)"""
+    return np.cumsum(~np.isnan(values), axis=1)
+
+
+def _rolling_mean(values, window, start):
+    """행별 단순이동평균 (각 행 start 이후 window 개가 모이기 전은 NaN)"""
+    cumsum = np.cumsum(values, axis=1)
+    out = np.full_like(values, np.nan)
+    out[:, window - 1:] = cumsum[:, window - 1:]
+    out[:, window:] -= cumsum[:, :-window]
+    out /= window
+    positions = np.arange(values.shape[1])
+    out[positions[np.newaxis, :] < (start[:, np.newaxis] + window - 1)] = np.nan
+    return out
+
+
+def sma(values, window):
+    """
+    단순이동평균 (pandas rolling(window).mean() 과 동일)
+
+    앞쪽 NaN 은 패딩으로 보고, 중간 NaN 이 포함된 구간은 NaN.
+    """
+    values, squeeze = _as_2d(values)
+    missing = np.isnan(values)
+    out = _rolling_mean(np.where(missing, 0.0, values), window, first_valid(values))
+    gaps = _rolling_mean(missing.astype(np.float64), window, np.zeros(values.shape[0], dtype=np.int64))
+    out[gaps > 0] = np.nan
+    return out[0] if squeeze else out
+
+
+def rsi(values, period=14, method='sma'):
+    """
+    RSI
+
+    Args:
+        method: 'sma' - 단순이동평균 방식 (calculate_rsi 와 동일)
+                'wilder' - Wilder 평활 방식 (첫 period 개 이후부터 값)
+
+    NaN 처리 (pandas 의 delta.where(...) 동작과 동일):
+      - 앞쪽 NaN 은 이력 없음(패딩)으로 보고 워밍업은 각 행의 첫 유효 가격부터 센다
+        (이력이 짧은 종목을 패딩 없이 pandas 로 계산한 결과와 같음)
+      - 첫 가격의 변화량은 0 으로 취급하므로 첫 유효 값은 period 번째 가격 위치에 나온다
+      - 중간의 NaN 가격은 그 위치와 다음 위치의 변화량을 0 으로 취급한다
+      - 상승/하락이 모두 0 인 구간은 NaN, 하락만 0 이면 100
+    """
+    values, squeeze = _as_2d(values)
+    start = first_valid(values)
+    delta = np.diff(values, axis=1, prepend=np.nan)
+    delta = np.nan_to_num(delta, nan=0.0)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    if method == 'wilder':
+        # 패딩 구간은 NaN 으로 되돌려 워밍업을 첫 유효 가격부터 세도록 함
+        padding = np.arange(values.shape[1])[np.newaxis, :] < start[:, np.newaxis]
+        gain = wilder(np.where(padding, np.nan, gains), period)
+        loss = wilder(np.where(padding, np.nan, losses), period)
+    else:
+        gain = _rolling_mean(gains, period, start)
+        loss = _rolling_mean(losses, period, start)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = 100.0 - 100.0 / (1.0 + gain / loss)
+    return out[0] if squeeze else out
+
+
+def macd(values, fast=12, slow=26, signal=9):
+    """
+    MACD 선과 시그널 선 (calculate_macd 와 동일)
+
+    fast/slow/signal 은 스칼라 또는 행별 배열 (파라미터 스윕용)
+    """
+    macd_line = ema(values, fast) - ema(values, slow)
+    return macd_line, ema(macd_line, signal)
+
+
+# 파라미터 스윕 (한 종목 x 여러 파라미터 -> (파라미터 수, T))
+def ema_sweep(prices, spans):
+    """span 목록별 EMA -> (len(spans), T)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    return ema(np.tile(prices, (len(spans), 1)), np.asarray(spans))
+
+
+def rsi_sweep(prices, periods):
+    """period 목록별 RSI -> (len(periods), T)"""
+    prices = np.asarray(prices, dtype=np.float64)
+    return np.vstack([rsi(prices, period) for period in periods])
+
+
+def macd_sweep(prices, params):
+    """
+    (fast, slow, signal) 조합별 MACD -> (MACD 선, 시그널 선) 각각 (len(params), T)
+
+    서로 다른 EMA 기간의 재귀를 한 번의 시간 루프로 함께 계산한다.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    fast, slow, signal = (np.asarray(column) for column in zip(*params))
+    return macd(np.tile(prices, (len(params), 1)), fast, slow, signal)
+
+
+def stack_closes(series_list, length):
+    """
+    종가 시계열 목록을 (종목 수, length) 배열로 정렬 (최근 값 기준 오른쪽 정렬, 부족분은 NaN)
+
+    Args:
+        series_list (list): 종목별 종가 시퀀스 (시간 오름차순)
+        length (int): 시간 축 길이
+    """
+    closes = np.full((len(series_list), length), np.nan)
+    for i, series in enumerate(series_list):
+        tail = np.asarray(series, dtype=np.float64)[-length:]
+        if len(tail):
+            closes[i, length - len(tail):] = tail
+    return closes
@@ -0,0 +1,127 @@
+from datetime import datetime
+import event_log
+from fixed_point import krw_str
+from symbol_registry import get_registry
+
+# 메뉴용 출력 계층
+# TradingBot 은 Order/Ticker 레코드만 반환하고, 화면 출력은 이 모듈이 담당한다.
+# import 시 주문 이벤트의 콘솔 렌더러도 등록된다.
+
+
+def _na(value, formatter=str):
+    return 'N/A' if value is None else formatter(value)
+
+
+def _price(scale, price_units):
+    """정수 가격을 천 단위 구분 문자열로 변환"""
+    return f"{scale.price_float(price_units):,.{scale.price_decimals}f}"
+
+
+def select_symbol():
+    """
+    거래쌍 선택 메뉴 (레지스트리의 주요 거래쌍 번호 또는 거래쌍 직접 입력)
+
+    Returns:
+        str: 선택한 거래쌍 (잘못된 입력이면 None)
+    """
+    registry = get_registry()
+    featured = registry.featured()
+
+    print("\n거래쌍을 선택하세요:")
+    for i, symbol in enumerate(featured, 1):
+        print(f"{i}: {registry.display_name(symbol)}")
+    print("(그 외 거래쌍은 직접 입력, 예: xrp_krw)")
+
+    choice = input("선택: ").strip().lower()
+    if choice.isdigit():
+        index = int(choice) - 1
+        return featured[index] if 0 <= index < len(featured) else None
+    return choice if registry.get(choice) else None
+
+
+def print_price_info(ticker):
+    """현재가 / 호가 출력"""
+    print(f"현재가: {_price(ticker.scale, ticker.close)} KRW")
+    print(f"매수 1호가: {_price(ticker.scale, ticker.best_bid)} KRW")
+    print(f"매도 1호가: {_price(ticker.scale, ticker.best_ask)} KRW")
+
+
+def print_order_status(order):
+    """주문 상태 조회 결과 출력"""
+    scale = order.scale
+    print("\n📊 주문 상태 조회 결과:")
+    print(f"주문 ID: {order.order_id}")
+    print(f"거래쌍: {order.symbol}")
+    print(f"주문 타입: {order.side} / {order.order_type}")
+    print(f"가격: {_na(order.price, scale.price_str)}")
+    print(f"수량: {_na(order.qty, scale.qty_str)}")
+    print(f"체결량: {scale.qty_str(order.filled_qty)}")
+    print(f"체결금액: {krw_str(order.filled_amt)}")
+    print(f"평균 체결가: {_na(order.avg_price, scale.price_str)}")
+    print(f"상태: {order.status}")
+    print(f"주문 시간: {datetime.fromtimestamp(order.created_at / 1000)}")
+
+
+def print_open_orders(orders):
+    """미체결 주문 목록 출력"""
+    print(f"\n📋 미체결 주문 목록 ({len(orders)}건):")
+    print("-" * 100)
+    print(f"{'주문ID':<12} {'타입':<8} {'가격':<12} {'수량':<12} {'체결량':<12} {'상태':<15}")
+    print("-" * 100)
+
+    for order in orders:
+        scale = order.scale
+        print(f"{_na(order.order_id):<12} "
+              f"{_na(order.side):<8} "
+              f"{_na(order.price, scale.price_str):<12} "
+              f"{_na(order.qty, scale.qty_str):<12} "
+              f"{scale.qty_str(order.filled_qty):<12} "
+              f"{_na(order.status):<15}")
+
+    print("-" * 100)
+
+
+def print_premiums(premiums):
+    """거래소 간 프리미엄 목록 출력 (프리미엄 높은 순)"""
+    registry = get_registry()
+    print(f"\n🌏 Korbit 원화 프리미엄 ({len(premiums)}개 자산, Binance USDT x usdt_krw 기준):")
+    print("-" * 50)
+    for asset, premium in sorted(premiums.items(), key=lambda item: item[1], reverse=True):
+        name = registry.display_name(f"{asset}_krw")
+        print(f"{name:<32} {premium * 100:>+7.2f}%")
+    print("-" * 50)
+
+
+def _render_order_placed(record):
+    """order_placed 이벤트 콘솔 출력"""
+    order_data = record['order']
+    return "\n".join([
+        "\n✅ 주문 성공!",
+        f"주문 ID: {order_data.get('orderId')}",
+        f"거래쌍: {order_data.get('symbol')}",
+        f"주문 타입: {order_data.get('side')} / {order_data.get('orderType')}",
+        f"가격: {order_data.get('price', 'N/A')}",
+        f"수량: {order_data.get('qty', 'N/A')}",
+        f"대금: {order_data.get('amt', 'N/A')}",
+        f"상태: {order_data.get('status')}",
+    ])
+
+
+def _render_order_canceled(record):
+    """order_canceled 이벤트 콘솔 출력"""
+    return f"✅ 주문 취소 성공!\n취소된 주문 ID: {record['order_id']}"
+
+
+event_log.register_renderer('order_placed', _render_order_placed)
+event_log.register_renderer('order_failed', lambda r: f"❌ 주문 실패: {r['message']}")
+event_log.register_renderer('order_rejected', lambda r: f"❌ 주문 거절 (사전 검증): {r['message']}")
+event_log.register_renderer('order_error', lambda r: f"❌ 주문 요청 중 오류 발생: {r['error']}")
+event_log.register_renderer('order_canceled', _render_order_canceled)
+event_log.register_renderer('cancel_failed', lambda r: f"❌ 주문 취소 실패: {r['message']}")
+event_log.register_renderer('cancel_error', lambda r: f"❌ 주문 취소 요청 중 오류 발생: {r['error']}")
+event_log.register_renderer('order_status_failed', lambda r: f"❌ 주문 조회 실패: {r['message']}")
+event_log.register_renderer('order_status_error', lambda r: f"❌ 주문 조회 요청 중 오류 발생: {r['error']}")
+event_log.register_renderer('open_orders_failed', lambda r: f"❌ 미체결 주문 조회 실패: {r['message']}")
+event_log.register_renderer('open_orders_error', lambda r: f"❌ 미체결 주문 조회 요청 중 오류 발생: {r['error']}")
+event_log.register_renderer('premium_feed_error', lambda r: f"❌ 프리미엄 시세 조회 오류 ({r['exchange']}): {r['error']}")
+event_log.register_renderer('ticker_error', lambda r: f"❌ 현재가 조회 오류: {r['error']}")
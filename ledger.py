@@ -0,0 +1,376 @@
+import os
+import time
+import atexit
+import sqlite3
+import threading
+
+import event_log
+from fixed_point import scale_for, KRW_DECIMALS
+from models import FINAL_STATUSES
+
+# 주문/체결/수수료/잔고 스냅샷 원장 (SQLite, WAL 모드)
+# 기록은 메모리에 모았다가 batch_size 건 또는 flush_interval 초마다 한 트랜잭션으로 쓴다.
+# 거래쌍별 포지션(보유 수량, 매입 원가, 실현 손익, 수수료)은 체결마다 평균단가법으로
+# 증분 갱신하므로 손익 조회 시 전체 체결 이력을 다시 계산하지 않는다.
+# 금액/가격/수량은 모두 fixed_point 정수 단위로 저장한다.
+
+DEFAULT_PATH = os.path.join('data', 'ledger.db')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id INTEGER PRIMARY KEY,
+    client_order_id TEXT,
+    symbol TEXT NOT NULL,
+    side TEXT,
+    order_type TEXT,
+    status TEXT,
+    price INTEGER,
+    qty INTEGER,
+    amt INTEGER,
+    filled_qty INTEGER NOT NULL DEFAULT 0,
+    filled_amt INTEGER NOT NULL DEFAULT 0,
+    avg_price INTEGER,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_symbol_time ON orders (symbol, created_at);
+CREATE INDEX IF NOT EXISTS idx_orders_client_id ON orders (client_order_id);
+
+CREATE TABLE IF NOT EXISTS fills (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id INTEGER,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    qty INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    fee INTEGER NOT NULL DEFAULT 0,
+    ts INTEGER NOT NULL
+);
+-- 기간 합계 조회가 테이블을 읽지 않도록 집계 컬럼까지 포함 (covering index)
+CREATE INDEX IF NOT EXISTS idx_fills_symbol_time ON fills (symbol, ts, side, amount, fee);
+CREATE INDEX IF NOT EXISTS idx_fills_order ON fills (order_id);
+
+CREATE TABLE IF NOT EXISTS balances (
+    ts INTEGER NOT NULL,
+    currency TEXT NOT NULL,
+    balance INTEGER NOT NULL,
+    available INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_balances_currency_time ON balances (currency, ts);
+
+CREATE TABLE IF NOT EXISTS positions (
+    symbol TEXT PRIMARY KEY,
+    qty INTEGER NOT NULL,
+    cost INTEGER NOT NULL,
+    realized INTEGER NOT NULL,
+    fees INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL,
+    unknown_qty INTEGER NOT NULL DEFAULT 0,
+    unknown_proceeds INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_UPSERT_ORDER = """
+INSERT INTO orders (order_id, client_order_id, symbol, side, order_type, status, price, qty, amt,
+                    filled_qty, filled_amt, avg_price, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (order_id) DO UPDATE SET
+    status = excluded.status,
+    filled_qty = MAX(filled_qty, excluded.filled_qty),
+    filled_amt = MAX(filled_amt, excluded.filled_amt),
+    avg_price = excluded.avg_price,
+    updated_at = excluded.updated_at
+"""
+_INSERT_FILL = "INSERT INTO fills (order_id, symbol, side, price, qty, amount, fee, ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_INSERT_BALANCE = "INSERT INTO balances (ts, currency, balance, available) VALUES (?, ?, ?, ?)"
+_UPSERT_POSITION = """
+INSERT OR REPLACE INTO positions (symbol, qty, cost, realized, fees, unknown_qty, unknown_proceeds, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class Position:
+    """거래쌍별 포지션 (평균단가법, 원화/수량 정수 단위)"""
+
+    __slots__ = ('symbol', 'qty', 'cost', 'realized', 'fees', 'unknown_qty', 'unknown_proceeds')
+
+    def __init__(self, symbol, qty=0, cost=0, realized=0, fees=0, unknown_qty=0, unknown_proceeds=0):
+        self.symbol = symbol
+        self.qty = qty            # 보유 수량
+        self.cost = cost          # 보유분 매입 원가 (수수료 포함, 원화)
+        self.realized = realized  # 실현 손익 (원화)
+        self.fees = fees          # 누적 수수료 (원화)
+        # 원장 기록 이전부터 보유하던 물량의 매도 (매입 원가를 모르므로 실현 손익에서 제외)
+        self.unknown_qty = unknown_qty
+        self.unknown_proceeds = unknown_proceeds
+
+    def apply(self, side, qty, amount, fee):
+        """체결 1건 반영 (O(1))"""
+        self.fees += fee
+        if side == 'buy':
+            self.qty += qty
+            self.cost += amount + fee
+            return
+        # 매도: 추적 중인 수량까지만 평균 원가만큼 원가를 줄이고 차액을 실현 손익으로
+        tracked = min(qty, max(self.qty, 0))
+        proceeds = (amount - fee) * tracked // qty
+        if tracked:
+            cost_out = self.cost * tracked // self.qty
+            self.realized += proceeds - cost_out
+            self.qty -= tracked
+            self.cost -= cost_out
+        # 초과분은 원가 미상 매도로 따로 집계 (수량/원가가 음수가 되지 않도록)
+        if qty > tracked:
+            self.unknown_qty += qty - tracked
+            self.unknown_proceeds += amount - fee - proceeds
+
+    def unrealized(self, price_units):
+        """현재가 기준 평가 손익 (원화)"""
+        return scale_for(self.symbol).notional(price_units, self.qty) - self.cost
+
+    def __repr__(self):
+        return f"Position({self.symbol} qty={self.qty} cost={self.cost:,} realized={self.realized:,})"
+
+
+class Ledger:
+    """SQLite 거래 원장"""
+
+    def __init__(self, path=DEFAULT_PATH, batch_size=100, flush_interval=1.0, fee_rate=0.0):
+        """
+        Args:
+            path (str): DB 파일 경로 (':memory:' 가능)
+            batch_size (int): 이 건수만큼 쌓이면 즉시 기록
+            flush_interval (float): 백그라운드 기록 주기 (초)
+            fee_rate (float): 응답에 수수료가 없을 때 적용할 추정 수수료율 (체결 대금 기준)
+        """
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.fee_rate = fee_rate
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+        self._pending = []        # (SQL, 파라미터) 대기 목록
+        self._filled = {}         # 미완료 주문 ID -> (체결 수량, 체결 대금) 마지막 반영 값
+        self.positions = {
+            row[0]: Position(*row)
+            for row in self._conn.execute(
+                "SELECT symbol, qty, cost, realized, fees, unknown_qty, unknown_proceeds FROM positions")
+        }
+
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, args=(flush_interval,), daemon=True)
+        self._thread.start()
+
+    def _migrate(self):
+        """이전 버전 DB 에 없는 열 추가"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(positions)")}
+        for column in ('unknown_qty', 'unknown_proceeds'):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE positions ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+
+    # 기록
+    def _queue(self, sql, params):
+        self._pending.append((sql, params))
+        if len(self._pending) >= self.batch_size:
+            self._flush_locked()
+
+    def record_order(self, order, fee=None):
+        """
+        주문 응답(models.Order) 반영
+
+        직전에 반영한 체결 수량/대금과의 차이를 새 체결로 기록하고 포지션을 갱신한다.
+        같은 주문을 여러 번 조회해도 체결이 중복 기록되지 않고, 늦게 도착한 이전 응답
+        (예: WebSocket 완료 이벤트 뒤의 주문 접수 응답)처럼 체결 수량이 줄어든 응답은 무시한다.
+
+        Args:
+            fee (int): 이번 체결분 수수료 (원화, None 이면 fee_rate 로 추정)
+        """
+        if order is None or order.order_id is None:
+            return
+        now = int(time.time() * 1000)
+        with self._lock:
+            prev_qty, prev_amt = self._last_filled(order.order_id)
+            if order.filled_qty < prev_qty:
+                return  # 이미 반영한 것보다 오래된 응답
+            self._queue(_UPSERT_ORDER, (
+                order.order_id, order.client_order_id, order.symbol, order.side, order.order_type,
+                order.status, order.price, order.qty, order.amt, order.filled_qty, order.filled_amt,
+                order.avg_price, order.created_at or now, now,
+            ))
+            qty = order.filled_qty - prev_qty
+            amount = order.filled_amt - prev_amt
+            if order.status in FINAL_STATUSES:  # 완료된 주문은 더 추적하지 않음
+                self._filled.pop(order.order_id, None)
+            else:
+                self._filled[order.order_id] = (order.filled_qty, order.filled_amt)
+            if qty > 0:
+                self._record_fill(order.order_id, order.symbol, order.side, qty, amount,
+                                  int(amount * self.fee_rate) if fee is None else fee, now)
+
+    def _last_filled(self, order_id):
+        """마지막으로 반영한 (체결 수량, 체결 대금) - 메모리에 없으면 DB 에서 조회"""
+        filled = self._filled.get(order_id)
+        if filled is not None:
+            return filled
+        self._flush_locked()
+        row = self._conn.execute("SELECT filled_qty, filled_amt FROM orders WHERE order_id = ?",
+                                 (order_id,)).fetchone()
+        return row if row else (0, 0)
+
+    def _record_fill(self, order_id, symbol, side, qty, amount, fee, ts):
+        scale = scale_for(symbol)
+        price = amount * scale.price_scale * scale.qty_scale // (qty * 10 ** KRW_DECIMALS)  # 평균 체결가
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = Position(symbol)
+        position.apply(side, qty, amount, fee)
+        self._queue(_INSERT_FILL, (order_id, symbol, side, price, qty, amount, fee, ts))
+        self._queue(_UPSERT_POSITION, (symbol, position.qty, position.cost, position.realized,
+                                       position.fees, position.unknown_qty, position.unknown_proceeds, ts))
+        event_log.log('fill_recorded', level='debug', symbol=symbol, side=side, qty=qty, amount=amount, fee=fee)
+
+    def record_balances(self, balances, ts=None):
+        """잔고 스냅샷 기록 (models.Balance 목록)"""
+        ts = int(time.time() * 1000) if ts is None else ts
+        with self._lock:
+            for balance in balances:
+                self._queue(_INSERT_BALANCE, (ts, balance.currency, balance.balance, balance.available))
+
+    def flush(self):
+        """대기 중인 기록을 한 트랜잭션으로 저장"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            with self._conn:
+                for sql, params in pending:
+                    self._conn.execute(sql, params)
+        except sqlite3.Error as e:
+            event_log.log('ledger_error', level='error', error=str(e), records=len(pending))
+
+    def _flush_loop(self, interval):
+        while not self._stop_event.wait(interval):
+            self.flush()
+
+    def close(self):
+        """백그라운드 기록 중지 후 남은 기록 저장"""
+        self._stop_event.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    # 조회 (대기 중인 기록을 먼저 저장한 뒤 인덱스로 조회)
+    def _query(self, sql, params=()):
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute(sql, params).fetchall()
+
+    def fills(self, symbol, start=None, end=None):
+        """
+        체결 목록 (시각 오름차순)
+
+        Returns:
+            list: (order_id, side, price, qty, amount, fee, ts) 튜플
+        """
+        return self._query(
+            "SELECT order_id, side, price, qty, amount, fee, ts FROM fills "
+            "WHERE symbol = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (symbol, start or 0, end or 2 ** 62),
+        )
+
+    def fill_totals(self, symbol, start=None, end=None):
+        """
+        기간 체결 합계 (리스크 점검/리포트용)
+
+        Returns:
+            dict: {'count', 'buy_amount', 'sell_amount', 'fees'} (원화 정수)
+        """
+        count, buy_amount, sell_amount, fees = self._query(
+            "SELECT COUNT(*), "
+            "COALESCE(SUM(CASE WHEN side = 'buy' THEN amount END), 0), "
+            "COALESCE(SUM(CASE WHEN side = 'sell' THEN amount END), 0), "
+            "COALESCE(SUM(fee), 0) "
+            "FROM fills WHERE symbol = ? AND ts >= ? AND ts < ?",
+            (symbol, start or 0, end or 2 ** 62),
+        )[0]
+        return {'count': count, 'buy_amount': buy_amount, 'sell_amount': sell_amount, 'fees': fees}
+
+    def orders(self, symbol, start=None, end=None):
+        """주문 목록 (접수 시각 오름차순, (order_id, client_order_id, side, status, filled_qty, filled_amt, created_at))"""
+        return self._query(
+            "SELECT order_id, client_order_id, side, status, filled_qty, filled_amt, created_at FROM orders "
+            "WHERE symbol = ? AND created_at >= ? AND created_at < ? ORDER BY created_at",
+            (symbol, start or 0, end or 2 ** 62),
+        )
+
+    def get_order(self, order_id=None, client_order_id=None):
+        """주문 1건 (order_id 또는 client_order_id, 없으면 None)"""
+        column, value = ('order_id', order_id) if order_id is not None else ('client_order_id', client_order_id)
+        rows = self._query(
+            f"SELECT order_id, client_order_id, symbol, side, status, filled_qty, filled_amt, created_at "
+            f"FROM orders WHERE {column} = ?", (value,)
+        )
+        return rows[0] if rows else None
+
+    def balance_history(self, currency, start=None, end=None):
+        """잔고 스냅샷 이력 ((ts, balance, available) 튜플)"""
+        return self._query(
+            "SELECT ts, balance, available FROM balances WHERE currency = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (currency, start or 0, end or 2 ** 62),
+        )
+
+    def pnl(self, symbol, price_units=None):
+        """
+        거래쌍 손익 (메모리의 증분 포지션, O(1))
+
+        Args:
+            price_units (int): 현재가 (주면 평가 손익 포함)
+
+        Returns:
+            dict: {'qty', 'cost', 'realized', 'unrealized', 'fees', 'unknown_qty', 'unknown_proceeds'}
+        """
+        with self._lock:
+            position = self.positions.get(symbol) or Position(symbol)
+            return {
+                'qty': position.qty,
+                'cost': position.cost,
+                'realized': position.realized,
+                'unrealized': position.unrealized(price_units) if price_units is not None else None,
+                'fees': position.fees,
+                'unknown_qty': position.unknown_qty,
+                'unknown_proceeds': position.unknown_proceeds,
+            }
+
+
+_ledger = None
+_path = DEFAULT_PATH
+_ledger_lock = threading.Lock()
+
+
+def use_path(path):
+    """전역 원장 경로 변경 (최초 사용 전에만, 재생 모드에서 실제 파일 보호용)"""
+    global _path
+    if _ledger is not None:
+        raise RuntimeError("원장이 이미 열려 있습니다.")
+    _path = path
+
+
+def get_ledger():
+    """전역 원장 (최초 호출 시 use_path 로 지정한 경로, 기본 DEFAULT_PATH 에 생성)"""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = Ledger(_path)
+            atexit.register(_ledger.flush)  # 종료 시 대기 중인 기록 저장
+        return _ledger
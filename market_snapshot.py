@@ -0,0 +1,92 @@
+import time
+import threading
+
+import metrics
+
+# 여러 거래쌍 현재가 공유 스냅샷
+# 매매 루프/메뉴가 거래쌍마다 /v2/tickers 를 호출하는 대신,
+# 관심 거래쌍 전체를 한 번의 요청으로 갱신하고 거래쌍별로 나누어 읽는다.
+
+# 스냅샷 유효 시간 (초): 이 시간 안의 조회는 모두 같은 응답을 공유
+DEFAULT_MAX_AGE = 1.0
+
+# 관심 거래쌍이 이보다 많으면 symbol 목록 대신 전체 마켓을 조회 (URL 길이 제한 회피)
+WHOLE_MARKET_THRESHOLD = 30
+
+
+class MarketSnapshot:
+    """거래쌍 -> Ticker 공유 스냅샷 (만료 시 관심 거래쌍 전체를 일괄 갱신)"""
+
+    def __init__(self, bot, max_age=DEFAULT_MAX_AGE):
+        self.bot = bot
+        self.max_age = max_age
+        self.tracked = set()   # 갱신 시 함께 조회할 거래쌍
+        self.tickers = {}      # 거래쌍 -> Ticker
+        self.updated_at = 0.0  # 마지막 갱신 시각 (monotonic)
+        self._lock = threading.Lock()
+
+    def track(self, *symbols):
+        """일괄 갱신 대상 거래쌍 추가"""
+        with self._lock:
+            self.tracked.update(symbols)
+
+    def refresh(self):
+        """관심 거래쌍 전체를 요청 1회로 갱신 (성공 여부 반환)"""
+        with self._lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self):
+        symbols = sorted(self.tracked)
+        if not symbols or len(symbols) > WHOLE_MARKET_THRESHOLD:
+            tickers = self.bot.get_tickers()
+        else:
+            tickers = self.bot.get_tickers(symbols)
+        metrics.registry.inc('ticker_snapshot_refresh', result='ok' if tickers is not None else 'error')
+        if tickers is None:
+            return False
+        self.tickers.update(tickers)
+        self.updated_at = time.monotonic()
+        return True
+
+    def get(self, symbol, max_age=None):
+        """
+        거래쌍 현재가 조회 (스냅샷이 유효하면 요청 없이 반환)
+
+        여러 스레드가 동시에 만료된 스냅샷을 조회해도 갱신 요청은 한 번만 나간다.
+
+        Returns:
+            Ticker: 현재가 정보 (조회 실패 시 None)
+        """
+        return self.get_many([symbol], max_age).get(symbol)
+
+    def get_many(self, symbols, max_age=None):
+        """
+        여러 거래쌍 현재가 조회 (요청 최대 1회)
+
+        Returns:
+            dict: 거래쌍 -> Ticker (조회 실패한 거래쌍은 제외)
+        """
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            new_symbols = set(symbols) - self.tracked
+            self.tracked.update(symbols)
+            # 새 거래쌍이 추가되었거나 스냅샷이 만료되면 관심 거래쌍 전체를 갱신
+            if new_symbols or time.monotonic() - self.updated_at > max_age:
+                if not self._refresh_locked():
+                    return {}
+            return {symbol: self.tickers[symbol] for symbol in symbols if symbol in self.tickers}
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot():
+    """프로세스 전역 스냅샷 (매매 루프와 메뉴가 공유)"""
+    global _snapshot
+    if _snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                from c_buy_and_sell import TradingBot
+                _snapshot = MarketSnapshot(TradingBot())
+    return _snapshot
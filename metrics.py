@@ -0,0 +1,217 @@
+import time
+import bisect
+import threading
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 엔드포인트별 지연 시간 / 오류 / 전송량 계측 및 Prometheus 텍스트 노출
+
+# 히스토그램 버킷 경계 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 백분위 계산에 사용할 최근 표본 수
+RECENT_SAMPLES = 1024
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """고정 버킷 히스토그램 + 최근 표본 기반 백분위"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds):
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def percentile(self, q):
+        """최근 표본 기준 백분위 (표본이 없으면 None)"""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    body = ','.join(f'{key}="{value}"' for key, value in labels)
+    return '{' + body + '}'
+
+
+class MetricsRegistry:
+    """요청/단계별 계측값 저장소 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latency = {}   # (exchange, method, endpoint) -> LatencyHistogram
+        self.request_errors = {}    # (exchange, method, endpoint) -> int
+        self.bytes_received = {}    # (exchange, method, endpoint) -> int
+        self.bytes_sent = {}        # (exchange, method, endpoint) -> int
+        self.stage_latency = {}     # stage -> LatencyHistogram
+        self.counters = {}          # (name, labels) -> int
+
+    def observe_request(self, exchange, method, endpoint, seconds, bytes_sent=0, bytes_received=0, error=False):
+        """HTTP 요청 1건 기록"""
+        key = (exchange, method, endpoint)
+        with self._lock:
+            histogram = self.request_latency.get(key)
+            if histogram is None:
+                histogram = self.request_latency[key] = LatencyHistogram()
+            histogram.observe(seconds)
+            self.bytes_sent[key] = self.bytes_sent.get(key, 0) + bytes_sent
+            self.bytes_received[key] = self.bytes_received.get(key, 0) + bytes_received
+            if error:
+                self.request_errors[key] = self.request_errors.get(key, 0) + 1
+
+    def observe_stage(self, stage, seconds):
+        """매매 틱 단계 1회 소요 시간 기록"""
+        with self._lock:
+            histogram = self.stage_latency.get(stage)
+            if histogram is None:
+                histogram = self.stage_latency[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time_stage(self, stage):
+        """with 블록 소요 시간을 stage 이름으로 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(stage, time.perf_counter() - start)
+
+    def inc(self, name, amount=1, **labels):
+        """카운터 증가 (예: 캐시 적중 수)"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def get_counter(self, name, **labels):
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def summary(self):
+        """엔드포인트/단계별 p50/p95/p99 요약 (dict)"""
+        with self._lock:
+            requests_summary = {
+                f"{exchange} {method} {endpoint}": {
+                    'count': histogram.count,
+                    'errors': self.request_errors.get((exchange, method, endpoint), 0),
+                    **{f"p{int(q * 100)}": histogram.percentile(q) for q in QUANTILES},
+                }
+                for (exchange, method, endpoint), histogram in self.request_latency.items()
+            }
+            stage_summary = {
+                stage: {
+                    'count': histogram.count,
+                    **{f"p{int(q * 100)}": histogram.percentile(q) for q in QUANTILES},
+                }
+                for stage, histogram in self.stage_latency.items()
+            }
+        return {'requests': requests_summary, 'stages': stage_summary}
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 포맷으로 변환"""
+        lines = []
+        with self._lock:
+            self._render_histograms(
+                lines, 'http_request_duration_seconds', '거래소 HTTP 요청 지연 시간',
+                {(('exchange', e), ('method', m), ('endpoint', p)): h
+                 for (e, m, p), h in self.request_latency.items()}
+            )
+            self._render_counter(
+                lines, 'http_request_errors_total', '거래소 HTTP 요청 오류 수',
+                {(('exchange', e), ('method', m), ('endpoint', p)): v
+                 for (e, m, p), v in self.request_errors.items()}
+            )
+            self._render_counter(
+                lines, 'http_response_bytes_total', '거래소 HTTP 응답 바이트 수',
+                {(('exchange', e), ('method', m), ('endpoint', p)): v
+                 for (e, m, p), v in self.bytes_received.items()}
+            )
+            self._render_counter(
+                lines, 'http_request_bytes_total', '거래소 HTTP 요청 바이트 수',
+                {(('exchange', e), ('method', m), ('endpoint', p)): v
+                 for (e, m, p), v in self.bytes_sent.items()}
+            )
+            self._render_histograms(
+                lines, 'trading_stage_duration_seconds', '매매 틱 단계별 소요 시간',
+                {(('stage', stage),): h for stage, h in self.stage_latency.items()}
+            )
+            by_name = {}
+            for (name, labels), value in self.counters.items():
+                by_name.setdefault(name, {})[labels] = value
+            for name, series in sorted(by_name.items()):
+                self._render_counter(lines, name, name, series)
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _render_counter(lines, name, help_text, series):
+        if not series:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in sorted(series.items()):
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    @staticmethod
+    def _render_histograms(lines, name, help_text, series):
+        if not series:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        # 최근 표본 기반 백분위는 별도 gauge 로 노출
+        lines.append(f"# HELP {name}_recent 최근 {RECENT_SAMPLES}건 기준 백분위")
+        lines.append(f"# TYPE {name}_recent gauge")
+        for labels, histogram in sorted(series.items()):
+            for q in QUANTILES:
+                value = histogram.percentile(q)
+                if value is not None:
+                    lines.append(f"{name}_recent{_format_labels(labels + (('quantile', q),))} {value}")
+
+
+# 프로세스 전역 레지스트리
+registry = MetricsRegistry()
+time_stage = registry.time_stage
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 스크레이프 요청마다 출력하지 않음
+
+
+def start_metrics_server(port=9108, host='127.0.0.1'):
+    """/metrics 를 제공하는 로컬 HTTP 서버를 백그라운드 스레드로 시작"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"📈 메트릭 서버 시작: http://{host}:{server.server_port}/metrics")
+    return server
@@ -0,0 +1,157 @@
+from decimal import ROUND_DOWN, ROUND_HALF_EVEN
+
+from fixed_point import scale_for, parse_units, currency_decimals
+
+# Korbit API 응답을 담는 경량 레코드
+# 숫자 필드는 생성 시 한 번만 fixed_point 정수 단위로 변환한다.
+
+
+def _to_units(value, decimals, default=0, rounding=ROUND_HALF_EVEN):
+    """API 문자열 숫자를 정수 단위로 변환 (없으면 default)"""
+    if value is None or value == '':
+        return default
+    return parse_units(value, decimals, rounding)
+
+
+def _to_int(value, default=None):
+    if value is None or value == '':
+        return default
+    return int(value)
+
+
+class Ticker:
+    """현재가 정보 (가격은 scale.price_decimals, 거래량은 scale.qty_decimals 정수 단위)"""
+
+    __slots__ = ('symbol', 'scale', 'open', 'high', 'low', 'close', 'prev_close',
+                 'best_bid', 'best_ask', 'volume', 'price_change', 'price_change_percent')
+
+    def __init__(self, symbol, scale, open, high, low, close, prev_close,
+                 best_bid, best_ask, volume, price_change, price_change_percent):
+        self.symbol = symbol
+        self.scale = scale
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.prev_close = prev_close
+        self.best_bid = best_bid
+        self.best_ask = best_ask
+        self.volume = volume
+        self.price_change = price_change
+        self.price_change_percent = price_change_percent  # 표시용 비율 (float)
+
+    @classmethod
+    def from_api(cls, data):
+        """/v2/tickers 응답 항목으로 생성"""
+        symbol = data.get('symbol')
+        scale = scale_for(symbol)
+        price_dp = scale.price_decimals
+        return cls(
+            symbol=symbol,
+            scale=scale,
+            open=_to_units(data.get('open'), price_dp),
+            high=_to_units(data.get('high'), price_dp),
+            low=_to_units(data.get('low'), price_dp),
+            close=_to_units(data.get('close'), price_dp),
+            prev_close=_to_units(data.get('prevClose'), price_dp),
+            best_bid=_to_units(data.get('bestBidPrice'), price_dp),
+            best_ask=_to_units(data.get('bestAskPrice'), price_dp),
+            volume=_to_units(data.get('volume'), scale.qty_decimals),
+            price_change=_to_units(data.get('priceChange'), price_dp),
+            price_change_percent=float(data.get('priceChangePercent') or 0),
+        )
+
+    def __repr__(self):
+        price_str = self.scale.price_str
+        return (f"Ticker({self.symbol} close={price_str(self.close)} "
+                f"bid={price_str(self.best_bid)} ask={price_str(self.best_ask)})")
+
+
+# 더 이상 바뀌지 않는 주문 상태 (원장/사용자 데이터 스트림 공통)
+FINAL_STATUSES = ('filled', 'canceled', 'partiallyFilledCanceled', 'expired')
+
+
+class Order:
+    """주문 정보 (접수/조회/취소 응답 공통, 가격/수량/대금은 정수 단위)"""
+
+    __slots__ = ('order_id', 'client_order_id', 'symbol', 'scale', 'side', 'order_type', 'status',
+                 'price', 'qty', 'amt', 'filled_qty', 'filled_amt', 'avg_price', 'created_at')
+
+    def __init__(self, order_id, client_order_id, symbol, scale, side, order_type, status,
+                 price, qty, amt, filled_qty, filled_amt, avg_price, created_at):
+        self.order_id = order_id
+        self.client_order_id = client_order_id
+        self.symbol = symbol
+        self.scale = scale
+        self.side = side
+        self.order_type = order_type
+        self.status = status
+        self.price = price          # 지정가 (없으면 None)
+        self.qty = qty              # 주문 수량 (없으면 None)
+        self.amt = amt              # 주문 대금 (원화 정수, 없으면 None)
+        self.filled_qty = filled_qty
+        self.filled_amt = filled_amt
+        self.avg_price = avg_price  # 평균 체결가 (없으면 None)
+        self.created_at = created_at  # 밀리초 타임스탬프
+
+    @classmethod
+    def from_api(cls, data):
+        """/v2/orders, /v2/openOrders 응답 항목으로 생성"""
+        symbol = data.get('symbol')
+        scale = scale_for(symbol)
+        price_dp = scale.price_decimals
+        qty_dp = scale.qty_decimals
+        krw_dp = currency_decimals('krw')
+        return cls(
+            order_id=_to_int(data.get('orderId')),
+            client_order_id=data.get('clientOrderId'),
+            symbol=symbol,
+            scale=scale,
+            side=data.get('side'),
+            order_type=data.get('orderType'),
+            status=data.get('status'),
+            price=_to_units(data.get('price'), price_dp, None),
+            qty=_to_units(data.get('qty'), qty_dp, None),
+            amt=_to_units(data.get('amt'), krw_dp, None),
+            filled_qty=_to_units(data.get('filledQty'), qty_dp),
+            filled_amt=_to_units(data.get('filledAmt'), krw_dp),
+            avg_price=_to_units(data.get('avgPrice'), price_dp, None),
+            created_at=_to_int(data.get('createdAt'), 0),
+        )
+
+    def __repr__(self):
+        return f"Order({self.order_id} {self.symbol} {self.side}/{self.order_type} {self.status})"
+
+
+class Balance:
+    """자산별 잔고 (보유량 = 사용가능 + 거래중 + 출금중, currency_decimals 정수 단위)"""
+
+    __slots__ = ('currency', 'balance', 'available', 'trade_in_use', 'withdrawal_in_use')
+
+    def __init__(self, currency, balance, available, trade_in_use, withdrawal_in_use):
+        self.currency = currency
+        self.balance = balance
+        self.available = available
+        self.trade_in_use = trade_in_use
+        self.withdrawal_in_use = withdrawal_in_use
+
+    @classmethod
+    def from_api(cls, data):
+        """/v2/balance 응답 항목으로 생성"""
+        currency = data.get('currency', '').lower()
+        decimals = currency_decimals(currency)
+
+        # 잔고는 버림: 반올림하면 실제보다 많은 수량/금액으로 주문을 만들어 거절될 수 있음
+        def units(field):
+            return _to_units(data.get(field), decimals, rounding=ROUND_DOWN)
+
+        return cls(
+            currency=currency,
+            balance=units('balance'),
+            available=units('available'),
+            trade_in_use=units('tradeInUse'),
+            withdrawal_in_use=units('withdrawalInUse'),
+        )
+
+    def __repr__(self):
+        return f"Balance({self.currency} available={self.available} total={self.balance})"
@@ -0,0 +1,263 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import threading
+
+import event_log
+
+# 주문 의도 선기록(write-ahead) 저널
+# 주문을 전송하기 전에 clientOrderId 와 주문 파라미터를 JSON lines 로 추가 기록(fsync)하고,
+# 응답을 받으면 접수(ack) 또는 실패(failed)로 표시한다.
+# 전송과 응답 사이에 프로세스가 죽으면 다음 시작 시 결과를 모르는 의도가 남으므로
+# /v2/openOrders 와 주문 상태 조회로 실제 결과를 확인해 정리한다.
+#
+# 그룹 커밋: 기록 요청은 버퍼에 쌓고 커밋 스레드가 한 번의 write + fsync 로 묶어서 저장한다.
+# intent() 는 자기 레코드가 디스크에 반영될 때까지 기다리고, ack/failed 는 다음 묶음에 함께 기록된다.
+
+DEFAULT_PATH = os.path.join('data', 'order_journal.jsonl')
+
+# 레코드 종류
+INTENT = 'intent'
+ACK = 'ack'
+FAILED = 'failed'
+
+
+class JournalWriteError(RuntimeError):
+    """저널 디스크 기록 실패 (이후 주문은 의도를 남길 수 없으므로 전송하지 않음)"""
+
+
+def new_client_order_id():
+    """clientOrderId 생성 (32자 16진수)"""
+    return uuid.uuid4().hex
+
+
+class OrderJournal:
+    """append-only 주문 의도 저널 (fsync 그룹 커밋)"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.pending = self._replay()   # clientOrderId -> 결과 미확인 의도 레코드
+        self.issued = set()             # 이 프로세스가 기록한 clientOrderId (종료 시 자기 주문만 취소)
+        self._file = open(path, 'ab')
+        self._cond = threading.Condition()
+        self._buffer = []               # 커밋 대기 중인 직렬화 레코드
+        self._appended = 0              # 버퍼에 추가된 레코드 순번
+        self._committed = 0             # 디스크에 반영된 레코드 순번
+        self._closed = False
+        self._error = None              # 기록 스레드가 만난 디스크 오류 (ENOSPC, EIO 등)
+        self._thread = threading.Thread(target=self._commit_loop, daemon=True)
+        self._thread.start()
+
+    def _replay(self):
+        """저널 파일을 읽어 결과가 확인되지 않은 의도만 반환 (마지막 줄이 잘린 경우 무시)"""
+        pending = {}
+        if not os.path.exists(self.path):
+            return pending
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 기록 도중 종료된 마지막 줄
+                if record['type'] == INTENT:
+                    pending[record['id']] = record
+                else:
+                    pending.pop(record['id'], None)
+        return pending
+
+    # 기록
+    def _append(self, record, wait):
+        data = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("닫힌 주문 저널입니다.")
+            self._raise_error()
+            self._buffer.append(data)
+            self._appended += 1
+            seq = self._appended
+            self._cond.notify_all()
+            if wait:
+                while self._committed < seq:
+                    self._raise_error()
+                    self._cond.wait()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise JournalWriteError(f"주문 저널 기록 실패: {self._error}") from self._error
+
+    def _commit_loop(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if not self._buffer and self._closed:
+                    return
+                batch, self._buffer = self._buffer, []
+                seq = self._appended
+            # 디스크 기록은 잠금 밖에서 (그동안 들어온 요청은 다음 묶음으로)
+            try:
+                self._file.write(b''.join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                # 기다리는 intent() 를 깨워 오류를 전달 (이후 기록도 모두 실패)
+                event_log.log('journal_write_error', level='error', path=self.path, error=str(e))
+                with self._cond:
+                    self._error = e
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._committed = seq
+                self._cond.notify_all()
+
+    def intent(self, symbol, side, params, client_order_id=None):
+        """
+        주문 전송 전 의도 기록 (디스크 반영까지 대기)
+
+        Args:
+            params (dict): 전송할 주문 파라미터 (서명 제외)
+
+        디스크 기록에 실패하면 JournalWriteError 를 내므로 호출한 주문은 전송되지 않는다.
+
+        Returns:
+            str: clientOrderId
+        """
+        client_order_id = client_order_id or new_client_order_id()
+        record = {'type': INTENT, 'id': client_order_id, 'symbol': symbol, 'side': side,
+                  'params': params, 'ts': int(time.time() * 1000)}
+        with self._cond:
+            self.pending[client_order_id] = record
+            self.issued.add(client_order_id)
+        self._append(record, wait=True)
+        return client_order_id
+
+    def ack(self, client_order_id, order_id):
+        """거래소 접수 확인"""
+        self._resolve({'type': ACK, 'id': client_order_id, 'order_id': order_id})
+
+    def failed(self, client_order_id, reason):
+        """거래소가 주문을 받지 않음 (또는 존재하지 않음이 확인됨)"""
+        self._resolve({'type': FAILED, 'id': client_order_id, 'reason': reason})
+
+    def _resolve(self, record):
+        record['ts'] = int(time.time() * 1000)
+        with self._cond:
+            self.pending.pop(record['id'], None)
+        self._append(record, wait=False)
+
+    def close(self):
+        """남은 레코드 기록 후 종료"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        self._file.close()
+
+    # 복구
+    def reconcile(self, bot, min_age=0.0):
+        """
+        결과가 확인되지 않은 의도를 거래소 상태와 대조하여 정리
+
+        거래쌍마다 /v2/openOrders 를 한 번 조회해 clientOrderId 로 대조하고,
+        없으면 clientOrderId 로 주문 상태를 조회한다. 거래소가 주문이 없다고 명확히 응답한
+        경우에만 거래소에 도달하지 않은 주문으로 보고 실패 처리한다.
+        시간 초과/5xx 등 조회 자체가 실패한 경우에는 체결되었을 수 있으므로
+        다음 대조까지 미확인 상태로 남긴다 (compact 에서도 지워지지 않음).
+
+        Args:
+            bot: TradingBot
+            min_age (float): 기록 후 이 시간(초)이 지난 의도만 대조 (전송 중인 주문 제외)
+
+        Returns:
+            dict: {'acked': n, 'failed': n, 'unknown': n}
+        """
+        cutoff = (time.time() - min_age) * 1000
+        with self._cond:
+            records = [r for r in self.pending.values() if r['ts'] <= cutoff]
+        result = {'acked': 0, 'failed': 0, 'unknown': 0}
+        if not records:
+            return result
+
+        by_symbol = {}
+        for record in records:
+            by_symbol.setdefault(record['symbol'], []).append(record)
+
+        from c_buy_and_sell import ORDER_NOT_FOUND
+
+        for symbol, symbol_records in by_symbol.items():
+            open_orders = bot.get_open_orders(symbol)
+            open_ids = {order.client_order_id: order for order in open_orders or []}
+            for record in symbol_records:
+                order = open_ids.get(record['id'])
+                status = None
+                if order is None:
+                    status, order = bot.lookup_order(symbol, client_order_id=record['id'])
+                if order is not None and order.order_id is not None:
+                    self.ack(record['id'], order.order_id)
+                    result['acked'] += 1
+                elif status == ORDER_NOT_FOUND:
+                    self.failed(record['id'], 'not_found')
+                    result['failed'] += 1
+                else:
+                    result['unknown'] += 1
+
+        event_log.log('journal_reconciled', **result)
+        return result
+
+    def compact(self):
+        """
+        미확인 의도만 남기고 저널 파일 재작성 (시작 시 대조 후 호출)
+
+        임시 파일에 쓴 뒤 교체하므로 도중에 종료되어도 기존 저널이 남는다.
+        """
+        with self._cond:
+            while self._committed < self._appended:
+                self._raise_error()
+                self._cond.wait()
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'wb') as f:
+                for record in self.pending.values():
+                    f.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(temp_path, self.path)
+            self._file = open(self.path, 'ab')
+
+
+def _render_reconciled(record):
+    """journal_reconciled 이벤트 콘솔 출력"""
+    return (f"📒 주문 저널 대조: 접수 확인 {record['acked']}건, 실패 {record['failed']}건, "
+            f"미확인 {record['unknown']}건")
+
+
+event_log.register_renderer('journal_reconciled', _render_reconciled)
+
+
+_journal = None
+_path = DEFAULT_PATH
+_journal_lock = threading.Lock()
+
+
+def use_path(path):
+    """전역 주문 저널 경로 변경 (최초 사용 전에만, 재생 모드에서 실제 파일 보호용)"""
+    global _path
+    if _journal is not None:
+        raise RuntimeError("주문 저널이 이미 열려 있습니다.")
+    _path = path
+
+
+def get_journal():
+    """전역 주문 저널 (최초 호출 시 use_path 로 지정한 경로, 기본 DEFAULT_PATH 에서 재생)"""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = OrderJournal(_path)
+            atexit.register(_journal.close)
+        return _journal
@@ -0,0 +1,210 @@
+import argparse
+
+import numpy as np
+
+import event_log
+from fixed_point import scale_for, KRW_DECIMALS
+from symbol_registry import get_registry, DEFAULT_MIN_NOTIONAL
+from balance_service import get_balance_service
+
+# 다중 자산 포트폴리오 리밸런서
+# 잔고 스냅샷 1회(balance_service, /v2/balance)와 현재가 스냅샷 1회(/v2/tickers)로 전체 보유 자산의
+# 원화 평가액을 계산하고, 목표 비중과의 차이를 자산별 배열 연산 한 번으로 구한다.
+# 주문은 매도를 먼저 내고, 매수 총액은 (현금 + 매도 대금 - 목표 현금) 안으로 줄인다.
+# 허용 오차 이내이거나 최소 주문 금액 미만인 차이는 주문하지 않는다.
+
+CASH = 'krw'
+
+
+def target_weights(assets, targets=None, cash_ratio=0.4):
+    """
+    자산별 목표 비중 배열
+
+    Args:
+        assets (list): 자산 목록 (예: ['btc', 'eth'])
+        targets (dict): 자산 -> 비중 (없으면 현금 외 비중을 자산 수로 균등 분배)
+        cash_ratio (float): 현금 목표 비중 (targets 가 없을 때)
+
+    Returns:
+        tuple: (자산별 비중 배열, 현금 비중)
+    """
+    if targets:
+        weights = np.array([float(targets.get(asset, 0.0)) for asset in assets])
+        cash_weight = float(targets.get(CASH, 1.0 - sum(v for k, v in targets.items() if k != CASH)))
+    else:
+        cash_weight = cash_ratio
+        weights = np.full(len(assets), (1.0 - cash_ratio) / len(assets) if assets else 0.0)
+    if weights.sum() + cash_weight > 1.0 + 1e-9 or (weights < 0).any() or cash_weight < 0:
+        raise ValueError("목표 비중은 0 이상이고 합계가 1 이하여야 합니다.")
+    return weights, cash_weight
+
+
+class Valuation:
+    """잔고/현재가 스냅샷의 자산별 평가 (배열)"""
+
+    def __init__(self, balances, tickers, assets=None):
+        """
+        Args:
+            balances (dict): 자산 -> Balance (TradingBot.get_balances)
+            tickers (dict): 거래쌍 -> Ticker (TradingBot.get_tickers)
+            assets (list): 평가 대상 자산 (기본: 원화 마켓이 있는 보유 자산)
+        """
+        if assets is None:
+            assets = sorted(c for c, b in balances.items()
+                            if c != CASH and b.balance > 0 and f"{c}_krw" in tickers)
+        self.assets = [a for a in assets if f"{a}_krw" in tickers]
+        self.symbols = [f"{a}_krw" for a in self.assets]
+        self.scales = [scale_for(s) for s in self.symbols]
+
+        def amounts(field):
+            return np.array([getattr(balances.get(a), field, 0) for a in self.assets], dtype=np.float64)
+
+        self.qty = amounts('balance')            # 보유 수량 (수량 정수 단위)
+        self.available = amounts('available')    # 매도 가능 수량
+        self.price = np.array([tickers[s].close for s in self.symbols], dtype=np.float64)
+        self.divisor = np.array([sc.price_scale * sc.qty_scale // 10 ** KRW_DECIMALS for sc in self.scales],
+                                dtype=np.float64)
+        cash = balances.get(CASH)
+        # 평가는 주문에 묶인 금액까지 포함한 보유 원화, 매수 예산은 사용 가능 원화
+        self.cash = float(cash.balance) if cash else 0.0
+        self.cash_available = float(cash.available) if cash else 0.0
+        self.values = self.price * self.qty / self.divisor      # 자산별 원화 평가액
+        self.total = self.cash + float(self.values.sum())
+
+    def weights(self):
+        """현재 자산별 비중과 현금 비중"""
+        if self.total <= 0:
+            return np.zeros(len(self.assets)), 0.0
+        return self.values / self.total, self.cash / self.total
+
+
+def plan_rebalance(valuation, targets=None, cash_ratio=0.4, tolerance=0.02, min_notional=None):
+    """
+    목표 비중으로 맞추기 위한 최소 주문 목록
+
+    Args:
+        valuation (Valuation): 잔고/현재가 평가
+        targets (dict): 자산 -> 목표 비중 ('krw' 는 현금 비중)
+        tolerance (float): 총 자산 대비 이 비율 이하의 차이는 무시
+        min_notional (dict): 거래쌍 -> 최소 주문 금액 (기본: 거래소 메타데이터)
+
+    Returns:
+        list: 주문 dict 목록 (매도 먼저)
+              매도 {'symbol', 'side': 'sell', 'qty_units', 'value'}
+              매수 {'symbol', 'side': 'buy', 'amt_units', 'value'}
+    """
+    if not valuation.assets or valuation.total <= 0:
+        return []
+    weights, cash_weight = target_weights(valuation.assets, targets, cash_ratio)
+    registry = get_registry()
+    minimum = np.array([
+        (min_notional or {}).get(symbol) or getattr(registry.get(symbol), 'min_notional', None) or DEFAULT_MIN_NOTIONAL
+        for symbol in valuation.symbols
+    ], dtype=np.float64)
+
+    delta = weights * valuation.total - valuation.values   # 양수 매수, 음수 매도 (원화)
+    active = np.abs(delta) > tolerance * valuation.total
+
+    # 매도: 매도 가능 수량 안에서, 최소 주문 금액 이상만
+    available_value = valuation.price * valuation.available / valuation.divisor
+    sell_value = np.where(active & (delta < 0), np.minimum(-delta, available_value), 0.0)
+    sell_qty = np.floor(sell_value * valuation.divisor / np.where(valuation.price > 0, valuation.price, np.inf))
+    sell_value = np.where(sell_value >= minimum, sell_qty * valuation.price / valuation.divisor, 0.0)
+
+    # 매수: 사용 가능 현금 + 매도 대금에서 목표 현금을 남긴 범위로 비례 축소
+    buy_value = np.where(active & (delta > 0), delta, 0.0)
+    budget = max(min(valuation.cash_available + float(sell_value.sum()),
+                     valuation.cash + float(sell_value.sum()) - cash_weight * valuation.total), 0.0)
+    if buy_value.sum() > budget:
+        buy_value *= budget / buy_value.sum()
+    buy_value = np.where(buy_value >= minimum, np.floor(buy_value), 0.0)
+
+    orders = []
+    for i in np.flatnonzero(sell_value > 0):
+        scale = valuation.scales[i]
+        qty_units = scale.round_qty(int(sell_qty[i]))
+        if qty_units > 0:
+            orders.append({'symbol': valuation.symbols[i], 'side': 'sell', 'qty_units': qty_units,
+                           'value': int(sell_value[i])})
+    for i in np.flatnonzero(buy_value > 0):
+        orders.append({'symbol': valuation.symbols[i], 'side': 'buy', 'amt_units': int(buy_value[i]),
+                       'value': int(buy_value[i])})
+    return orders
+
+
+def snapshot_valuation(bot, assets=None):
+    """잔고 1회 + 현재가 1회 조회로 평가 생성 (조회 실패 시 None)"""
+    balances = get_balance_service().snapshot(max_age=0)
+    if balances is None:
+        return None
+    held = sorted(c for c, b in balances.items() if c != CASH and b.balance > 0)
+    symbols = sorted({f"{a}_krw" for a in held + list(assets or [])})
+    tickers = bot.get_tickers(symbols) if symbols else {}
+    if tickers is None:
+        return None
+    return Valuation(balances, tickers, sorted(set(held) | set(assets or [])))
+
+
+def rebalance(bot, targets=None, cash_ratio=0.4, tolerance=0.02, dry_run=True):
+    """
+    포트폴리오 리밸런싱 1회 실행
+
+    Args:
+        dry_run (bool): True 면 주문 목록만 계산
+
+    Returns:
+        list: 계획(또는 실행)한 주문 목록 (조회 실패 시 None)
+    """
+    assets = [a for a in (targets or {}) if a != CASH]
+    valuation = snapshot_valuation(bot, assets)
+    if valuation is None:
+        return None
+    orders = plan_rebalance(valuation, targets, cash_ratio, tolerance)
+    event_log.log('rebalance_plan', total=int(valuation.total), orders=orders, dry_run=dry_run)
+    if dry_run:
+        return orders
+
+    # 매도 대금이 매수에 쓰이도록 매도 먼저 실행
+    for order in orders:
+        if order['side'] == 'sell':
+            order['result'] = bot.place_order_units(order['symbol'], 'sell', qty_units=order['qty_units'],
+                                                    order_type='market')
+        else:
+            order['result'] = bot.place_order_units(order['symbol'], 'buy', amt_units=order['amt_units'],
+                                                    order_type='market')
+    return orders
+
+
+def _render_plan(record):
+    """rebalance_plan 이벤트 콘솔 출력"""
+    mode = " (모의)" if record['dry_run'] else ""
+    lines = [f"⚖️ 리밸런싱{mode}: 총 자산 {record['total']:,} KRW, 주문 {len(record['orders'])}건"]
+    for order in record['orders']:
+        emoji = '🟢' if order['side'] == 'buy' else '🔴'
+        lines.append(f"   {emoji} {order['symbol']:<10} {order['side'].upper():<4} 약 {order['value']:,} KRW")
+    return "\n".join(lines)
+
+
+event_log.register_renderer('rebalance_plan', _render_plan)
+
+
+def main(argv=None):
+    """메인 실행 함수: python portfolio.py [--cash 0.4] [--target btc=0.3 eth=0.3] [--execute]"""
+    parser = argparse.ArgumentParser(description='다중 자산 포트폴리오 리밸런싱')
+    parser.add_argument('--cash', type=float, default=0.4, help='현금 목표 비중 (--target 미지정 시)')
+    parser.add_argument('--target', nargs='*', default=[], help='자산=비중 (예: btc=0.3 eth=0.3 krw=0.4)')
+    parser.add_argument('--tolerance', type=float, default=0.02)
+    parser.add_argument('--execute', action='store_true', help='계산한 주문을 실제로 전송')
+    args = parser.parse_args(argv)
+
+    from c_buy_and_sell import TradingBot
+    targets = {}
+    for item in args.target:
+        asset, _, weight = item.partition('=')
+        targets[asset.lower()] = float(weight)
+    rebalance(TradingBot(), targets or None, args.cash, args.tolerance, dry_run=not args.execute)
+    event_log.flush()
+
+
+if __name__ == "__main__":
+    main()
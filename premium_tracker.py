@@ -0,0 +1,181 @@
+import time
+import threading
+
+import a_base
+import event_log
+from config import Config
+from candle_store import CandleArchive
+from symbol_registry import get_registry
+
+# 거래소 간 프리미엄 추적 (Binance USDT 마켓 vs Korbit 원화 마켓)
+# 프리미엄 = Korbit 원화 가격 / (Binance USDT 가격 x Korbit usdt_krw 환율) - 1
+# 가격이 들어올 때마다 해당 자산의 프리미엄만 O(1)로 다시 계산하고,
+# 1분 단위 프리미엄 캔들(OHLC)을 만들어 마감 시 캔들 아카이브에 기록한다.
+
+USDT_SYMBOL = 'usdt_krw'
+BAR_MS = 60 * 1000  # 프리미엄 캔들 간격 (밀리초)
+
+
+def series_name(asset):
+    """아카이브 시리즈 이름 (예: 'btc' -> 'premium_btc_1m')"""
+    return f"premium_{asset}_1m"
+
+
+class PremiumTracker:
+    """자산별 실시간 프리미엄 계산 및 이력 기록"""
+
+    def __init__(self, bot=None, archive=None, bar_ms=BAR_MS):
+        self.bot = bot              # Korbit 일괄 현재가 조회용 (poll 사용 시)
+        self.archive = archive      # None 이면 이력 기록 안 함
+        self.bar_ms = bar_ms
+        self.registry = get_registry()
+        self.usdt_krw = None        # Korbit USDT 원화 환율
+        self.binance_prices = {}    # 자산 -> Binance USDT 가격
+        self.korbit_prices = {}     # 자산 -> Korbit 원화 가격
+        self.premiums = {}          # 자산 -> 프리미엄 비율 (0.03 = 3%)
+        self._bars = {}             # 자산 -> [시작 ms, 시가, 고가, 저가, 종가, 샘플 수]
+        self._written = {}          # 자산 -> 아카이브에 마지막으로 기록된 캔들 시작 ms
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # 가격 업데이트 (스트리밍 입력)
+    def update_binance(self, binance_symbol, price, ts=None):
+        """Binance USDT 마켓 가격 반영 (예: 'BTCUSDT', 65000.1)"""
+        symbol = self.registry.korbit_symbol(binance_symbol)
+        if symbol is None:
+            return None
+        asset = symbol.split('_')[0]
+        with self._lock:
+            self.binance_prices[asset] = float(price)
+            return self._recompute(asset, ts)
+
+    def update_korbit(self, symbol, price, ts=None):
+        """
+        Korbit 원화 가격 반영 (예: 'btc_krw', 95000000.0)
+
+        usdt_krw 환율이 바뀌면 모든 자산의 프리미엄이 바뀌므로 전체를 다시 계산한다.
+        """
+        asset = symbol.split('_')[0]
+        with self._lock:
+            if symbol == USDT_SYMBOL:
+                self.usdt_krw = float(price)
+                for other in list(self.korbit_prices):
+                    self._recompute(other, ts)
+                return None
+            self.korbit_prices[asset] = float(price)
+            return self._recompute(asset, ts)
+
+    def _recompute(self, asset, ts):
+        binance_price = self.binance_prices.get(asset)
+        korbit_price = self.korbit_prices.get(asset)
+        if not binance_price or not korbit_price or not self.usdt_krw:
+            return None
+
+        premium = korbit_price / (binance_price * self.usdt_krw) - 1
+        self.premiums[asset] = premium
+        self._update_bar(asset, premium, int(time.time() * 1000) if ts is None else ts)
+        return premium
+
+    def _update_bar(self, asset, value, ts):
+        start = ts - ts % self.bar_ms
+        bar = self._bars.get(asset)
+        if bar is not None and bar[0] == start:
+            bar[2] = max(bar[2], value)
+            bar[3] = min(bar[3], value)
+            bar[4] = value
+            bar[5] += 1
+            return
+
+        # 새 구간 시작: 이전 캔들은 마감되었으므로 아카이브에 기록
+        if bar is not None:
+            self._write_bar(asset, bar)
+        self._bars[asset] = [start, value, value, value, value, 1]
+
+    def _write_bar(self, asset, bar):
+        """마감된 캔들 기록 (재시작 전후로 같은 구간이 이미 기록되어 있으면 건너뜀)"""
+        if self.archive is None:
+            return
+        series = series_name(asset)
+        if asset not in self._written:
+            last = self.archive.last(series)
+            self._written[asset] = last['ts'] if last else None
+        written = self._written[asset]
+        if written is not None and bar[0] <= written:
+            return
+        self.archive.append(series, *bar)
+        self._written[asset] = bar[0]
+
+    # 조회
+    def get(self, asset):
+        """자산 프리미엄 (예: 'btc' -> 0.021, 계산 불가 시 None)"""
+        return self.premiums.get(asset)
+
+    def snapshot(self):
+        """자산 -> 프리미엄 비율 복사본"""
+        with self._lock:
+            return dict(self.premiums)
+
+    def history(self, asset, start=None, end=None):
+        """아카이브에 기록된 프리미엄 캔들 (memmap 구조화 배열)"""
+        archive = self.archive or CandleArchive()
+        return archive.read(series_name(asset), start, end)
+
+    def close(self, now=None):
+        """
+        종료 시 구간이 끝난 캔들만 아카이브에 기록
+
+        아직 진행 중인 캔들은 일부 샘플뿐이라 기록하지 않는다 (재시작 후 같은 구간이 이어서 기록됨).
+        """
+        now = int(time.time() * 1000) if now is None else now
+        with self._lock:
+            for asset, bar in self._bars.items():
+                if bar[0] + self.bar_ms <= now:
+                    self._write_bar(asset, bar)
+            self._bars.clear()
+
+    # 폴링 피드 (거래소별 전체 시세 요청 1회씩)
+    def poll(self):
+        """Binance 전체 USDT 시세와 Korbit 전체 원화 시세를 한 번씩 조회하여 반영"""
+        ts = int(time.time() * 1000)
+        try:
+            response = a_base.transport.get(f"{Config.BINANCE_BASE_URL}/api/v3/ticker/price")
+            response.raise_for_status()
+            for item in response.json():
+                self.update_binance(item['symbol'], item['price'], ts)
+        except Exception as e:
+            event_log.log('premium_feed_error', level='error', exchange='binance', error=str(e))
+
+        tickers = self.bot.get_tickers() if self.bot else None
+        if tickers:
+            # 환율을 먼저 반영해야 같은 틱의 자산 가격으로 계산됨
+            usdt = tickers.get(USDT_SYMBOL)
+            if usdt:
+                self.update_korbit(USDT_SYMBOL, usdt.scale.price_float(usdt.close), ts)
+            for symbol, ticker in tickers.items():
+                if symbol != USDT_SYMBOL:
+                    self.update_korbit(symbol, ticker.scale.price_float(ticker.close), ts)
+
+        premiums = self.snapshot()
+        event_log.log('premium_update', level='debug', premiums=premiums)
+        return premiums
+
+    def start(self, interval=5.0):
+        """백그라운드 스레드에서 interval 초마다 poll"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._poll_loop, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """폴링 중지 후 진행 중인 캔들 기록"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.close()
+
+    def _poll_loop(self, interval):
+        while not self._stop_event.is_set():
+            self.poll()
+            self._stop_event.wait(interval)
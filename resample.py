@@ -0,0 +1,208 @@
+from collections import deque
+
+import numpy as np
+
+from scheduler import interval_to_seconds
+
+# 1분봉 스트림 기반 상위 타임프레임 리샘플링
+# 1분봉이 마감될 때마다 각 상위 타임프레임 캔들을 O(1)로 갱신하므로
+# 5m/15m/1h 캔들을 위해 별도의 klines 요청을 보내지 않는다.
+
+BAR_MS = 60 * 1000  # 1분봉 길이 (밀리초)
+
+# 캔들 튜플 필드 순서
+BAR_FIELDS = ('open_time', 'open', 'high', 'low', 'close', 'volume')
+
+
+def parse_kline(row):
+    """Binance kline 응답 행 -> (open_time, open, high, low, close, volume)"""
+    return (int(row[0]), float(row[1]), float(row[2]), float(row[3]), float(row[4]), float(row[5]))
+
+
+def _merge(bucket, bar):
+    """진행 중인 캔들(list)에 1분봉 반영"""
+    bucket[2] = max(bucket[2], bar[2])
+    bucket[3] = min(bucket[3], bar[3])
+    bucket[4] = bar[4]
+    bucket[5] += bar[5]
+
+
+class Resampler:
+    """마감된 1분봉을 상위 타임프레임 캔들로 누적"""
+
+    def __init__(self, interval, maxlen=500):
+        self.interval = interval
+        self.span_ms = interval_to_seconds(interval) * 1000
+        self.bars = deque(maxlen=maxlen)  # 마감된 상위 타임프레임 캔들
+        self._current = None              # 진행 중인 캔들 [open_time, o, h, l, c, v]
+        self._partial = False             # 구간 중간부터 시작된 캔들 (마감 시 버림)
+
+    def add(self, bar):
+        """
+        마감된 1분봉 추가 (O(1))
+
+        Returns:
+            tuple: 이번 1분봉으로 마감된 상위 타임프레임 캔들 (없으면 None)
+        """
+        open_time = bar[0]
+        start = open_time - open_time % self.span_ms
+        closed = None
+
+        # 구간 마지막 1분봉이 누락된 경우 다음 구간 시작 시 이전 캔들 마감
+        if self._current is not None and self._current[0] != start:
+            closed = self._close()
+
+        if self._current is None:
+            self._current = [start, *bar[1:]]
+            self._partial = open_time != start
+        else:
+            _merge(self._current, bar)
+
+        # 구간의 마지막 1분봉이면 즉시 마감
+        if open_time + BAR_MS >= start + self.span_ms:
+            closed = self._close()
+        return closed
+
+    def _close(self):
+        bucket, self._current = self._current, None
+        if self._partial:
+            return None
+        bar = tuple(bucket)
+        self.bars.append(bar)
+        return bar
+
+    def current(self, live_bar=None):
+        """진행 중인 캔들 (진행 중인 1분봉 포함, 없으면 None)"""
+        bucket = list(self._current) if self._current is not None else None
+        if live_bar is not None:
+            start = live_bar[0] - live_bar[0] % self.span_ms
+            if bucket is None or bucket[0] != start:
+                bucket = [start, *live_bar[1:]]
+            else:
+                _merge(bucket, live_bar)
+        return tuple(bucket) if bucket is not None else None
+
+    # 체크포인트 (checkpoint.py)
+    def dump(self):
+        """상태 -> 배열 dict (마감 캔들, 진행 중인 캔들, 부분 구간 여부)"""
+        return {
+            'bars': _bars_array(self.bars),
+            'current': np.asarray(self._current if self._current is not None else [], dtype=np.float64),
+            'partial': np.asarray(self._partial),
+        }
+
+    def load(self, arrays):
+        """dump 결과로 상태 복원"""
+        self.bars.clear()
+        self.bars.extend(_bars_tuples(arrays['bars']))
+        current = arrays['current']
+        self._current = [int(current[0]), *map(float, current[1:])] if len(current) else None
+        self._partial = bool(arrays['partial'])
+
+
+def _bars_array(bars):
+    """캔들 튜플 목록 -> (N, 6) float64 배열 (ms 시각은 float64 로 정확히 표현됨)"""
+    return np.asarray(list(bars), dtype=np.float64).reshape(-1, len(BAR_FIELDS))
+
+
+def _bars_tuples(array):
+    """(N, 6) 배열 -> 캔들 튜플 목록"""
+    return [(int(row[0]), *map(float, row[1:])) for row in array]
+
+
+class CandleWindow:
+    """거래쌍별 1분봉 롤링 윈도우와 상위 타임프레임 리샘플러"""
+
+    def __init__(self, symbol, intervals=('5m', '15m', '1h'), capacity=1000):
+        self.symbol = symbol
+        self.capacity = capacity
+        self.bars = deque(maxlen=capacity)  # 마감된 1분봉
+        self.live = None                    # 진행 중인 1분봉
+        self.resamplers = {interval: Resampler(interval) for interval in intervals}
+
+    @property
+    def last_open_time(self):
+        """마지막으로 마감된 1분봉 시작 시각 (없으면 None)"""
+        return self.bars[-1][0] if self.bars else None
+
+    def missing_bars(self, now_ms):
+        """현재 시각까지 받아야 할 1분봉 수 (진행 중인 봉 포함, 최대 capacity)"""
+        last = self.last_open_time
+        if last is None:
+            return self.capacity
+        return min(self.capacity, (now_ms - last) // BAR_MS + 1)
+
+    def update(self, rows):
+        """
+        Binance kline 응답(시각 오름차순) 반영
+
+        마지막 행은 진행 중인 1분봉으로 보고, 그 이전 행 중 새로 마감된 봉만 추가한다.
+        """
+        if not rows:
+            return
+        last = self.last_open_time
+        for row in rows[:-1]:
+            bar = parse_kline(row)
+            if last is not None and bar[0] <= last:
+                continue
+            self._close_bar(bar)
+            last = bar[0]
+
+        live = parse_kline(rows[-1])
+        self.live = live if last is None or live[0] > last else None
+
+    def dump(self):
+        """
+        윈도우 상태 -> 배열 dict (마감된 1분봉 + 타임프레임별 리샘플러)
+
+        진행 중인 1분봉은 재시작 후 다시 받으므로 저장하지 않는다.
+        """
+        arrays = {'bars': _bars_array(self.bars)}
+        for interval, resampler in self.resamplers.items():
+            for name, array in resampler.dump().items():
+                arrays[f"{interval}/{name}"] = array
+        return arrays
+
+    def load(self, arrays):
+        """dump 결과로 상태 복원 (저장 시와 다른 타임프레임은 빈 상태로 둠)"""
+        self.bars.clear()
+        self.bars.extend(_bars_tuples(arrays['bars']))
+        self.live = None
+        for interval, resampler in self.resamplers.items():
+            if f"{interval}/bars" in arrays:
+                resampler.load({name: arrays[f"{interval}/{name}"] for name in ('bars', 'current', 'partial')})
+
+    def _close_bar(self, bar):
+        self.bars.append(bar)
+        for resampler in self.resamplers.values():
+            resampler.add(bar)
+
+    def frame(self, interval='1m', limit=None):
+        """
+        캔들 DataFrame (get_klines 와 같은 컬럼, 마지막 행은 진행 중인 캔들)
+
+        Args:
+            interval (str): '1m' 또는 리샘플링 타임프레임
+            limit (int): 최근 N개만 (선택)
+        """
+        import pandas as pd
+
+        if interval == '1m':
+            rows = list(self.bars)
+            if self.live is not None:
+                rows.append(self.live)
+            span_ms = BAR_MS
+        else:
+            resampler = self.resamplers[interval]
+            rows = list(resampler.bars)
+            current = resampler.current(self.live)
+            if current is not None:
+                rows.append(current)
+            span_ms = resampler.span_ms
+
+        if limit is not None:
+            rows = rows[-limit:]
+        df = pd.DataFrame(rows, columns=list(BAR_FIELDS))
+        df['close_time'] = pd.to_datetime(df['open_time'] + span_ms - 1, unit='ms')
+        df['open_time'] = pd.to_datetime(df['open_time'], unit='ms')
+        return df
@@ -0,0 +1,470 @@
+import re
+from collections import deque
+
+import numpy as np
+
+import indicators
+
+# 선언형 매매 규칙
+# 'rsi(14) < 30 & macd(12,26,9) > macd_signal & close > ema(20)' 같은 규칙 문자열을
+# 파싱해 하나의 벡터 표현식으로 컴파일한다. 여러 규칙에 같은 지표가 나오면 한 번만 계산한다.
+#
+# 같은 RuleSet 을 두 가지 방식으로 평가한다.
+#   - 일괄(evaluate): (T,) 또는 (종목 x 시간) 종가 배열 -> 봉별 결과 배열 (백테스트/스크리너)
+#   - 증분(stream):   마감된 봉을 하나씩 반영하며 지표 상태만 갱신 (실시간 신호 루프)
+#
+# 문법 (우선순위 낮은 순):
+#   |  &  ~  비교(< <= > >= == !=)  + -  * /  단항 -  숫자 · 지표(파라미터) · ( )
+# 지표: close, sma(n), ema(n), rsi(n), macd(f,s,g), macd_signal(f,s,g), macd_hist(f,s,g)
+# 파라미터를 생략하면 기본값 사용 (예: macd_signal == macd_signal(12,26,9))
+
+# 기본 매매 규칙 (기존 get_trading_signal/generate_signal 조건과 동일)
+DEFAULT_RULES = {
+    'buy': 'rsi(14) < 30 & macd(12,26,9) > macd_signal & close > ema(20)',
+    'sell': 'rsi(14) > 70 & macd(12,26,9) < macd_signal & close < ema(20)',
+}
+
+# 지표 이름 -> (기본 파라미터, 계산 그룹, 그룹 출력 위치)
+# 같은 그룹/파라미터의 지표(macd, macd_signal, macd_hist)는 한 번의 계산을 공유한다.
+INDICATORS = {
+    'close': ((), 'close', 0),
+    'sma': ((20,), 'sma', 0),
+    'ema': ((20,), 'ema', 0),
+    'rsi': ((14,), 'rsi', 0),
+    'macd': ((12, 26, 9), 'macd', 0),
+    'macd_signal': ((12, 26, 9), 'macd', 1),
+    'macd_hist': ((12, 26, 9), 'macd', 2),
+}
+
+_TOKEN = re.compile(r'\s*(?:(\d+\.?\d*|\.\d+)|([A-Za-z_]\w*)|(<=|>=|==|!=|[<>&|~()+\-*/,]))')
+_COMPARE = ('<', '<=', '>', '>=', '==', '!=')
+
+
+def _tokenize(source):
+    tokens = []
+    position = 0
+    source = source.rstrip()
+    while position < len(source):
+        match = _TOKEN.match(source, position)
+        if not match:
+            raise ValueError(f"규칙을 해석할 수 없습니다: {source!r} ({position}번째 문자)")
+        number, name, op = match.groups()
+        if number is not None:
+            tokens.append(('num', float(number)))
+        elif name is not None:
+            tokens.append(('name', name))
+        else:
+            tokens.append(('op', op))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """재귀 하강 파서 -> (종류, ...) 튜플 AST"""
+
+    def __init__(self, source):
+        self.source = source
+        self.tokens = _tokenize(source)
+        self.position = 0
+
+    def error(self, message):
+        return ValueError(f"규칙 오류: {message} ({self.source!r})")
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, op=None):
+        token = self.peek()
+        if op is not None and token != ('op', op):
+            raise self.error(f"'{op}' 가 필요합니다")
+        self.position += 1
+        return token
+
+    def parse(self):
+        node = self.logical_or()
+        if self.position != len(self.tokens):
+            raise self.error(f"예상하지 못한 토큰 {self.peek()[1]!r}")
+        return node
+
+    def binary(self, ops, operand, kind):
+        node = operand()
+        while self.peek()[0] == 'op' and self.peek()[1] in ops:
+            op = self.take()[1]
+            node = (kind, op, node, operand())
+        return node
+
+    def logical_or(self):
+        return self.binary(('|',), self.logical_and, 'logic')
+
+    def logical_and(self):
+        return self.binary(('&',), self.logical_not, 'logic')
+
+    def logical_not(self):
+        if self.peek() == ('op', '~'):
+            self.take()
+            return ('not', self.logical_not())
+        return self.comparison()
+
+    def comparison(self):
+        node = self.arith()
+        if self.peek()[0] == 'op' and self.peek()[1] in _COMPARE:
+            op = self.take()[1]
+            node = ('compare', op, node, self.arith())
+        return node
+
+    def arith(self):
+        return self.binary(('+', '-'), self.term, 'arith')
+
+    def term(self):
+        return self.binary(('*', '/'), self.unary, 'arith')
+
+    def unary(self):
+        if self.peek() == ('op', '-'):
+            self.take()
+            return ('neg', self.unary())
+        return self.atom()
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == 'num':
+            return ('num', value)
+        if kind == 'name':
+            return self.indicator(value)
+        if (kind, value) == ('op', '('):
+            node = self.logical_or()
+            self.take(')')
+            return node
+        raise self.error(f"예상하지 못한 토큰 {value!r}")
+
+    def indicator(self, name):
+        if name not in INDICATORS:
+            raise self.error(f"알 수 없는 지표 {name!r}")
+        defaults = INDICATORS[name][0]
+        params = []
+        if self.peek() == ('op', '('):
+            self.take()
+            while self.peek() != ('op', ')'):
+                kind, value = self.take()
+                if kind != 'num' or value != int(value) or value < 1:
+                    raise self.error(f"{name} 파라미터는 양의 정수여야 합니다")
+                params.append(int(value))
+                if self.peek() != ('op', ')'):
+                    self.take(',')
+            self.take(')')
+        if len(params) > len(defaults):
+            raise self.error(f"{name} 파라미터는 최대 {len(defaults)}개입니다")
+        return ('series', name, tuple(params) + defaults[len(params):])
+
+
+def parse(source):
+    """규칙 문자열 -> AST"""
+    return _Parser(source).parse()
+
+
+def series_key(name, params):
+    """지표 이름 + 파라미터 -> 값 dict 키 (예: 'rsi(14)', 'close')"""
+    return f"{name}({','.join(map(str, params))})" if params else name
+
+
+# 일괄 계산 (그룹 하나 -> 출력 배열 튜플)
+def _compute_group(group, closes):
+    name, params = group
+    if name == 'close':
+        return (closes,)
+    if name == 'sma':
+        return (indicators.sma(closes, *params),)
+    if name == 'ema':
+        return (indicators.ema(closes, *params),)
+    if name == 'rsi':
+        return (indicators.rsi(closes, *params),)
+    macd_line, signal_line = indicators.macd(closes, *params)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+# 증분 계산 상태 (step(x, commit): commit=False 면 상태를 바꾸지 않고 결과만 계산)
+# dump()/load(array) 는 체크포인트용 1차원 float64 배열 변환
+class _CloseState:
+    def step(self, x, commit):
+        return (x,)
+
+    def dump(self):
+        return np.empty(0)
+
+    def load(self, array):
+        pass
+
+
+class _EmaState:
+    """adjust=False 지수이동평균 (indicators.ema 와 같은 재귀식)"""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = None
+
+    def step(self, x, commit):
+        value = x if self.value is None else self.alpha * x + (1.0 - self.alpha) * self.value
+        if commit:
+            self.value = value
+        return (value,)
+
+    def dump(self):
+        return np.array([np.nan if self.value is None else self.value])
+
+    def load(self, array):
+        self.value = None if np.isnan(array[0]) else float(array[0])
+
+
+class _SmaState:
+    """최근 window 개 값의 단순이동평균"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+
+    def mean_after(self, x):
+        if len(self.values) + 1 < self.window:
+            return np.nan
+        recent = list(self.values)[1:] if len(self.values) == self.window else list(self.values)
+        return (sum(recent) + x) / self.window
+
+    def step(self, x, commit):
+        value = self.mean_after(x)
+        if commit:
+            self.values.append(x)
+        return (value,)
+
+    def dump(self):
+        return np.array(self.values, dtype=np.float64)
+
+    def load(self, array):
+        self.values.clear()
+        self.values.extend(map(float, array))
+
+
+class _RsiState:
+    """단순이동평균 방식 RSI (첫 봉의 변화량은 0, indicators.rsi 와 같은 규칙)"""
+
+    def __init__(self, period):
+        self.prev = None
+        self.gains = _SmaState(period)
+        self.losses = _SmaState(period)
+
+    def step(self, x, commit):
+        delta = 0.0 if self.prev is None else x - self.prev
+        gain = self.gains.step(max(delta, 0.0), commit)[0]
+        loss = self.losses.step(max(-delta, 0.0), commit)[0]
+        if commit:
+            self.prev = x
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = 100.0 - 100.0 / (1.0 + np.float64(gain) / np.float64(loss))
+        return (value,)
+
+    def dump(self):
+        prev = np.nan if self.prev is None else self.prev
+        return np.concatenate([[prev], self.gains.dump(), self.losses.dump()])
+
+    def load(self, array):
+        size = (len(array) - 1) // 2
+        self.prev = None if np.isnan(array[0]) else float(array[0])
+        self.gains.load(array[1:1 + size])
+        self.losses.load(array[1 + size:])
+
+
+class _MacdState:
+    def __init__(self, fast, slow, signal):
+        self.fast = _EmaState(fast)
+        self.slow = _EmaState(slow)
+        self.signal = _EmaState(signal)
+
+    def step(self, x, commit):
+        line = self.fast.step(x, commit)[0] - self.slow.step(x, commit)[0]
+        signal = self.signal.step(line, commit)[0]
+        return line, signal, line - signal
+
+    def dump(self):
+        return np.concatenate([self.fast.dump(), self.slow.dump(), self.signal.dump()])
+
+    def load(self, array):
+        self.fast.load(array[0:1])
+        self.slow.load(array[1:2])
+        self.signal.load(array[2:3])
+
+
+_STATES = {
+    'close': _CloseState,
+    'sma': _SmaState,
+    'ema': _EmaState,
+    'rsi': _RsiState,
+    'macd': _MacdState,
+}
+
+
+class RuleSet:
+    """이름 붙은 규칙 묶음 (공유 지표는 한 번만 계산)"""
+
+    def __init__(self, rules):
+        """
+        Args:
+            rules (dict): 규칙 이름 -> 규칙 문자열 (예: DEFAULT_RULES)
+        """
+        self.sources = dict(rules)
+        self.series = {}       # 지표 키 -> (계산 그룹, 출력 위치)
+        self.uses = {}         # 규칙 이름 -> 사용하는 지표 키 목록
+        self._constants = []
+        self._code = {}
+        for name, source in self.sources.items():
+            if name in INDICATORS:
+                raise ValueError(f"규칙 이름으로 지표 이름을 쓸 수 없습니다: {name}")
+            node = parse(source)
+            if self._kind(node, source) != 'bool':
+                raise ValueError(f"규칙 결과가 참/거짓이 아닙니다: {source!r}")
+            used = []
+            expression = self._emit(node, used)
+            self.uses[name] = used
+            self._code[name] = compile(expression, f"<rule {name}>", 'eval')
+        self.groups = sorted({group for group, _ in self.series.values()})
+
+    def _kind(self, node, source):
+        """AST 타입 검사 ('bool' | 'num')"""
+        kind = node[0]
+        if kind in ('num', 'series'):
+            return 'num'
+        if kind == 'neg':
+            expected, operands, result = 'num', node[1:], 'num'
+        elif kind == 'not':
+            expected, operands, result = 'bool', node[1:], 'bool'
+        elif kind == 'logic':
+            expected, operands, result = 'bool', node[2:], 'bool'
+        elif kind == 'compare':
+            expected, operands, result = 'num', node[2:], 'bool'
+        else:
+            expected, operands, result = 'num', node[2:], 'num'
+        for operand in operands:
+            if self._kind(operand, source) != expected:
+                raise ValueError(f"규칙 오류: 비교 결과와 숫자를 섞어 쓸 수 없습니다 ({source!r})")
+        return result
+
+    def _emit(self, node, used):
+        """AST -> 파이썬 표현식 문자열 (v: 지표 값 dict, c: 상수 목록)"""
+        kind = node[0]
+        if kind == 'num':
+            self._constants.append(np.float64(node[1]))
+            return f"c[{len(self._constants) - 1}]"
+        if kind == 'series':
+            _, name, params = node
+            _, group, index = INDICATORS[name]
+            key = series_key(name, params)
+            self.series[key] = ((group, params), index)
+            if key not in used:
+                used.append(key)
+            return f"v[{key!r}]"
+        if kind == 'neg':
+            return f"(-{self._emit(node[1], used)})"
+        if kind == 'not':
+            return f"(~{self._emit(node[1], used)})"
+        _, op, left, right = node
+        return f"({self._emit(left, used)} {op} {self._emit(right, used)})"
+
+    def _apply(self, values):
+        """지표 값 dict 에 규칙 결과를 추가"""
+        scope = {'v': values, 'c': self._constants}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for name, code in self._code.items():
+                values[name] = eval(code, {'__builtins__': {}}, scope)
+        return values
+
+    # 일괄 평가
+    def evaluate(self, closes):
+        """
+        종가 배열 전체에 대해 규칙 평가
+
+        Args:
+            closes: (T,) 또는 (종목 수, T) 종가 배열
+
+        Returns:
+            dict: 지표 키 -> 값 배열, 규칙 이름 -> bool 배열 (모두 closes 와 같은 모양)
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        values = {}
+        outputs = {group: _compute_group(group, closes) for group in self.groups}
+        for key, (group, index) in self.series.items():
+            values[key] = outputs[group][index]
+        self._apply(values)
+        for name in self._code:
+            values[name] = np.broadcast_to(values[name], closes.shape)
+        return values
+
+    def ready(self, values):
+        """모든 지표 값이 계산된(NaN 아닌) 위치 (워밍업 구간 판별)"""
+        mask = True
+        for key in self.series:
+            mask = mask & ~np.isnan(values[key])
+        return mask
+
+    # 증분 평가
+    def stream(self):
+        """실시간 평가용 증분 상태 생성"""
+        return RuleStream(self)
+
+    def describe(self, values, rule=None):
+        """규칙이 사용하는 지표의 최신 값 요약 (예: 'rsi(14): 28.45, ema(20): 95000000.00')"""
+        keys = self.uses[rule] if rule else list(self.series)
+        parts = []
+        for key in keys:
+            value = float(np.asarray(values[key]).reshape(-1)[-1])
+            parts.append(f"{key}: {value:.6f}" if abs(value) < 1 else f"{key}: {value:.2f}")
+        return ", ".join(parts)
+
+
+class RuleStream:
+    """마감된 봉을 하나씩 반영하는 RuleSet 증분 평가 상태"""
+
+    def __init__(self, ruleset):
+        self.ruleset = ruleset
+        self.states = {group: _STATES[group[0]](*group[1]) for group in ruleset.groups}
+        self.count = 0          # 반영한 봉 수
+        self.last_time = None   # 마지막으로 반영한 봉 시각 (호출 측 관리용)
+        self.last = None        # 마지막으로 반영한 봉의 평가 결과
+
+    def _step(self, close, commit):
+        close = float(close)
+        outputs = {group: state.step(close, commit) for group, state in self.states.items()}
+        values = {key: np.float64(outputs[group][index])
+                  for key, (group, index) in self.ruleset.series.items()}
+        self.ruleset._apply(values)
+        for name in self.ruleset._code:
+            values[name] = bool(values[name])
+        return values
+
+    def update(self, close, time=None):
+        """
+        마감된 봉 반영 (O(지표 수))
+
+        Returns:
+            dict: 이 봉 기준 지표 값과 규칙 결과 (evaluate 결과의 마지막 열과 같음)
+        """
+        self.last = self._step(close, commit=True)
+        self.count += 1
+        self.last_time = time
+        return self.last
+
+    def peek(self, close):
+        """진행 중인 봉 가격으로 평가 (상태는 바꾸지 않음)"""
+        return self._step(close, commit=False)
+
+    # 체크포인트 (checkpoint.py)
+    def dump(self):
+        """지표 상태 -> 배열 dict (계산 그룹별 상태 + 반영한 봉 수/시각)"""
+        arrays = {series_key(*group): state.dump() for group, state in self.states.items()}
+        arrays['count'] = np.asarray(self.count)
+        arrays['last_time'] = np.asarray(-1 if self.last_time is None else self.last_time)
+        return arrays
+
+    def load(self, arrays):
+        """dump 결과로 상태 복원 (같은 RuleSet 의 상태여야 함)"""
+        for group, state in self.states.items():
+            state.load(arrays[series_key(*group)])
+        self.count = int(arrays['count'])
+        last_time = int(arrays['last_time'])
+        self.last_time = None if last_time < 0 else last_time
+        self.last = None
@@ -0,0 +1,85 @@
+import time
+import threading
+
+# 캔들 마감 시각에 맞춰 평가를 실행하는 스케줄러
+
+# 캔들 간격 문자열 -> 초 단위 (Binance interval 표기 기준)
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '3m': 180,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '1h': 3600,
+    '2h': 7200,
+    '4h': 14400,
+    '6h': 21600,
+    '12h': 43200,
+    '1d': 86400,
+}
+
+
+def interval_to_seconds(interval):
+    """캔들 간격('1m', '1h' 등)을 초 단위로 변환"""
+    if interval not in INTERVAL_SECONDS:
+        raise ValueError(f"지원하지 않는 캔들 간격입니다: {interval}")
+    return INTERVAL_SECONDS[interval]
+
+
+class CandleScheduler:
+    """캔들 경계(+오프셋) 또는 데이터 이벤트마다 깨어나는 중단 가능한 스케줄러"""
+
+    def __init__(self, interval='1m', offset=1.0):
+        """
+        Args:
+            interval (str): 캔들 간격 (예: '1m')
+            offset (float): 캔들 마감 후 평가까지 대기할 초 (거래소 반영 지연 보정)
+        """
+        self.interval = interval
+        self.period = interval_to_seconds(interval)
+        self.offset = offset
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def next_fire_time(self, now=None):
+        """다음 평가 시각 (epoch 초) 계산"""
+        if now is None:
+            now = time.time()
+        boundary = (now - self.offset) // self.period * self.period + self.period
+        return boundary + self.offset
+
+    def wait_next(self):
+        """
+        다음 캔들 경계 또는 trigger() 호출까지 대기
+
+        Returns:
+            bool: 계속 실행해야 하면 True, stop()이 호출되었으면 False
+        """
+        return self.wait(self.next_fire_time() - time.time())
+
+    def wait(self, seconds):
+        """최대 seconds 동안 대기 (stop/trigger 시 즉시 반환)"""
+        if self._stop_event.is_set():
+            return False
+        if seconds > 0:
+            self._wake_event.wait(seconds)
+        self._wake_event.clear()
+        return not self._stop_event.is_set()
+
+    def trigger(self):
+        """데이터 이벤트 발생 시 대기 중인 루프를 즉시 깨움"""
+        self._wake_event.set()
+
+    def stop(self):
+        """스케줄러 중지 (대기 중인 스레드가 즉시 깨어남)"""
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def reset(self):
+        """중지 상태 초기화 (재시작용)"""
+        self._stop_event.clear()
+        self._wake_event.clear()
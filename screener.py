@@ -0,0 +1,206 @@
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import a_base
+import metrics
+import event_log
+import indicators
+from rules import RuleSet, DEFAULT_RULES
+from config import Config
+from symbol_registry import get_registry
+
+# 전체 마켓 신호 스크리너
+# 상장된 모든 거래쌍의 1분봉을 동시에 받아(거래소별 속도 제한 적용)
+# (종목 x 시간) 2차원 배열 한 번으로 지표를 계산하고, 등록된 규칙별 신호 강도로 정렬한다.
+
+WINDOW = 100        # 종목별 1분봉 개수 (신호 루프와 동일)
+MIN_BARS = 50       # 이보다 이력이 짧은 종목은 제외 (generate_signal 과 동일)
+MAX_WORKERS = 16    # 동시 요청 스레드 수 (실제 속도는 a_base 속도 제한이 결정)
+
+# 스크리너가 평가하는 선언형 규칙 (신호 루프 규칙 + MACD 히스토그램 부호, 공유 지표는 한 번만 계산)
+SIGNAL_RULES = RuleSet({
+    **DEFAULT_RULES,
+    'macd_up': 'macd_hist(12,26,9) > 0',
+    'macd_down': 'macd_hist(12,26,9) < 0',
+})
+
+# 규칙 이름 -> 함수(지표 dict) -> 종목별 점수 배열 (양수 매수, 음수 매도, 0 관망, 크기 = 강도 0~1)
+RULES = {}
+
+
+def register_rule(name, rule):
+    """스크리너 규칙 등록"""
+    RULES[name] = rule
+
+
+def rule_rsi_ema_macd(ind):
+    """신호 루프 매수/매도 규칙 (강도는 RSI 가 경계를 벗어난 정도)"""
+    rsi = ind['rsi(14)'][:, -1]
+    buy = ind['buy'][:, -1]
+    sell = ind['sell'][:, -1] & ~buy
+    score = np.zeros(len(rsi))
+    score[buy] = (30 - rsi[buy]) / 30
+    score[sell] = -(rsi[sell] - 70) / 30
+    return score
+
+
+def rule_macd_cross(ind):
+    """직전 봉 대비 MACD 가 시그널 선을 교차 (강도는 가격 대비 히스토그램 크기, 0.2% 에서 1)"""
+    up = ~ind['macd_up'][:, -2] & ind['macd_up'][:, -1]
+    down = ~ind['macd_down'][:, -2] & ind['macd_down'][:, -1]
+    hist = ind['macd_hist(12,26,9)'][:, -1]
+    close = ind['close'][:, -1]
+    with np.errstate(invalid='ignore'):
+        strength = np.minimum(np.abs(hist) / (close * 0.002), 1.0)
+    return np.where(up, strength, np.where(down, -strength, 0.0))
+
+
+register_rule('rsi_ema_macd', rule_rsi_ema_macd)
+register_rule('macd_cross', rule_macd_cross)
+
+
+def compute_indicators(closes):
+    """(종목 x 시간) 종가 배열 -> 지표/규칙 dict (모두 같은 모양의 2차원 배열)"""
+    return SIGNAL_RULES.evaluate(closes)
+
+
+class Screener:
+    """Binance/Korbit 전체 거래쌍 동시 조회 + 일괄 지표 계산"""
+
+    def __init__(self, rules=None, max_workers=MAX_WORKERS):
+        self.registry = get_registry()
+        self.rules = rules or list(RULES)
+        self.max_workers = max_workers
+
+    # 조회 대상
+    def universe(self, exchange):
+        """거래소별 스캔 대상 거래쌍 목록"""
+        if exchange == 'binance':
+            symbols = self.registry.binance_symbols('usdt')
+            if not symbols:
+                # exchangeInfo 를 받지 못한 경우 Korbit 거래쌍에 대응하는 마켓만
+                symbols = [s for s in map(self.registry.binance_symbol, self.registry.symbols()) if s]
+            return symbols
+        return self.registry.symbols()
+
+    # 조회 (스레드별 1회 요청)
+    def _fetch_binance(self, symbol):
+        response = a_base.transport.get(
+            f"{Config.BINANCE_BASE_URL}/api/v3/klines",
+            params={'symbol': symbol, 'interval': '1m', 'limit': WINDOW}
+        )
+        response.raise_for_status()
+        return [float(row[4]) for row in response.json()]
+
+    def _fetch_korbit(self, symbol):
+        response = a_base.transport.get(
+            f"{Config.KORBIT_BASE_URL}/v2/candles",
+            params={'symbol': symbol, 'interval': '1', 'limit': WINDOW}
+        )
+        response.raise_for_status()
+        candles = sorted(response.json().get('data', []), key=lambda c: c.get('timestamp', 0))
+        return [float(c['close']) for c in candles]
+
+    def _fetch_one(self, job):
+        exchange, symbol = job
+        fetch = self._fetch_binance if exchange == 'binance' else self._fetch_korbit
+        try:
+            return exchange, symbol, fetch(symbol)
+        except Exception as e:
+            event_log.log('screener_fetch_error', level='warning', exchange=exchange, symbol=symbol, error=str(e))
+            return exchange, symbol, None
+
+    def fetch_all(self, exchanges=('binance', 'korbit')):
+        """
+        모든 거래쌍 종가를 동시에 조회 -> [(거래소, 거래쌍, 종가 목록)]
+
+        거래소마다 스레드 풀을 따로 두어, 한 거래소의 속도 제한 대기가
+        다른 거래소 요청 스레드를 점유하지 않도록 한다.
+        """
+        pools = [ThreadPoolExecutor(max_workers=self.max_workers) for _ in exchanges]
+        try:
+            futures = [
+                pool.submit(self._fetch_one, (exchange, symbol))
+                for pool, exchange in zip(pools, exchanges)
+                for symbol in self.universe(exchange)
+            ]
+            return [result for result in (f.result() for f in futures) if result[2]]
+        finally:
+            for pool in pools:
+                pool.shutdown()
+
+    # 계산
+    def scan(self, exchanges=('binance', 'korbit')):
+        """
+        전체 마켓 스캔
+
+        Returns:
+            list: 신호가 있는 결과 dict 목록 (강도 내림차순)
+                  {'exchange', 'symbol', 'rule', 'signal', 'strength', 'price', 'rsi'}
+        """
+        started = time.perf_counter()
+        with metrics.time_stage('screener_fetch'):
+            fetched = [item for item in self.fetch_all(exchanges) if len(item[2]) >= MIN_BARS]
+        if not fetched:
+            return []
+
+        with metrics.time_stage('screener_compute'):
+            closes = indicators.stack_closes([item[2] for item in fetched], WINDOW)
+            ind = compute_indicators(closes)
+            results = []
+            for name in self.rules:
+                scores = RULES[name](ind)
+                for i in np.flatnonzero(scores):
+                    exchange, symbol, _ = fetched[i]
+                    results.append({
+                        'exchange': exchange,
+                        'symbol': symbol,
+                        'rule': name,
+                        'signal': 'buy' if scores[i] > 0 else 'sell',
+                        'strength': float(abs(scores[i])),
+                        'price': float(closes[i, -1]),
+                        'rsi': float(ind['rsi(14)'][i, -1]),
+                    })
+            results.sort(key=lambda r: r['strength'], reverse=True)
+
+        event_log.log('screener_scan', symbols=len(fetched), hits=len(results),
+                      elapsed=round(time.perf_counter() - started, 3))
+        return results
+
+
+def print_results(results, top=20):
+    """스캔 결과 상위 N개 출력"""
+    emoji = {'buy': '🟢', 'sell': '🔴'}
+    print(f"\n🔎 스크리너 결과 (상위 {min(top, len(results))}/{len(results)}건)")
+    print("-" * 80)
+    print(f"{'거래소':<8} {'심볼':<12} {'규칙':<14} {'신호':<6} {'강도':>6} {'RSI':>7} {'현재가':>16}")
+    print("-" * 80)
+    for r in results[:top]:
+        print(f"{r['exchange']:<8} {r['symbol']:<12} {r['rule']:<14} "
+              f"{emoji[r['signal']]} {r['signal'].upper():<4} {r['strength']:>6.2f} "
+              f"{r['rsi']:>7.2f} {r['price']:>16,.4f}")
+    print("-" * 80)
+
+
+def main(argv=None):
+    """메인 실행 함수: python screener.py [--exchange binance|korbit|all] [--top 20]"""
+    parser = argparse.ArgumentParser(description='전체 마켓 신호 스크리너')
+    parser.add_argument('--exchange', choices=['binance', 'korbit', 'all'], default='all')
+    parser.add_argument('--rules', nargs='*', choices=sorted(RULES), help='적용할 규칙 (기본: 전체)')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    exchanges = ('binance', 'korbit') if args.exchange == 'all' else (args.exchange,)
+    screener = Screener(rules=args.rules)
+    started = time.perf_counter()
+    results = screener.scan(exchanges)
+    event_log.flush()
+    print_results(results, args.top)
+    print(f"⏱️ 스캔 소요: {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
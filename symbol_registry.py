@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import threading
+from decimal import Decimal
+import a_base
+from config import Config
+from fixed_point import (SymbolScale, register_scale, parse_units, KRW_DECIMALS,
+                         DEFAULT_SYMBOL_DECIMALS, FALLBACK_DECIMALS)
+
+# 거래소 메타데이터 레지스트리
+# Korbit/Binance 의 거래쌍·자산 정보를 한 번 받아 디스크에 캐시하고,
+# 호가 단위 / 수량 단위 / 최소 주문 금액 / 거래소 간 심볼 매핑을 O(1) 로 조회한다.
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'symbol_registry.json')
+REFRESH_INTERVAL = 6 * 60 * 60  # 캐시 갱신 주기 (초)
+
+# Korbit 최소 주문 금액 기본값 (KRW)
+DEFAULT_MIN_NOTIONAL = 5000
+
+# 네트워크/캐시 모두 없을 때 사용하는 기본 거래쌍 (메뉴 기본 목록 순서)
+DEFAULT_KORBIT_PAIRS = [
+    {'symbol': 'btc_krw', 'name': 'Bitcoin', 'tick_size': '1', 'lot_size': '0.00000001'},
+    {'symbol': 'eth_krw', 'name': 'Ethereum', 'tick_size': '1', 'lot_size': '0.00000001'},
+    {'symbol': 'usdt_krw', 'name': 'Tether', 'tick_size': '1', 'lot_size': '0.00000001'},
+]
+
+# 메뉴에 우선 노출할 거래쌍
+FEATURED_SYMBOLS = ['btc_krw', 'eth_krw', 'usdt_krw']
+
+
+def _decimals(step):
+    """'0.001' -> 3, '1000' -> 0"""
+    exponent = Decimal(step).normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+def _first(data, *keys, default=None):
+    """응답 항목에서 먼저 존재하는 키의 값 반환 (API 버전별 필드명 차이 대응)"""
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, ''):
+            return value
+    return default
+
+
+class SymbolInfo:
+    """Korbit 거래쌍 메타데이터"""
+
+    __slots__ = ('symbol', 'base', 'quote', 'name', 'scale', 'min_notional', 'binance_symbol')
+
+    def __init__(self, symbol, base, quote, name, scale, min_notional, binance_symbol):
+        self.symbol = symbol
+        self.base = base
+        self.quote = quote
+        self.name = name
+        self.scale = scale                # 가격/수량 정수 스케일, 호가/수량 단위
+        self.min_notional = min_notional  # 최소 주문 금액 (원화 정수)
+        self.binance_symbol = binance_symbol  # 대응 Binance USDT 마켓 (없으면 None)
+
+    @property
+    def tick_size(self):
+        return self.scale.price_str(self.scale.tick_units)
+
+    @property
+    def lot_size(self):
+        return self.scale.qty_str(self.scale.lot_units)
+
+    def __repr__(self):
+        return (f"SymbolInfo({self.symbol} tick={self.tick_size} lot={self.lot_size} "
+                f"min={self.min_notional} binance={self.binance_symbol})")
+
+
+class SymbolRegistry:
+    """거래쌍 메타데이터 캐시 (조회는 dict 기반 O(1))"""
+
+    def __init__(self, cache_path=CACHE_PATH, refresh_interval=REFRESH_INTERVAL):
+        self.cache_path = cache_path
+        self.refresh_interval = refresh_interval
+        self.fetched_at = 0
+        self._korbit = {}        # korbit symbol -> SymbolInfo
+        self._binance = {}       # binance symbol -> {'tick_size', 'lot_size', 'min_notional', ...}
+        self._binance_to_korbit = {}
+        self._lock = threading.Lock()
+
+    # 로드 / 갱신
+    def load(self, force=False):
+        """캐시가 유효하면 캐시를, 아니면 거래소에서 받아 인덱스 구성"""
+        with self._lock:
+            raw = None if force else self._read_cache()
+            if raw is None or time.time() - raw.get('fetched_at', 0) > self.refresh_interval:
+                fetched = self._fetch()
+                if fetched is not None:
+                    raw = fetched
+                    self._write_cache(raw)
+            if raw is None:
+                print("⚠️ 거래소 메타데이터를 불러오지 못해 기본 거래쌍 정보를 사용합니다.")
+                # 기본값도 갱신 주기 동안 사용 (연결 실패 시 매번 재시도하지 않음)
+                raw = {'fetched_at': time.time(), 'korbit': DEFAULT_KORBIT_PAIRS, 'binance': []}
+            self._build(raw)
+        return self
+
+    def maybe_refresh(self):
+        """갱신 주기가 지났으면 다시 로드 (장기 실행 프로세스용)"""
+        if time.time() - self.fetched_at > self.refresh_interval:
+            self.load()
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, raw):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(raw, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def _fetch(self):
+        """Korbit 거래쌍/자산 + Binance exchangeInfo 조회 (실패 시 None)"""
+        try:
+            korbit = self._fetch_korbit()
+        except Exception as e:
+            print(f"❌ Korbit 거래쌍 정보 조회 실패: {e}")
+            return None
+        if not korbit:
+            # 빈 응답을 캐시하면 갱신 주기 동안 거래쌍이 모두 사라지므로 실패로 처리
+            print("❌ Korbit 거래쌍 정보가 비어 있습니다.")
+            return None
+        try:
+            binance = self._fetch_binance()
+        except Exception as e:
+            print(f"❌ Binance 거래쌍 정보 조회 실패: {e}")
+            binance = []
+        return {'fetched_at': time.time(), 'korbit': korbit, 'binance': binance}
+
+    def _fetch_korbit(self):
+        response = a_base.transport.get(f"{Config.KORBIT_BASE_URL}/v2/currencyPairs")
+        response.raise_for_status()
+        pairs = response.json().get('data', [])
+
+        names = {}
+        try:
+            response = a_base.transport.get(f"{Config.KORBIT_BASE_URL}/v2/currencies")
+            response.raise_for_status()
+            for currency in response.json().get('data', []):
+                code = str(_first(currency, 'currency', 'symbol', 'name', default='')).lower()
+                names[code] = _first(currency, 'fullName', 'name', default=code.upper())
+        except Exception as e:
+            print(f"⚠️ Korbit 자산 정보 조회 실패 (이름 없이 진행): {e}")
+
+        result = []
+        for pair in pairs:
+            symbol = str(pair.get('symbol', '')).lower()
+            if not symbol.endswith('_krw'):
+                continue
+            status = str(pair.get('status', 'launched')).lower()
+            if status not in ('launched', 'trading', 'active'):
+                continue
+            result.append({
+                'symbol': symbol,
+                'name': names.get(symbol.split('_')[0], symbol.split('_')[0].upper()),
+                'tick_size': _first(pair, 'tickSize', 'priceTickSize'),
+                'lot_size': _first(pair, 'qtyStep', 'qtyTickSize', 'lotSize'),
+                'min_notional': str(_first(pair, 'minOrderAmount', 'minNotional', default=DEFAULT_MIN_NOTIONAL)),
+            })
+        return result
+
+    def _fetch_binance(self):
+        response = a_base.transport.get(f"{Config.BINANCE_BASE_URL}/api/v3/exchangeInfo")
+        response.raise_for_status()
+        result = []
+        for item in response.json().get('symbols', []):
+            if item.get('status') != 'TRADING':
+                continue
+            filters = {f.get('filterType'): f for f in item.get('filters', [])}
+            notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+            result.append({
+                'symbol': item['symbol'],
+                'base': item.get('baseAsset', '').lower(),
+                'quote': item.get('quoteAsset', '').lower(),
+                'tick_size': filters.get('PRICE_FILTER', {}).get('tickSize', '0.00000001'),
+                'lot_size': filters.get('LOT_SIZE', {}).get('stepSize', '0.00000001'),
+                'min_notional': notional.get('minNotional', '0'),
+            })
+        return result
+
+    def _build(self, raw):
+        """원시 메타데이터로 조회 인덱스 구성 및 fixed_point 스케일 등록"""
+        binance = {item['symbol']: item for item in raw.get('binance', [])}
+        korbit = {}
+        binance_to_korbit = {}
+        for pair in raw.get('korbit', []):
+            symbol = pair['symbol']
+            base, quote = symbol.split('_', 1)
+            tick_size = pair.get('tick_size')
+            lot_size = pair.get('lot_size')
+            # 단위 정보가 없으면 fixed_point 기본 자릿수 사용 (단위 = 최소 자릿수 1)
+            default_price_dp, default_qty_dp = DEFAULT_SYMBOL_DECIMALS.get(symbol, FALLBACK_DECIMALS)
+            price_decimals = _decimals(str(tick_size)) if tick_size else default_price_dp
+            qty_decimals = _decimals(str(lot_size)) if lot_size else default_qty_dp
+            scale = SymbolScale(
+                symbol, price_decimals, qty_decimals,
+                tick_units=parse_units(str(tick_size), price_decimals) if tick_size else 1,
+                lot_units=parse_units(str(lot_size), qty_decimals) if lot_size else 1,
+            )
+            register_scale(scale)
+
+            # 같은 자산의 Binance USDT 마켓 (USDT 자체는 대응 마켓 없음)
+            # Binance 정보가 없으면(오프라인 기본값) 이름 규칙으로만 매핑
+            binance_symbol = f"{base.upper()}USDT"
+            if base == 'usdt' or (binance and binance_symbol not in binance):
+                binance_symbol = None
+            else:
+                binance_to_korbit[binance_symbol] = symbol
+
+            korbit[symbol] = SymbolInfo(
+                symbol=symbol,
+                base=base,
+                quote=quote,
+                name=pair.get('name', base.upper()),
+                scale=scale,
+                min_notional=parse_units(pair.get('min_notional', DEFAULT_MIN_NOTIONAL), KRW_DECIMALS),
+                binance_symbol=binance_symbol,
+            )
+
+        self._korbit = korbit
+        self._binance = binance
+        self._binance_to_korbit = binance_to_korbit
+        self.fetched_at = raw.get('fetched_at', 0)
+
+    # 조회
+    def get(self, symbol):
+        """Korbit 거래쌍 메타데이터 (없으면 None)"""
+        return self._korbit.get(symbol)
+
+    def symbols(self):
+        """Korbit 원화 거래쌍 전체 목록"""
+        return list(self._korbit)
+
+    def featured(self):
+        """메뉴 기본 노출 거래쌍"""
+        return [symbol for symbol in FEATURED_SYMBOLS if symbol in self._korbit]
+
+    def binance_symbol(self, symbol):
+        """Korbit 거래쌍 -> Binance USDT 마켓 (없으면 None)"""
+        info = self._korbit.get(symbol)
+        return info.binance_symbol if info else None
+
+    def korbit_symbol(self, binance_symbol):
+        """Binance 마켓 -> Korbit 원화 거래쌍 (없으면 None)"""
+        return self._binance_to_korbit.get(binance_symbol)
+
+    def binance_info(self, binance_symbol):
+        """Binance 마켓 필터 정보 (tick_size, lot_size, min_notional)"""
+        return self._binance.get(binance_symbol)
+
+    def binance_symbols(self, quote='usdt'):
+        """Binance 거래 가능 마켓 목록 (quote 자산 기준)"""
+        return [s for s, item in self._binance.items() if item.get('quote') == quote]
+
+    def display_name(self, symbol):
+        """'btc_krw' -> 'Bitcoin (BTC/KRW)'"""
+        info = self._korbit.get(symbol)
+        if not info:
+            return symbol
+        return f"{info.name} ({info.base.upper()}/{info.quote.upper()})"
+
+    def validate_order(self, symbol, side, price_units=None, qty_units=None, amt_units=None):
+        """
+        주문 사전 검증 (네트워크 왕복 없이 거래소 거절 사유를 미리 확인)
+
+        Returns:
+            str: 오류 메시지 (정상이면 None)
+        """
+        info = self._korbit.get(symbol)
+        if info is None:
+            return f"지원하지 않는 거래쌍입니다: {symbol}"
+        if side not in ('buy', 'sell'):
+            return f"잘못된 주문 방향입니다: {side}"
+
+        scale = info.scale
+        if price_units is not None and price_units % scale.tick_units:
+            return f"가격이 호가 단위({info.tick_size})에 맞지 않습니다."
+        if qty_units is not None and qty_units % scale.lot_units:
+            return f"수량이 수량 단위({info.lot_size})에 맞지 않습니다."
+
+        if amt_units is not None:
+            notional = amt_units
+        elif price_units is not None and qty_units is not None:
+            notional = scale.notional(price_units, qty_units)
+        else:
+            notional = None  # 시장가 매도: 현재가를 모르므로 금액 검증 생략
+        if notional is not None and notional < info.min_notional:
+            return f"주문 금액이 최소 주문 금액({info.min_notional:,} KRW) 미만입니다."
+        return None
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """프로세스 전역 레지스트리 (최초 호출 시 캐시/거래소에서 로드)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SymbolRegistry().load()
+    return _registry
@@ -0,0 +1,388 @@
+import os
+import gzip
+import json
+import time
+import zlib
+import base64
+import atexit
+import argparse
+import threading
+from collections import Counter, deque
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+import requests
+
+import a_base
+import event_log
+
+# 거래소 통신 기록/재생
+# RecordingTransport 는 a_base.transport 를 감싸 모든 HTTP 요청/응답(과 WebSocket 메시지)을
+# 시각과 함께 gzip JSON lines 파일에 추가 기록한다 (프로세스마다 새 파일, append-only).
+# ReplayTransport 는 기록 파일을 읽어 같은 요청에 같은 응답을 순서대로 돌려주므로
+# 네트워크 없이 실제 운영 트래픽으로 성능 측정과 회귀 확인을 반복할 수 있다.
+#
+# 요청 대조 키: 메서드 + 호스트/경로 + 파라미터 (매 요청 달라지는 timestamp/signature/clientOrderId 제외)
+# 같은 키의 응답이 여러 개면 기록 순서대로, 다 쓰면 마지막 응답을 반복한다.
+# 재생 속도: speed=None 이면 지연 없이, 1.0 이면 기록된 응답 시간 그대로, 10.0 이면 10배 빠르게.
+# API 키 헤더와 서명은 기록하지 않는다.
+
+DEFAULT_DIR = os.path.join('data', 'traffic')
+
+# 대조 키에서 제외하는 요청 파라미터 (매 요청 달라짐)
+VOLATILE_PARAMS = frozenset({'timestamp', 'signature', 'clientOrderId'})
+# 기록하지 않는 파라미터
+SECRET_PARAMS = frozenset({'signature'})
+
+FLUSH_INTERVAL = 1.0  # 압축 버퍼를 파일에 내보내는 주기 (초)
+
+
+class ReplayMiss(requests.exceptions.ConnectionError):
+    """기록에 없는 요청 (호출부의 RequestException 처리 경로로 전달)"""
+
+
+def _params(value):
+    """params/data 인자 -> 기록용 dict (문자열/바이트 본문은 그대로)"""
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode('utf-8', 'replace')
+    if isinstance(value, str):
+        # urlencode 된 본문이면 서명만 제거
+        pairs = parse_qsl(value, keep_blank_values=True)
+        return urlencode([(k, v) for k, v in pairs if k not in SECRET_PARAMS]) if pairs else value
+    return {key: value[key] for key in value if key not in SECRET_PARAMS}
+
+
+def request_key(method, url, params=None, data=None):
+    """요청 대조 키 (시각/서명처럼 매번 바뀌는 값 제외, URL 쿼리 포함)"""
+    parsed = urlparse(url)
+
+    def stable(value):
+        if isinstance(value, (bytes, bytearray)):
+            value = value.decode('utf-8', 'replace')
+        if isinstance(value, str) and parse_qsl(value):
+            value = dict(parse_qsl(value, keep_blank_values=True))
+        if isinstance(value, dict):
+            return sorted((key, str(item)) for key, item in value.items() if key not in VOLATILE_PARAMS)
+        return value
+
+    # cancel_order 처럼 서명한 쿼리를 URL 에 직접 붙이는 요청도 같은 키가 되도록 분해
+    query = dict(parse_qsl(parsed.query, keep_blank_values=True))
+    return json.dumps([method.upper(), parsed.netloc, parsed.path, stable(query),
+                       stable(params), stable(data)], ensure_ascii=False)
+
+
+def _strip_url(url):
+    """기록용 URL (쿼리의 서명 제거)"""
+    parsed = urlparse(url)
+    if not parsed.query:
+        return url
+    query = [(key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+             if key not in SECRET_PARAMS]
+    return parsed._replace(query=urlencode(query)).geturl()
+
+
+def _body(content):
+    """응답 본문 -> 기록용 (UTF-8 이 아니면 base64)"""
+    try:
+        return {'text': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'b64': base64.b64encode(content).decode('ascii')}
+
+
+def read_records(path):
+    """
+    기록 파일(들) 순회 (디렉터리면 파일 이름순 전체)
+
+    기록 도중 종료되어 잘린 마지막 부분은 건너뛴다.
+    """
+    paths = ([os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith('.jsonl.gz')]
+             if os.path.isdir(path) else [path])
+    for file_path in paths:
+        try:
+            with gzip.open(file_path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        break  # 잘린 마지막 줄
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            continue  # 비정상 종료로 끝부분이 없는 파일
+
+
+class RecordingTransport:
+    """HTTP 전송 계층 래퍼: 요청/응답을 gzip JSON lines 로 기록"""
+
+    def __init__(self, inner, directory=DEFAULT_DIR):
+        self.inner = inner
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, time.strftime('traffic-%Y%m%d-%H%M%S') + f"-{os.getpid()}.jsonl.gz")
+        self._file = gzip.open(self.path, 'at', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._dirty = False             # 마지막 flush 이후 기록이 있는지
+        self._closed = False
+        # 기록이 끊긴 뒤에도 압축 버퍼에 남은 꼬리가 FLUSH_INTERVAL 안에 파일로 나가도록 주기적으로 flush
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def _write(self, record):
+        with self._lock:
+            if self._closed:
+                return
+            self._seq += 1
+            record['seq'] = self._seq
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._dirty = True
+
+    def _flush_loop(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        """압축 버퍼를 파일로 내보냄 (비정상 종료 시에도 여기까지는 읽을 수 있음)"""
+        with self._lock:
+            if self._dirty and not self._closed:
+                self._file.flush()
+                self._dirty = False
+
+    def request(self, method, url, **kwargs):
+        started = time.time()
+        record = {'kind': 'http', 'ts': started, 'method': method, 'url': _strip_url(url),
+                  'key': request_key(method, url, kwargs.get('params'), kwargs.get('data')),
+                  'params': _params(kwargs.get('params')), 'data': _params(kwargs.get('data'))}
+        try:
+            response = self.inner.request(method, url, **kwargs)
+        except Exception as e:
+            record.update(elapsed=time.time() - started, error=type(e).__name__, message=str(e))
+            self._write(record)
+            raise
+        record.update(elapsed=time.time() - started, status=response.status_code, reason=response.reason,
+                      headers={'Content-Type': response.headers.get('Content-Type', '')},
+                      **_body(response.content))
+        self._write(record)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def record_ws(self, url, direction, message):
+        """WebSocket 메시지 기록 (direction: 'recv' | 'send')"""
+        if isinstance(message, bytes):
+            message = message.decode('utf-8', 'replace')
+        self._write({'kind': 'ws', 'ts': time.time(), 'url': urlparse(url)._replace(query='').geturl(),
+                     'direction': direction, 'message': message})
+
+    def ws_connect(self, connect):
+        """WebSocket 연결 함수 래퍼 (송수신 메시지 기록)"""
+        if connect is None:
+            return None
+
+        def recording_connect(url, **kwargs):
+            return _RecordingSocket(connect(url, **kwargs), self, url)
+        return recording_connect
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._file.close()
+
+
+class _RecordingSocket:
+    """WebSocket 연결 래퍼 (recv/send 기록, 나머지는 그대로 위임)"""
+
+    def __init__(self, sock, recorder, url):
+        self._sock = sock
+        self._recorder = recorder
+        self._url = url
+
+    def recv(self):
+        message = self._sock.recv()
+        if message:
+            self._recorder.record_ws(self._url, 'recv', message)
+        return message
+
+    def send(self, message, *args, **kwargs):
+        self._recorder.record_ws(self._url, 'send', message)
+        return self._sock.send(message, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._sock, name)
+
+
+class ReplayTransport:
+    """기록 파일을 응답으로 돌려주는 HTTP 전송 계층 (네트워크 사용 안 함)"""
+
+    def __init__(self, path, speed=None):
+        """
+        Args:
+            path (str): 기록 파일 또는 디렉터리
+            speed (float): None 이면 지연 없이, 1.0 이면 실제 응답 시간, 2.0 이면 2배 빠르게
+        """
+        self.speed = speed
+        self.responses = {}    # 대조 키 -> deque[기록]
+        self.last = {}         # 대조 키 -> 마지막으로 돌려준 기록
+        self.ws_messages = {}  # URL -> deque[(시각, 메시지)] 수신 메시지 (재연결해도 이어서 재생)
+        self.misses = Counter()
+        self._lock = threading.Lock()
+        for record in read_records(path):
+            if record['kind'] == 'http':
+                self.responses.setdefault(record['key'], deque()).append(record)
+            elif record['kind'] == 'ws' and record['direction'] == 'recv':
+                self.ws_messages.setdefault(record['url'], deque()).append((record['ts'], record['message']))
+
+    def _next(self, key):
+        with self._lock:
+            queue = self.responses.get(key)
+            if queue:
+                record = self.last[key] = queue.popleft()
+                return record
+            return self.last.get(key)
+
+    def request(self, method, url, **kwargs):
+        key = request_key(method, url, kwargs.get('params'), kwargs.get('data'))
+        record = self._next(key)
+        if record is None:
+            self.misses[key] += 1
+            raise ReplayMiss(f"기록에 없는 요청입니다: {method} {url}")
+        if self.speed:
+            time.sleep(record['elapsed'] / self.speed)
+        if 'error' in record:
+            raise requests.exceptions.ConnectionError(record['message'])
+        return self._response(record, method, url)
+
+    @staticmethod
+    def _response(record, method, url):
+        response = requests.Response()
+        response.status_code = record['status']
+        response.reason = record.get('reason')
+        response.headers.update(record.get('headers') or {})
+        response._content = (record['text'].encode('utf-8') if 'text' in record
+                             else base64.b64decode(record['b64']))
+        response.encoding = 'utf-8'
+        response.url = url
+        response.request = requests.Request(method, url).prepare()
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def ws_connect(self, connect=None):
+        """기록된 수신 메시지를 돌려주는 WebSocket 연결 함수 (실제 연결 함수는 사용 안 함)"""
+        def replay_connect(url, **kwargs):
+            url = urlparse(url)._replace(query='').geturl()
+            return _ReplaySocket(self.ws_messages.setdefault(url, deque()), self.speed)
+        return replay_connect
+
+
+class _ReplaySocket:
+    """기록된 메시지를 기록 간격(speed 배속)대로 돌려주고, 다 보내면 연결 종료"""
+
+    def __init__(self, messages, speed):
+        self._messages = messages
+        self._speed = speed
+        self._previous = None
+
+    def recv(self):
+        if not self._messages:
+            return ''  # 서버 연결 종료로 처리
+        ts, message = self._messages.popleft()
+        if self._speed and self._previous is not None:
+            time.sleep(max(0.0, ts - self._previous) / self._speed)
+        self._previous = ts
+        return message
+
+    def send(self, message, *args, **kwargs):
+        pass
+
+    def ping(self, *args):
+        pass
+
+    def close(self):
+        pass
+
+
+# 전역 설치 (a_base.transport 교체)
+_active = None
+
+
+def install_recorder(directory=DEFAULT_DIR):
+    """a_base.transport 를 기록 래퍼로 교체 (종료 시 파일 닫음)"""
+    global _active
+    _active = RecordingTransport(a_base.transport, directory)
+    a_base.transport = _active
+    atexit.register(_active.close)
+    event_log.log('traffic_recording', path=_active.path)
+    return _active
+
+
+def install_replay(path, speed=None):
+    """a_base.transport 를 재생 전송 계층으로 교체"""
+    global _active
+    _active = ReplayTransport(path, speed)
+    a_base.transport = _active
+    event_log.log('traffic_replay', path=path, requests=sum(len(q) for q in _active.responses.values()),
+                  speed=speed)
+    return _active
+
+
+def ws_connect(connect):
+    """설치된 기록/재생 계층에 맞춘 WebSocket 연결 함수 (설치되지 않았으면 그대로)"""
+    return _active.ws_connect(connect) if _active is not None else connect
+
+
+def _render_recording(record):
+    """traffic_recording 이벤트 콘솔 출력"""
+    return f"📼 거래소 통신 기록 중: {record['path']}"
+
+
+def _render_replay(record):
+    """traffic_replay 이벤트 콘솔 출력"""
+    speed = f"{record['speed']}배속" if record['speed'] else '지연 없음'
+    return f"📼 거래소 통신 재생: {record['path']} (응답 {record['requests']}건, {speed})"
+
+
+event_log.register_renderer('traffic_recording', _render_recording)
+event_log.register_renderer('traffic_replay', _render_replay)
+
+
+def main(argv=None):
+    """메인 실행 함수: python traffic_recorder.py [data/traffic] (엔드포인트별 요청 수/평균 응답 시간)"""
+    parser = argparse.ArgumentParser(description='거래소 통신 기록 요약')
+    parser.add_argument('path', nargs='?', default=DEFAULT_DIR, help='기록 파일 또는 디렉터리')
+    args = parser.parse_args(argv)
+
+    counts, elapsed, ws = Counter(), Counter(), Counter()
+    for record in read_records(args.path):
+        if record['kind'] == 'http':
+            endpoint = f"{record['method']} {urlparse(record['url']).netloc}{urlparse(record['url']).path}"
+            counts[endpoint] += 1
+            elapsed[endpoint] += record['elapsed']
+        else:
+            ws[f"{record['direction']} {record['url']}"] += 1
+
+    print(f"{'엔드포인트':<60} {'요청 수':>8} {'평균(ms)':>10}")
+    print("-" * 80)
+    for endpoint, count in counts.most_common():
+        print(f"{endpoint:<60} {count:>8} {elapsed[endpoint] / count * 1000:>10.1f}")
+    for channel, count in ws.most_common():
+        print(f"{'WS ' + channel:<60} {count:>8}")
+
+
+if __name__ == "__main__":
+    main()
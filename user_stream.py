@@ -0,0 +1,287 @@
+import json
+import time
+import threading
+from urllib.parse import urlencode
+
+try:
+    import websocket  # 선택 의존성 (websocket-client): 없으면 REST 조회만 사용
+except ImportError:
+    websocket = None
+
+import metrics
+import event_log
+from config import Config
+from models import Order, FINAL_STATUSES
+from ledger import get_ledger
+import traffic_recorder
+
+# Korbit 비공개 WebSocket 사용자 데이터 스트림
+# 내 주문 상태 변경(myOrder), 체결(myTrade), 자산 변경(myAsset)을 실시간으로 받아
+# 원장 기록, 잔고 인덱스 갱신, 주문 완료 대기(wait_for)에 반영한다.
+# 주문 결과를 get_order_status/get_open_orders 로 폴링하지 않아도 체결을 수 밀리초 안에 알 수 있다.
+#
+# 연결이 끊긴 동안의 이벤트는 받을 수 없으므로 (재)연결 직후 REST 로 미체결 주문과
+# 추적 중인 주문의 상태, 전체 잔고를 다시 조회해 맞춘다(resync).
+# URL 은 설정으로 바꿀 수 있어 로컬 가짜 서버(ws://127.0.0.1:포트)로 시험할 수 있다.
+
+STREAM_AVAILABLE = websocket is not None
+_TIMEOUT_ERRORS = (websocket.WebSocketTimeoutException,) if websocket else (TimeoutError,)
+
+DEFAULT_URL = Config.KORBIT_PRIVATE_WS_URL
+
+# 구독 채널
+ORDER_CHANNEL = 'myOrder'
+TRADE_CHANNEL = 'myTrade'
+ASSET_CHANNEL = 'myAsset'
+
+PING_INTERVAL = 20.0      # 무응답 연결 확인 주기 (초)
+MAX_BACKOFF = 30.0        # 재연결 대기 최대값 (초)
+
+
+class UserDataStream:
+    """비공개 WebSocket 주문/체결/자산 이벤트 수신 (백그라운드 스레드, 자동 재연결)"""
+
+    def __init__(self, bot, symbols, url=None, balances=None, connect=None):
+        """
+        Args:
+            bot: TradingBot (서명, REST 재동기화용)
+            symbols (list): 구독할 거래쌍
+            url (str): 비공개 WebSocket 주소 (기본: Config.KORBIT_PRIVATE_WS_URL)
+            balances: BalanceService (자산 이벤트 반영, None 이면 반영 안 함)
+            connect: 연결 함수 (기본: websocket.create_connection)
+        """
+        self.bot = bot
+        self.symbols = list(symbols)
+        self.url = url or DEFAULT_URL
+        self.balances = balances
+        # 통신 기록/재생이 설치되어 있으면 메시지도 함께 기록/재생
+        self.connect = connect or traffic_recorder.ws_connect(websocket.create_connection if websocket else None)
+        self.orders = {}            # 주문 ID -> 최신 Order (추적 중인 주문)
+        self.order_listeners = []   # listener(order)
+        self.fill_listeners = []    # listener(symbol, fill dict)
+        self.connected = False
+        self.last_message_at = 0.0  # 마지막 수신 시각 (monotonic)
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._sock = None
+        self._thread = None
+
+    # 리스너
+    def add_order_listener(self, listener):
+        """주문 상태 변경 리스너 등록: listener(order)"""
+        self.order_listeners.append(listener)
+
+    def add_fill_listener(self, listener):
+        """체결 리스너 등록: listener(symbol, fill)"""
+        self.fill_listeners.append(listener)
+
+    # 시작/종료
+    def start(self):
+        """수신 스레드 시작"""
+        if self.connect is None:
+            raise RuntimeError("websocket-client 가 설치되어 있지 않습니다. (pip install websocket-client)")
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """연결 종료 후 스레드 정리"""
+        self._stop_event.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.close()
+            except Exception:
+                pass
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _auth_url(self):
+        """REST 와 같은 방식으로 timestamp 에 서명한 접속 주소"""
+        params = {"timestamp": int(time.time() * 1000)}
+        params["signature"] = self.bot.create_signature(urlencode(params))
+        separator = '&' if '?' in self.url else '?'
+        return f"{self.url}{separator}{urlencode(params)}"
+
+    def _subscribe_messages(self):
+        return [
+            {'method': 'subscribe', 'type': ORDER_CHANNEL, 'symbols': self.symbols},
+            {'method': 'subscribe', 'type': TRADE_CHANNEL, 'symbols': self.symbols},
+            {'method': 'subscribe', 'type': ASSET_CHANNEL},
+        ]
+
+    def _run(self):
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                self._sock = self.connect(self._auth_url(), header=[f"X-KAPI-KEY: {self.bot.api_key}"],
+                                          timeout=PING_INTERVAL)
+                self._sock.send(json.dumps(self._subscribe_messages()))
+                self._set_connected(True)
+                backoff = 1.0
+                # 연결 전후에 놓친 이벤트는 REST 로 보정 (구독 이후에 조회해야 공백이 없음)
+                self.resync()
+                self._receive_loop()
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    event_log.log('user_stream_error', level='warning', error=str(e))
+            finally:
+                self._set_connected(False)
+                if self._sock is not None:
+                    try:
+                        self._sock.close()
+                    except Exception:
+                        pass
+                    self._sock = None
+            if self._stop_event.wait(backoff):
+                break
+            backoff = min(backoff * 2, MAX_BACKOFF)
+            metrics.registry.inc('user_stream_reconnect')
+
+    def _receive_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                message = self._sock.recv()
+            except _TIMEOUT_ERRORS:
+                self._sock.ping()  # 응답이 없으면 다음 recv 에서 연결 오류 발생
+                continue
+            if not message:
+                raise ConnectionError("서버가 연결을 종료했습니다.")
+            self.last_message_at = time.monotonic()
+            self.handle_message(message)
+
+    def _set_connected(self, connected):
+        with self._cond:
+            if self.connected == connected:
+                return
+            self.connected = connected
+            self._cond.notify_all()
+        event_log.log('user_stream_connected' if connected else 'user_stream_disconnected', url=self.url)
+        if not connected and self.balances is not None:
+            self.balances.stop_streaming()
+
+    # 메시지 처리
+    def handle_message(self, message):
+        """수신 메시지 1건 처리 (JSON 문자열 또는 dict)"""
+        data = json.loads(message) if isinstance(message, (str, bytes)) else message
+        channel = data.get('type')
+        items = data.get('data') or []
+        if isinstance(items, dict):
+            items = [items]
+        metrics.registry.inc('user_stream_message', channel=channel or 'unknown')
+
+        if channel == ORDER_CHANNEL:
+            for item in items:
+                self._apply_order(Order.from_api({'symbol': data.get('symbol'), **item}))
+        elif channel == TRADE_CHANNEL:
+            for item in items:
+                symbol = item.get('symbol') or data.get('symbol')
+                event_log.log('fill_received', symbol=symbol, fill=item)
+                for listener in self.fill_listeners:
+                    self._call(listener, symbol, item)
+        elif channel == ASSET_CHANNEL:
+            if self.balances is not None:
+                self.balances.apply_update(items)
+
+    def _apply_order(self, order):
+        if order.order_id is None:
+            return
+        with self._cond:
+            previous = self.orders.get(order.order_id)
+            # 재동기화 응답과 실시간 이벤트가 엇갈려도 체결량이 줄어드는 방향으로는 되돌리지 않음
+            if previous is not None and previous.filled_qty > order.filled_qty:
+                return
+            self.orders[order.order_id] = order
+            self._cond.notify_all()
+        self._call(get_ledger().record_order, order)  # 체결 증가분 원장 반영
+        event_log.log('order_update', level='debug', symbol=order.symbol, order_id=order.order_id,
+                      status=order.status, filled_qty=order.filled_qty)
+        for listener in self.order_listeners:
+            self._call(listener, order)
+
+    def _call(self, listener, *args):
+        """리스너 호출 (오류는 기록만 하고 정상 연결을 끊지 않음)"""
+        try:
+            listener(*args)
+        except Exception as e:
+            event_log.log('user_stream_listener_error', level='error',
+                          listener=getattr(listener, '__qualname__', repr(listener)), error=str(e))
+
+    # REST 재동기화
+    def resync(self):
+        """
+        미체결 주문과 추적 중인 주문 상태, 전체 잔고를 REST 로 다시 조회
+
+        Returns:
+            int: 반영한 주문 수
+        """
+        with self._cond:
+            # 완료된 주문은 추적 해제 (대기 중인 wait_for 는 이미 반환됨)
+            self.orders = {order_id: order for order_id, order in self.orders.items()
+                           if order.status not in FINAL_STATUSES}
+        count = 0
+        open_ids = set()
+        for symbol in self.symbols:
+            for order in self.bot.get_open_orders(symbol) or []:
+                open_ids.add(order.order_id)
+                self._apply_order(order)
+                count += 1
+        with self._cond:
+            unresolved = [order for order_id, order in self.orders.items()
+                          if order_id not in open_ids and order.status not in FINAL_STATUSES]
+        # 연결이 끊긴 사이 완료된 주문
+        for order in unresolved:
+            latest = self.bot.get_order_status(order.symbol, order_id=order.order_id)
+            if latest is not None:
+                self._apply_order(latest)
+                count += 1
+        if self.balances is not None:
+            self.balances.refresh()
+        event_log.log('user_stream_resynced', orders=count)
+        return count
+
+    # 주문 완료 대기
+    def wait_for(self, order_id, timeout=2.0):
+        """
+        주문이 완료 상태가 될 때까지 대기 (폴링 대신 이벤트 수신)
+
+        Returns:
+            Order: 완료된 주문 (시간 초과 또는 연결 끊김 시 None -> REST 조회로 대체)
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                order = self.orders.get(order_id)
+                if order is not None and order.status in FINAL_STATUSES:
+                    return order
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.connected:
+                    return None
+                self._cond.wait(remaining)
+
+    def forget(self, order_id):
+        """완료 처리한 주문 추적 해제"""
+        with self._cond:
+            self.orders.pop(order_id, None)
+
+
+def _render_connected(record):
+    """user_stream_connected 이벤트 콘솔 출력"""
+    return f"🔌 사용자 데이터 스트림 연결: {record['url']}"
+
+
+def _render_disconnected(record):
+    """user_stream_disconnected 이벤트 콘솔 출력"""
+    return "⚠️ 사용자 데이터 스트림 연결 끊김, 재연결 후 REST 로 재동기화합니다."
+
+
+def _render_resynced(record):
+    """user_stream_resynced 이벤트 콘솔 출력"""
+    return f"🔄 사용자 데이터 스트림 재동기화: 주문 {record['orders']}건 반영"
+
+
+event_log.register_renderer('user_stream_connected', _render_connected)
+event_log.register_renderer('user_stream_disconnected', _render_disconnected)
+event_log.register_renderer('user_stream_resynced', _render_resynced)